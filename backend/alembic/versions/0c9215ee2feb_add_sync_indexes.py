@@ -0,0 +1,33 @@
+"""add_sync_indexes
+
+Revision ID: 0c9215ee2feb
+Revises: f05da1ade738
+Create Date: 2026-10-18 14:58:13.440871
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0c9215ee2feb'
+down_revision: Union[str, Sequence[str], None] = 'f05da1ade738'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        'ix_tickets_school_id_deleted_at', 'tickets',
+        ['school_id', 'deleted_at'],
+        unique=False,
+        postgresql_where=sa.text('deleted_at IS NOT NULL'),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_tickets_school_id_deleted_at', table_name='tickets')
@@ -0,0 +1,53 @@
+"""add_ticket_routed_role
+
+Revision ID: 0cf73fe3df8b
+Revises: 1a7495f206c8
+Create Date: 2026-10-18 13:52:07.318254
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0cf73fe3df8b'
+down_revision: Union[str, Sequence[str], None] = '1a7495f206c8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Mirrors app.services.routing.CATEGORY_TO_ROLE at the time of this migration (enum names as stored).
+CATEGORY_TO_ROLE = {
+    'ACADEMIC_TEACHING': 'TEACHER',
+    'ACADEMIC_EXAM_POLICY': 'VICE_PRINCIPAL',
+    'DISCIPLINE': 'VICE_PRINCIPAL',
+    'ATTENDANCE_LEAVE': 'TEACHER',
+    'FEE_ACCOUNTS': 'PRINCIPAL',
+    'TRANSPORT': 'TRANSPORT',
+    'HEALTH_SAFETY': 'VICE_PRINCIPAL',
+    'CLEANLINESS_INFRA': 'OFFICE',
+    'DOCUMENTS': 'OFFICE',
+    'OTHER': 'PRINCIPAL',
+}
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    role_enum = postgresql.ENUM(name='role', create_type=False)
+    op.add_column('tickets', sa.Column('routed_role', role_enum, nullable=True))
+    whens = ' '.join(f"WHEN '{category}' THEN '{role}'" for category, role in CATEGORY_TO_ROLE.items())
+    op.execute(f"UPDATE tickets SET routed_role = (CASE category::text {whens} ELSE 'PRINCIPAL' END)::role")
+    op.alter_column('tickets', 'routed_role', nullable=False)
+    op.create_index(
+        'ix_tickets_school_id_routed_role_status', 'tickets',
+        ['school_id', 'routed_role', 'status'],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_tickets_school_id_routed_role_status', table_name='tickets')
+    op.drop_column('tickets', 'routed_role')
@@ -0,0 +1,44 @@
+"""add_school_settings
+
+Revision ID: 14c6577d3f95
+Revises: bc362dc1e868
+Create Date: 2026-10-18 15:48:12.530417
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '14c6577d3f95'
+down_revision: Union[str, Sequence[str], None] = 'bc362dc1e868'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'school_settings',
+        sa.Column('school_id', sa.Integer(), nullable=False),
+        sa.Column('office_hours_start', sa.String(length=5), nullable=True),
+        sa.Column('office_hours_end', sa.String(length=5), nullable=True),
+        sa.Column('timezone', sa.String(length=64), nullable=True),
+        sa.Column('holidays', postgresql.ARRAY(sa.Date()), nullable=False, server_default='{}'),
+        sa.Column('max_open_tickets', sa.Integer(), nullable=True),
+        sa.Column('cooldown_minutes', sa.Integer(), nullable=True),
+        sa.Column('max_tickets_7_days', sa.Integer(), nullable=True),
+        sa.Column('max_open_other', sa.Integer(), nullable=True),
+        sa.Column('max_urgent_7_days', sa.Integer(), nullable=True),
+        sa.Column('version', sa.Integer(), nullable=False, server_default='1'),
+        sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+        sa.PrimaryKeyConstraint('school_id'),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('school_settings')
@@ -0,0 +1,45 @@
+"""add_ticket_full_text_search
+
+Revision ID: 1a7495f206c8
+Revises: f1b2ead12d65
+Create Date: 2026-10-18 13:30:22.646109
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '1a7495f206c8'
+down_revision: Union[str, Sequence[str], None] = 'f1b2ead12d65'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('tickets', sa.Column(
+        'search_vector',
+        postgresql.TSVECTOR(),
+        sa.Computed("to_tsvector('simple'::regconfig, coalesce(title, '') || ' ' || coalesce(description, ''))", persisted=True),
+        nullable=True,
+    ))
+    op.add_column('ticket_messages', sa.Column(
+        'search_vector',
+        postgresql.TSVECTOR(),
+        sa.Computed("to_tsvector('simple'::regconfig, body)", persisted=True),
+        nullable=True,
+    ))
+    op.create_index('ix_tickets_search_vector', 'tickets', ['search_vector'], unique=False, postgresql_using='gin')
+    op.create_index('ix_ticket_messages_search_vector', 'ticket_messages', ['search_vector'], unique=False, postgresql_using='gin')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_ticket_messages_search_vector', table_name='ticket_messages')
+    op.drop_index('ix_tickets_search_vector', table_name='tickets')
+    op.drop_column('ticket_messages', 'search_vector')
+    op.drop_column('tickets', 'search_vector')
@@ -0,0 +1,28 @@
+"""add_announcements_archived_at
+
+Revision ID: 20c95c1838d8
+Revises: c8a3238d9f05
+Create Date: 2026-10-18 17:52:13.408271
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '20c95c1838d8'
+down_revision: Union[str, Sequence[str], None] = 'c8a3238d9f05'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('announcements', sa.Column('archived_at', sa.DateTime(timezone=True), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('announcements', 'archived_at')
@@ -0,0 +1,34 @@
+"""add_sync_time_keyed_indexes
+
+Revision ID: 9a7117cd8bea
+Revises: 20c95c1838d8
+Create Date: 2026-10-18 18:21:44.905317
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9a7117cd8bea'
+down_revision: Union[str, Sequence[str], None] = '20c95c1838d8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        'ix_ticket_messages_created_at_id', 'ticket_messages', ['created_at', 'id'], unique=False
+    )
+    op.create_index(
+        'ix_announcement_reads_user_id_read_at_id', 'announcement_reads', ['user_id', 'read_at', 'id'], unique=False
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_announcement_reads_user_id_read_at_id', table_name='announcement_reads')
+    op.drop_index('ix_ticket_messages_created_at_id', table_name='ticket_messages')
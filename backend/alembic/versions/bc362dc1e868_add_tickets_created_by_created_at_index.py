@@ -0,0 +1,28 @@
+"""add_tickets_created_by_created_at_index
+
+Revision ID: bc362dc1e868
+Revises: 0c9215ee2feb
+Create Date: 2026-10-18 15:21:36.118902
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'bc362dc1e868'
+down_revision: Union[str, Sequence[str], None] = '0c9215ee2feb'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_tickets_created_by_id_created_at', 'tickets', ['created_by_id', 'created_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_tickets_created_by_id_created_at', table_name='tickets')
@@ -0,0 +1,30 @@
+"""add_ticket_keyset_pagination_indexes
+
+Revision ID: bd067106ad87
+Revises: 70ba141d3be2
+Create Date: 2026-10-18 09:12:41.503218
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'bd067106ad87'
+down_revision: Union[str, Sequence[str], None] = '70ba141d3be2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_tickets_school_id_updated_at_id', 'tickets', ['school_id', sa.text('updated_at DESC'), sa.text('id DESC')], unique=False)
+    op.create_index('ix_tickets_created_by_id_updated_at_id', 'tickets', ['created_by_id', sa.text('updated_at DESC'), sa.text('id DESC')], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_tickets_created_by_id_updated_at_id', table_name='tickets')
+    op.drop_index('ix_tickets_school_id_updated_at_id', table_name='tickets')
@@ -0,0 +1,63 @@
+"""add_announcement_read_rollups
+
+Revision ID: c8a3238d9f05
+Revises: dc1c9f13c17c
+Create Date: 2026-10-18 16:40:27.906154
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c8a3238d9f05'
+down_revision: Union[str, Sequence[str], None] = 'dc1c9f13c17c'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('announcements', sa.Column('recipient_count', sa.Integer(), nullable=False, server_default='0'))
+    op.add_column('announcements', sa.Column('read_count', sa.Integer(), nullable=False, server_default='0'))
+    op.execute(
+        """
+        UPDATE announcements a
+        SET read_count = r.n
+        FROM (SELECT announcement_id, count(*) AS n FROM announcement_reads GROUP BY announcement_id) r
+        WHERE r.announcement_id = a.id
+        """
+    )
+    # Existing announcements get today's audience; new ones are snapshotted when created.
+    op.execute(
+        """
+        UPDATE announcements a
+        SET recipient_count = (
+            SELECT count(*) FROM users u
+            WHERE u.school_id = a.school_id
+              AND (
+                (a.target_audience IN ('staff', 'both') AND u.role != 'PARENT')
+                OR (
+                  a.target_audience IN ('parents', 'both') AND u.role = 'PARENT'
+                  AND (
+                    (a.target_grade IS NULL AND a.target_class IS NULL)
+                    OR EXISTS (
+                      SELECT 1 FROM parent_students ps JOIN students s ON s.id = ps.student_id
+                      WHERE ps.parent_id = u.id AND s.school_id = a.school_id
+                        AND (a.target_grade IS NULL OR s.class = a.target_grade)
+                        AND (a.target_class IS NULL OR s.section = a.target_class)
+                    )
+                  )
+                )
+              )
+        )
+        """
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('announcements', 'read_count')
+    op.drop_column('announcements', 'recipient_count')
@@ -0,0 +1,33 @@
+"""add_announcements_archived_at_index
+
+Revision ID: d96fe4740898
+Revises: 9a7117cd8bea
+Create Date: 2026-10-18 18:40:02.517730
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd96fe4740898'
+down_revision: Union[str, Sequence[str], None] = '9a7117cd8bea'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        'ix_announcements_school_id_archived_at', 'announcements',
+        ['school_id', 'archived_at'],
+        unique=False,
+        postgresql_where=sa.text('archived_at IS NOT NULL'),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_announcements_school_id_archived_at', table_name='announcements')
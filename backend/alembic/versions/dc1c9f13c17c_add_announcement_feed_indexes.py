@@ -0,0 +1,46 @@
+"""add_announcement_feed_indexes
+
+Revision ID: dc1c9f13c17c
+Revises: 14c6577d3f95
+Create Date: 2026-10-18 16:12:05.184263
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'dc1c9f13c17c'
+down_revision: Union[str, Sequence[str], None] = '14c6577d3f95'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Concurrent receipts could insert the same (announcement, user) twice; keep the first.
+    op.execute(
+        """
+        DELETE FROM announcement_reads r
+        USING announcement_reads earlier
+        WHERE earlier.announcement_id = r.announcement_id
+          AND earlier.user_id = r.user_id
+          AND earlier.id < r.id
+        """
+    )
+    op.create_unique_constraint(
+        'uq_announcement_reads_announcement_id_user_id', 'announcement_reads', ['announcement_id', 'user_id']
+    )
+    op.create_index(
+        'ix_announcements_school_id_created_at_id', 'announcements',
+        ['school_id', sa.text('created_at DESC'), sa.text('id DESC')],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_announcements_school_id_created_at_id', table_name='announcements')
+    op.drop_constraint('uq_announcement_reads_announcement_id_user_id', 'announcement_reads', type_='unique')
@@ -0,0 +1,62 @@
+"""add_ticket_activity_counters
+
+Revision ID: ec92b8d95792
+Revises: ef59dd13dcc6
+Create Date: 2026-10-18 11:20:05.317842
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'ec92b8d95792'
+down_revision: Union[str, Sequence[str], None] = 'ef59dd13dcc6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('tickets', sa.Column('message_count', sa.Integer(), nullable=False, server_default=sa.text('0')))
+    op.add_column('tickets', sa.Column('last_message_at', sa.DateTime(timezone=True), nullable=True))
+    op.add_column('tickets', sa.Column('internal_notes_count', sa.Integer(), nullable=False, server_default=sa.text('0')))
+    op.add_column('tickets', sa.Column('reopen_count', sa.Integer(), nullable=False, server_default=sa.text('0')))
+    op.add_column('tickets', sa.Column('first_staff_response_at', sa.DateTime(timezone=True), nullable=True))
+    # Backfill from child tables; afterwards these are maintained by the write paths.
+    op.execute("""
+        UPDATE tickets t SET message_count = m.cnt, last_message_at = m.last_at
+        FROM (SELECT ticket_id, count(*) AS cnt, max(created_at) AS last_at FROM ticket_messages GROUP BY ticket_id) m
+        WHERE m.ticket_id = t.id
+    """)
+    op.execute("""
+        UPDATE tickets t SET first_staff_response_at = f.first_at
+        FROM (
+            SELECT tm.ticket_id, min(tm.created_at) AS first_at
+            FROM ticket_messages tm JOIN users u ON u.id = tm.sender_id
+            WHERE u.role <> 'PARENT'
+            GROUP BY tm.ticket_id
+        ) f
+        WHERE f.ticket_id = t.id
+    """)
+    op.execute("""
+        UPDATE tickets t SET internal_notes_count = n.cnt
+        FROM (SELECT ticket_id, count(*) AS cnt FROM internal_notes GROUP BY ticket_id) n
+        WHERE n.ticket_id = t.id
+    """)
+    op.execute("""
+        UPDATE tickets t SET reopen_count = r.cnt
+        FROM (SELECT ticket_id, count(*) AS cnt FROM ticket_reopens GROUP BY ticket_id) r
+        WHERE r.ticket_id = t.id
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('tickets', 'first_staff_response_at')
+    op.drop_column('tickets', 'reopen_count')
+    op.drop_column('tickets', 'internal_notes_count')
+    op.drop_column('tickets', 'last_message_at')
+    op.drop_column('tickets', 'message_count')
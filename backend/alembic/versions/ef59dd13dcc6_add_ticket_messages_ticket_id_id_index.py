@@ -0,0 +1,31 @@
+"""add_ticket_messages_ticket_id_id_index
+
+Revision ID: ef59dd13dcc6
+Revises: bd067106ad87
+Create Date: 2026-10-18 10:02:17.884310
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'ef59dd13dcc6'
+down_revision: Union[str, Sequence[str], None] = 'bd067106ad87'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # The composite index covers ticket_id-only lookups, so the single-column one is dropped.
+    op.create_index('ix_ticket_messages_ticket_id_id', 'ticket_messages', ['ticket_id', 'id'], unique=False)
+    op.drop_index(op.f('ix_ticket_messages_ticket_id'), table_name='ticket_messages')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.create_index(op.f('ix_ticket_messages_ticket_id'), 'ticket_messages', ['ticket_id'], unique=False)
+    op.drop_index('ix_ticket_messages_ticket_id_id', table_name='ticket_messages')
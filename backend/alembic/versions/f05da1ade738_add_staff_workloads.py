@@ -0,0 +1,52 @@
+"""add_staff_workloads
+
+Revision ID: f05da1ade738
+Revises: 0cf73fe3df8b
+Create Date: 2026-10-18 14:20:41.902517
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f05da1ade738'
+down_revision: Union[str, Sequence[str], None] = '0cf73fe3df8b'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'staff_workloads',
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('school_id', sa.Integer(), nullable=False),
+        sa.Column('open_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id']),
+        sa.PrimaryKeyConstraint('user_id'),
+    )
+    op.create_index(
+        'ix_staff_workloads_school_id_open_count', 'staff_workloads',
+        ['school_id', 'open_count', 'user_id'],
+        unique=False,
+    )
+    op.execute(
+        """
+        INSERT INTO staff_workloads (user_id, school_id, open_count)
+        SELECT u.id, u.school_id, count(t.id)
+        FROM users u
+        LEFT JOIN tickets t
+            ON t.assigned_to_id = u.id AND t.status != 'RESOLVED' AND t.deleted_at IS NULL
+        WHERE u.role != 'PARENT'
+        GROUP BY u.id, u.school_id
+        """
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_staff_workloads_school_id_open_count', table_name='staff_workloads')
+    op.drop_table('staff_workloads')
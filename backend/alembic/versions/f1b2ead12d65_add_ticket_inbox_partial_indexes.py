@@ -0,0 +1,47 @@
+"""add_ticket_inbox_partial_indexes
+
+Revision ID: f1b2ead12d65
+Revises: ec92b8d95792
+Create Date: 2026-10-18 12:41:53.092716
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f1b2ead12d65'
+down_revision: Union[str, Sequence[str], None] = 'ec92b8d95792'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        'ix_tickets_school_id_created_at_id', 'tickets',
+        ['school_id', sa.text('created_at DESC'), sa.text('id DESC')],
+        unique=False,
+        postgresql_where=sa.text('deleted_at IS NULL'),
+    )
+    op.create_index(
+        'ix_tickets_open_queue', 'tickets',
+        ['school_id', sa.text('updated_at DESC'), sa.text('id DESC')],
+        unique=False,
+        postgresql_where=sa.text("deleted_at IS NULL AND status != 'RESOLVED'"),
+    )
+    op.create_index(
+        'ix_tickets_open_by_assignee', 'tickets',
+        ['assigned_to_id', sa.text('updated_at DESC'), sa.text('id DESC')],
+        unique=False,
+        postgresql_where=sa.text("deleted_at IS NULL AND status != 'RESOLVED'"),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_tickets_open_by_assignee', table_name='tickets')
+    op.drop_index('ix_tickets_open_queue', table_name='tickets')
+    op.drop_index('ix_tickets_school_id_created_at_id', table_name='tickets')
@@ -1,26 +1,32 @@
-# ABOUTME: Admin-only endpoints: abuse list, restrict/block parent, metrics, export.
+# ABOUTME: Admin-only endpoints: abuse list, restrict/block parent, metrics, export, school settings.
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy import select, func
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api.deps import get_db
 from app.core.security import require_roles
-from app.models.announcement import Announcement, AnnouncementRead
-from app.models.ticket import Ticket, TicketReopen, TicketStatus
-from app.models.user import Role, User
+from app.core.user_cache import Principal
+from app.models.announcement import Announcement
+from app.models.ticket import Ticket, TicketStatus
+from app.models.user import Role
+from app.schemas.announcement import AnnouncementReadRate
+from app.schemas.school_settings import SchoolSettingsOut, SchoolSettingsUpdate
 from app.services.abuse_service import (
     block_parent_ticket_creation,
     list_abuse_flagged,
     restrict_parent_to_admin,
 )
+from app.services.announcement_service import list_read_rates
+from app.services.audit_service import log_audit
+from app.services.school_settings import get_school_settings, update_school_settings
 
 router = APIRouter(prefix="/admin", tags=["admin"])
 
 
 @router.get("/abuse-flagged")
 async def get_abuse_flagged(
-    current_user: User = Depends(require_roles(Role.DIRECTOR)),
+    current_user: Principal = Depends(require_roles(Role.DIRECTOR)),
     db: AsyncSession = Depends(get_db),
 ):
     tickets = await list_abuse_flagged(db, current_user.school_id)
@@ -30,7 +36,7 @@ async def get_abuse_flagged(
 @router.post("/users/{user_id}/restrict")
 async def restrict_user(
     user_id: int,
-    current_user: User = Depends(require_roles(Role.DIRECTOR)),
+    current_user: Principal = Depends(require_roles(Role.DIRECTOR)),
     db: AsyncSession = Depends(get_db),
 ):
     user = await restrict_parent_to_admin(db, user_id, current_user)
@@ -42,7 +48,7 @@ async def restrict_user(
 @router.post("/users/{user_id}/block-tickets")
 async def block_user_tickets(
     user_id: int,
-    current_user: User = Depends(require_roles(Role.DIRECTOR)),
+    current_user: Principal = Depends(require_roles(Role.DIRECTOR)),
     db: AsyncSession = Depends(get_db),
 ):
     user = await block_parent_ticket_creation(db, user_id, current_user)
@@ -53,7 +59,7 @@ async def block_user_tickets(
 
 @router.get("/metrics")
 async def get_metrics(
-    current_user: User = Depends(require_roles(Role.DIRECTOR, Role.PRINCIPAL)),
+    current_user: Principal = Depends(require_roles(Role.DIRECTOR, Role.PRINCIPAL)),
     db: AsyncSession = Depends(get_db),
 ):
     q = select(
@@ -61,8 +67,9 @@ async def get_metrics(
         func.count(Ticket.id).filter(Ticket.status == TicketStatus.RESOLVED).label("resolved"),
     ).where(Ticket.school_id == current_user.school_id, Ticket.deleted_at.is_(None))
     r = (await db.execute(q)).one()
-    reopen_count = (await db.execute(select(func.count(TicketReopen.id)))).scalar() or 0
-    ann_q = select(func.count(AnnouncementRead.id)).join(Announcement).where(Announcement.school_id == current_user.school_id)
+    reopen_q = select(func.coalesce(func.sum(Ticket.reopen_count), 0)).where(Ticket.school_id == current_user.school_id)
+    reopen_count = (await db.execute(reopen_q)).scalar()
+    ann_q = select(func.sum(Announcement.read_count)).where(Announcement.school_id == current_user.school_id)
     ann_reads = (await db.execute(ann_q)).scalar() or 0
     return {
         "tickets_total": r.total,
@@ -72,9 +79,29 @@ async def get_metrics(
     }
 
 
+@router.get("/announcements/read-rates", response_model=list[AnnouncementReadRate])
+async def get_announcement_read_rates(
+    limit: int = Query(50, ge=1, le=200),
+    current_user: Principal = Depends(require_roles(Role.DIRECTOR, Role.PRINCIPAL)),
+    db: AsyncSession = Depends(get_db),
+):
+    announcements = await list_read_rates(db, current_user.school_id, limit)
+    return [
+        AnnouncementReadRate(
+            id=a.id,
+            title=a.title,
+            created_at=a.created_at,
+            recipient_count=a.recipient_count,
+            read_count=a.read_count,
+            read_rate=round(min(a.read_count / a.recipient_count, 1.0), 4) if a.recipient_count else 0.0,
+        )
+        for a in announcements
+    ]
+
+
 @router.get("/export/tickets")
 async def export_tickets(
-    current_user: User = Depends(require_roles(Role.DIRECTOR)),
+    current_user: Principal = Depends(require_roles(Role.DIRECTOR)),
     db: AsyncSession = Depends(get_db),
 ):
     result = await db.execute(
@@ -88,3 +115,31 @@ async def export_tickets(
         "watermark": f"Syncdesk export | School ID {current_user.school_id} | For official use only",
         "tickets": [{"id": t.id, "category": t.category.value, "status": t.status.value, "created_at": str(t.created_at)} for t in tickets],
     }
+
+
+@router.get("/school-settings", response_model=SchoolSettingsOut)
+async def read_school_settings(
+    current_user: Principal = Depends(require_roles(Role.DIRECTOR, Role.PRINCIPAL)),
+    db: AsyncSession = Depends(get_db),
+):
+    row = await get_school_settings(db, current_user.school_id)
+    if row is None:
+        return SchoolSettingsOut(school_id=current_user.school_id)
+    return SchoolSettingsOut.model_validate(row)
+
+
+@router.patch("/school-settings", response_model=SchoolSettingsOut)
+async def patch_school_settings(
+    body: SchoolSettingsUpdate,
+    current_user: Principal = Depends(require_roles(Role.DIRECTOR)),
+    db: AsyncSession = Depends(get_db),
+):
+    values = body.model_dump(exclude_unset=True)
+    if "holidays" in values and values["holidays"] is None:
+        values["holidays"] = []
+    row = await update_school_settings(db, current_user.school_id, values)
+    await log_audit(
+        db, current_user.school_id, "school_settings_updated", current_user.id, "school_settings",
+        str(current_user.school_id), f"version {row.version}: {', '.join(sorted(values))}",
+    )
+    return SchoolSettingsOut.model_validate(row)
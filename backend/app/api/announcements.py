@@ -1,49 +1,71 @@
-# ABOUTME: Announcements: list (targeted), create (staff), mark read.
+# ABOUTME: Announcements: list (targeted), create and archive (staff), mark read (one or a batch).
 # ABOUTME: One-way; no replies.
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api.deps import get_db
+from app.core.etag import etag_matches, make_etag, not_modified
 from app.core.security import get_current_user, require_roles
-from app.models.user import Role, User
-from app.schemas.announcement import AnnouncementCreate, AnnouncementOut
+from app.core.user_cache import Principal
+from app.models.user import Role
+from app.schemas.announcement import (
+    AnnouncementCreate,
+    AnnouncementOut,
+    AnnouncementReadBatch,
+    AnnouncementReadBatchOut,
+)
 from app.services.announcement_service import (
+    DEFAULT_FEED_PAGE_SIZE,
+    MAX_FEED_PAGE_SIZE,
+    archive_announcement,
     create_announcement,
-    list_announcements_for_user,
-    mark_announcement_read,
+    decode_announcement_cursor,
+    get_feed_page,
+    get_feed_segment,
+    get_feed_version,
+    mark_announcements_read,
+    visible_announcement_ids,
 )
+from app.services.read_receipts import read_buffer
 
 router = APIRouter(prefix="/announcements", tags=["announcements"])
 
 
 @router.get("", response_model=list[AnnouncementOut])
 async def list_announcements(
-    current_user: User = Depends(get_current_user),
+    response: Response,
+    limit: int = Query(DEFAULT_FEED_PAGE_SIZE, ge=1, le=MAX_FEED_PAGE_SIZE),
+    cursor: str | None = None,
+    if_none_match: str | None = Header(default=None),
+    current_user: Principal = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
-    pairs = await list_announcements_for_user(db, current_user)
-    return [
-        AnnouncementOut(
-            id=a.id,
-            school_id=a.school_id,
-            author_id=a.author_id,
-            title=a.title,
-            content=a.content,
-            target_audience=a.target_audience,
-            target_grade=a.target_grade,
-            target_class=a.target_class,
-            created_at=a.created_at,
-            read=read,
-        )
-        for a, read in pairs
-    ]
+    after = None
+    if cursor is not None:
+        after = decode_announcement_cursor(cursor)
+        if after is None:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor.")
+    segment = await get_feed_segment(db, current_user)
+    pending_reads = read_buffer.pending_for(current_user.id)
+    etag = make_etag(
+        "announcements", current_user.id, segment, limit, cursor, len(pending_reads),
+        *await get_feed_version(db, segment, current_user.id),
+    )
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+    response.headers["ETag"] = etag
+    page = await get_feed_page(db, current_user, segment, limit=limit, after=after)
+    read_ids = page.read_ids | pending_reads
+    if page.next_cursor is not None:
+        response.headers["X-Next-Cursor"] = page.next_cursor
+    return [AnnouncementOut(**item, read=item["id"] in read_ids) for item in page.items]
 
 
 @router.post("", response_model=AnnouncementOut)
 async def post_announcement(
     body: AnnouncementCreate,
-    current_user: User = Depends(require_roles(Role.DIRECTOR, Role.PRINCIPAL, Role.VICE_PRINCIPAL)),
+    current_user: Principal = Depends(require_roles(Role.DIRECTOR, Role.PRINCIPAL, Role.VICE_PRINCIPAL)),
     db: AsyncSession = Depends(get_db),
 ):
     a = await create_announcement(
@@ -65,13 +87,47 @@ async def post_announcement(
     )
 
 
+@router.post("/{announcement_id}/archive")
+async def archive(
+    announcement_id: int,
+    current_user: Principal = Depends(require_roles(Role.DIRECTOR, Role.PRINCIPAL, Role.VICE_PRINCIPAL)),
+    db: AsyncSession = Depends(get_db),
+):
+    if await archive_announcement(db, current_user.school_id, announcement_id) is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Announcement not found.")
+    return {"message": "Archived."}
+
+
+async def _record_reads(db: AsyncSession, user: Principal, announcement_ids: list[int]) -> set[int]:
+    """Visible ids among announcement_ids. Receipts go to the write-behind buffer when it is running
+    and has room; otherwise they are written now."""
+    if not read_buffer.accepting():
+        return await mark_announcements_read(db, user, announcement_ids)
+    visible = await visible_announcement_ids(db, user, announcement_ids)
+    read_buffer.add(user.id, visible)
+    return visible
+
+
+@router.post("/read", response_model=AnnouncementReadBatchOut)
+async def read_announcements(
+    body: AnnouncementReadBatch,
+    current_user: Principal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    ids = list(dict.fromkeys(body.announcement_ids))
+    marked = await _record_reads(db, current_user, ids)
+    return AnnouncementReadBatchOut(
+        marked=[i for i in ids if i in marked],
+        not_found=[i for i in ids if i not in marked],
+    )
+
+
 @router.post("/{announcement_id}/read")
 async def read_announcement(
     announcement_id: int,
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
-    ok = await mark_announcement_read(db, announcement_id, current_user.id)
-    if not ok:
+    if announcement_id not in await _record_reads(db, current_user, [announcement_id]):
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Announcement not found.")
     return {"message": "Marked as read."}
@@ -1,31 +1,40 @@
 # ABOUTME: Config endpoints: office hours and banner text for off-hours.
+# ABOUTME: Reads the school's cached settings; no database work once the school is cached.
 
 from datetime import datetime
 
 from fastapi import APIRouter, Depends
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api.deps import get_db
-from app.core.config import get_settings
 from app.core.security import get_current_user
-from app.models.user import User
+from app.core.user_cache import Principal
+from app.services.school_settings import get_school_config
 
 router = APIRouter(prefix="/config", tags=["config"])
 
 
 @router.get("/office-hours")
 async def office_hours(
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
 ):
-    settings = get_settings()
-    try:
-        start = datetime.strptime(settings.office_hours_start, "%H:%M").time()
-        end = datetime.strptime(settings.office_hours_end, "%H:%M").time()
-    except ValueError:
-        start = datetime.strptime("08:00", "%H:%M").time()
-        end = datetime.strptime("17:00", "%H:%M").time()
-    now = datetime.utcnow().time()
-    in_hours = start <= now <= end if start <= end else (now >= start or now <= end)
+    config = await get_school_config(db, current_user.school_id)
+    local_now = datetime.now(config.timezone)
+    now = local_now.time()
+    start, end = config.start, config.end
+    holiday = local_now.date() in config.holidays
+    in_hours = not holiday and (start <= now <= end if start <= end else (now >= start or now <= end))
     banner = None
-    if not in_hours:
-        banner = f"School office hours are {settings.office_hours_start}–{settings.office_hours_end}. Requests will be addressed next working day."
-    return {"in_office_hours": in_hours, "banner": banner, "start": settings.office_hours_start, "end": settings.office_hours_end}
+    if holiday:
+        banner = "The school office is closed today for a holiday. Requests will be addressed next working day."
+    elif not in_hours:
+        banner = f"School office hours are {config.office_hours_start}–{config.office_hours_end}. Requests will be addressed next working day."
+    return {
+        "in_office_hours": in_hours,
+        "banner": banner,
+        "start": config.office_hours_start,
+        "end": config.office_hours_end,
+        "timezone": config.timezone.key,
+        "holiday": holiday,
+    }
@@ -1,11 +1,19 @@
 # ABOUTME: Health check endpoint for liveness/readiness.
-# ABOUTME: Returns status and optional dependency checks.
+# ABOUTME: Returns status and optional dependency checks; /metrics reports in-process queue and cache stats.
 
 from fastapi import APIRouter
 
+from app.services.feed_cache import feed_cache
+from app.services.read_receipts import read_buffer
+
 router = APIRouter()
 
 
 @router.get("", status_code=200)
 async def health():
     return {"status": "ok"}
+
+
+@router.get("/metrics", status_code=200)
+async def metrics():
+    return {"read_receipts": read_buffer.metrics(), "feed_cache": feed_cache.metrics()}
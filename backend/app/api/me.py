@@ -1,26 +1,29 @@
 # ABOUTME: Current user (me) endpoints; used for auth and role testing.
-# ABOUTME: GET /me and GET /me/students.
+# ABOUTME: GET /me, GET /me/students and GET /me/ticket-creation-status.
 
 from fastapi import APIRouter, Depends
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.api.deps import get_db
 from app.core.security import get_current_user
+from app.core.user_cache import Principal
 from app.models.student import Student, parent_students
-from app.models.user import Role, User
+from app.models.user import Role
 from app.schemas.student import StudentOut, student_to_out
+from app.schemas.ticket import TicketCreationStatus
+from app.services.guardrails import get_creation_status
 
 router = APIRouter(prefix="/me", tags=["me"])
 
 
 @router.get("")
-async def me(user: User = Depends(get_current_user)):
+async def me(user: Principal = Depends(get_current_user)):
     return {"id": user.id, "phone": user.phone, "role": user.role.value, "school_id": user.school_id}
 
 
 @router.get("/students", response_model=list[StudentOut])
 async def my_students(
-    user: User = Depends(get_current_user),
+    user: Principal = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
     if user.role != Role.PARENT:
@@ -35,3 +38,17 @@ async def my_students(
     )
     students = result.scalars().all()
     return [student_to_out(s) for s in students]
+
+
+@router.get("/ticket-creation-status", response_model=TicketCreationStatus)
+async def ticket_creation_status(
+    user: Principal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    status = await get_creation_status(db, user)
+    return TicketCreationStatus(
+        blocked=status.blocked,
+        reason=status.reason,
+        block_until=status.block_until,
+        remaining=status.remaining,
+    )
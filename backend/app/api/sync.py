@@ -0,0 +1,86 @@
+# ABOUTME: Delta sync endpoint for the offline-capable PWA.
+# ABOUTME: GET /sync?since=<token> returns only rows changed since the token, plus tombstones.
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.deps import get_db
+from app.core.security import get_current_user
+from app.core.user_cache import Principal
+from app.schemas.announcement import AnnouncementOut
+from app.schemas.sync import SyncOut, SyncTicketOut
+from app.schemas.ticket import MessageOut
+from app.services.sync_service import SYNC_PAGE_SIZE, decode_sync_token, encode_sync_token, get_sync_delta
+from app.services.ticket_service import get_staff_flags, get_ticket_student_ids_map
+
+router = APIRouter(prefix="/sync", tags=["sync"])
+
+
+@router.get("", response_model=SyncOut)
+async def sync(
+    since: str | None = None,
+    limit: int = Query(SYNC_PAGE_SIZE, ge=1, le=SYNC_PAGE_SIZE),
+    current_user: Principal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    mark = None
+    if since is not None:
+        mark = decode_sync_token(since)
+        if mark is None:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid sync token.")
+    delta = await get_sync_delta(db, current_user, mark, limit=limit)
+    student_ids = await get_ticket_student_ids_map(db, [t.id for t in delta.tickets])
+    is_staff = await get_staff_flags(db, list({m.sender_id for m in delta.messages}))
+    read_ids = set(delta.read_announcement_ids)
+    return SyncOut(
+        token=encode_sync_token(delta.mark),
+        has_more=delta.has_more,
+        tickets=[
+            SyncTicketOut(
+                id=t.id,
+                created_by_id=t.created_by_id,
+                category=t.category,
+                status=t.status.value,
+                urgency=t.urgency,
+                assigned_to_id=t.assigned_to_id,
+                title=t.title,
+                description=t.description,
+                known_issue=t.known_issue,
+                satisfied_at=t.satisfied_at,
+                created_at=t.created_at,
+                updated_at=t.updated_at,
+                message_count=t.message_count,
+                student_ids=student_ids[t.id],
+            )
+            for t in delta.tickets
+        ],
+        messages=[
+            MessageOut(
+                id=m.id,
+                ticket_id=m.ticket_id,
+                sender_id=m.sender_id,
+                body=m.body,
+                created_at=m.created_at,
+                is_staff=is_staff.get(m.sender_id, False),
+            )
+            for m in delta.messages
+        ],
+        announcements=[
+            AnnouncementOut(
+                id=a.id,
+                school_id=a.school_id,
+                author_id=a.author_id,
+                title=a.title,
+                content=a.content,
+                target_audience=a.target_audience,
+                target_grade=a.target_grade,
+                target_class=a.target_class,
+                created_at=a.created_at,
+                read=a.id in read_ids,
+            )
+            for a in delta.announcements
+        ],
+        read_announcement_ids=delta.read_announcement_ids,
+        deleted_ticket_ids=delta.deleted_ticket_ids,
+        archived_announcement_ids=delta.archived_announcement_ids,
+    )
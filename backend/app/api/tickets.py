@@ -1,30 +1,67 @@
 # ABOUTME: Ticket CRUD, reply, and internal notes endpoints.
 # ABOUTME: Parents see own tickets; staff see by school; internal notes hidden from parents.
 
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy import select
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api.deps import get_db
+from app.core.db import get_session_factory
+from app.core.etag import etag_matches, make_etag, not_modified
 from app.core.security import get_current_user, require_roles
-from app.models.ticket import TicketCategory, TicketStatus
+from app.core.user_cache import Principal
+from app.models.ticket import Ticket, TicketCategory, TicketStatus
 from app.models.user import Role, User
-from app.schemas.ticket import InternalNoteIn, KnownIssueUpdate, MessageIn, MessageOut, ReopenIn, StatusUpdate, TicketCreate, TicketOut
+from app.schemas.ticket import (
+    BulkTicketOperation,
+    BulkTicketOut,
+    BulkTicketResult,
+    InternalNoteIn,
+    KnownIssueUpdate,
+    MessageIn,
+    MessageOut,
+    ReopenIn,
+    RouteUpdate,
+    StatusUpdate,
+    TicketCreate,
+    TicketDeltaOut,
+    TicketFilters,
+    TicketOut,
+    TicketSearchHit,
+    TicketSummaryOut,
+)
 from app.services.abuse_service import flag_abuse
-from app.services.audit_service import log_audit
+from app.services.audit_service import log_audit, log_audit_many
+from app.services.events import broker
 from app.services.guardrails import check_guardrails
 from app.services.ticket_service import (
+    DEFAULT_PAGE_SIZE,
+    DEFAULT_TICKET_SORT,
+    MAX_MESSAGE_PAGE_SIZE,
+    MAX_PAGE_SIZE,
+    MAX_SEARCH_RESULTS,
+    MESSAGE_PAGE_SIZE,
+    ROUTING_ROLES,
     add_internal_note,
     add_reply,
+    bulk_update_tickets,
     create_ticket,
-    get_internal_notes_count,
-    get_ticket_for_user,
-    get_ticket_messages,
-    get_ticket_student_ids,
+    decode_ticket_cursor,
+    encode_ticket_cursor,
     get_parent_student_ids,
+    get_staff_flags,
+    get_ticket_for_user,
+    get_ticket_list_version,
+    get_ticket_messages_map,
+    get_ticket_messages_page,
+    get_ticket_student_ids_map,
+    get_ticket_version,
+    list_ticket_summaries_for_user,
     list_tickets_for_user,
     mark_satisfied,
     request_reopen,
+    route_ticket,
+    search_tickets_for_user,
     set_ticket_known_issue,
     set_ticket_status,
 )
@@ -43,22 +80,37 @@ def _message_to_out(msg, is_staff_map: dict[int, bool]) -> MessageOut:
     )
 
 
-async def _ticket_to_out(
+def _prefers_minimal(prefer: str | None) -> bool:
+    if not prefer:
+        return False
+    return any(p.strip().lower() == "return=minimal" for p in prefer.replace(";", ",").split(","))
+
+
+async def _ticket_delta(
     session: AsyncSession,
+    ticket_id: int,
+    response: Response,
+    message: MessageOut | None = None,
+) -> TicketDeltaOut:
+    # The mutation already loaded the ticket into this session, so this is an identity-map hit.
+    ticket = await session.get(Ticket, ticket_id)
+    response.headers["Preference-Applied"] = "return=minimal"
+    return TicketDeltaOut(
+        id=ticket.id,
+        status=ticket.status.value,
+        updated_at=ticket.updated_at,
+        known_issue=ticket.known_issue,
+        message=message,
+    )
+
+
+def _build_ticket_out(
     ticket,
-    current_user: User,
+    student_ids: list[int],
+    messages: list,
+    is_staff_map: dict[int, bool],
+    internal_notes_count: int | None,
 ) -> TicketOut:
-    student_ids = await get_ticket_student_ids(session, ticket.id)
-    messages = await get_ticket_messages(session, ticket.id)
-    sender_ids = list({m.sender_id for m in messages})
-    is_staff_map = {}
-    if sender_ids:
-        result = await session.execute(select(User).where(User.id.in_(sender_ids)))
-        for u in result.scalars().all():
-            is_staff_map[u.id] = u.role != Role.PARENT
-    internal_notes_count = None
-    if current_user.role != Role.PARENT:
-        internal_notes_count = await get_internal_notes_count(session, ticket.id)
     return TicketOut(
         id=ticket.id,
         school_id=ticket.school_id,
@@ -77,13 +129,48 @@ async def _ticket_to_out(
         satisfied_at=getattr(ticket, "satisfied_at", None),
         transport_footer="No action required from parents." if ticket.category == TicketCategory.TRANSPORT else None,
         known_issue=getattr(ticket, "known_issue", False),
+        routed_role=ticket.routed_role,
     )
 
 
+async def _tickets_to_out(
+    session: AsyncSession,
+    tickets: list,
+    current_user: Principal,
+) -> list[TicketOut]:
+    """Render a page of tickets with a fixed number of queries, independent of page size."""
+    if not tickets:
+        return []
+    ticket_ids = [t.id for t in tickets]
+    student_ids_map = await get_ticket_student_ids_map(session, ticket_ids)
+    messages_map = await get_ticket_messages_map(session, ticket_ids)
+    sender_ids = list({m.sender_id for msgs in messages_map.values() for m in msgs})
+    is_staff_map = await get_staff_flags(session, sender_ids)
+    is_parent = current_user.role == Role.PARENT
+    return [
+        _build_ticket_out(
+            t,
+            student_ids_map[t.id],
+            messages_map[t.id],
+            is_staff_map,
+            None if is_parent else t.internal_notes_count,
+        )
+        for t in tickets
+    ]
+
+
+async def _ticket_to_out(
+    session: AsyncSession,
+    ticket,
+    current_user: Principal,
+) -> TicketOut:
+    return (await _tickets_to_out(session, [ticket], current_user))[0]
+
+
 @router.post("", response_model=TicketOut)
 async def post_ticket(
     body: TicketCreate,
-    current_user: User = Depends(require_roles(Role.PARENT)),
+    current_user: Principal = Depends(require_roles(Role.PARENT)),
     db: AsyncSession = Depends(get_db),
 ):
     guardrail_error = await check_guardrails(db, current_user, body.category, body.urgency)
@@ -109,46 +196,297 @@ async def post_ticket(
     return await _ticket_to_out(db, ticket, current_user)
 
 
+SORT_PATTERN = "^-?(updated_at|created_at)$"
+
+
+def ticket_filters(
+    status: str | None = Query(None, pattern="^(pending|in_progress|resolved|open)$"),
+    category: TicketCategory | None = None,
+    urgency: bool | None = None,
+    assigned_to: int | None = None,
+    known_issue: bool | None = None,
+    abuse_flagged: bool | None = None,
+    routed_role: Role | None = None,
+) -> TicketFilters:
+    return TicketFilters(
+        status=status,
+        category=category,
+        urgency=urgency,
+        assigned_to=assigned_to,
+        known_issue=known_issue,
+        abuse_flagged=abuse_flagged,
+        routed_role=routed_role,
+    )
+
+
+def _parse_cursor(cursor: str | None, sort: str) -> tuple | None:
+    if cursor is None:
+        return None
+    after = decode_ticket_cursor(cursor, sort)
+    if after is None:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor.")
+    return after
+
+
+def _trim_page(rows: list, limit: int, response: Response, sort: str) -> list:
+    """Drop the look-ahead row; sets X-Next-Cursor when more tickets follow."""
+    if len(rows) > limit:
+        rows = rows[:limit]
+        response.headers["X-Next-Cursor"] = encode_ticket_cursor(rows[-1], sort)
+    return rows
+
+
 @router.get("", response_model=list[TicketOut])
 async def list_tickets(
-    current_user: User = Depends(get_current_user),
+    response: Response,
+    filters: TicketFilters = Depends(ticket_filters),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: str | None = None,
+    sort: str = Query(DEFAULT_TICKET_SORT, pattern=SORT_PATTERN),
+    if_none_match: str | None = Header(default=None),
+    current_user: Principal = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
-    tickets = await list_tickets_for_user(db, current_user)
-    return [await _ticket_to_out(db, t, current_user) for t in tickets]
+    version = await get_ticket_list_version(db, current_user)
+    etag = make_etag(
+        "tickets", current_user.id, current_user.role.value, limit, cursor, sort, filters.model_dump_json(), *version
+    )
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+    response.headers["ETag"] = etag
+    tickets = await list_tickets_for_user(
+        db, current_user, limit=limit + 1, after=_parse_cursor(cursor, sort), sort=sort, filters=filters
+    )
+    tickets = _trim_page(tickets, limit, response, sort)
+    return await _tickets_to_out(db, tickets, current_user)
+
+
+async def _summary_page(
+    db: AsyncSession,
+    current_user: Principal,
+    response: Response,
+    filters: TicketFilters,
+    limit: int,
+    cursor: str | None,
+    sort: str,
+    if_none_match: str | None,
+    view: str,
+):
+    version = await get_ticket_list_version(db, current_user)
+    etag = make_etag(view, current_user.id, current_user.role.value, limit, cursor, sort, filters.model_dump_json(), *version)
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+    response.headers["ETag"] = etag
+    rows = await list_ticket_summaries_for_user(
+        db, current_user, limit=limit + 1, after=_parse_cursor(cursor, sort), sort=sort, filters=filters
+    )
+    rows = _trim_page(rows, limit, response, sort)
+    return [
+        TicketSummaryOut(
+            id=r.id,
+            created_by_id=r.created_by_id,
+            category=r.category,
+            status=r.status.value,
+            urgency=r.urgency,
+            assigned_to_id=r.assigned_to_id,
+            title=r.title,
+            known_issue=r.known_issue,
+            created_at=r.created_at,
+            updated_at=r.updated_at,
+            routed_role=r.routed_role,
+            message_count=r.message_count,
+            last_message_preview=r.last_message_preview,
+            last_activity_at=r.last_activity_at,
+        )
+        for r in rows
+    ]
+
+
+@router.get("/summary", response_model=list[TicketSummaryOut])
+async def list_ticket_summaries(
+    response: Response,
+    filters: TicketFilters = Depends(ticket_filters),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: str | None = None,
+    sort: str = Query(DEFAULT_TICKET_SORT, pattern=SORT_PATTERN),
+    if_none_match: str | None = Header(default=None),
+    current_user: Principal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    return await _summary_page(db, current_user, response, filters, limit, cursor, sort, if_none_match, "ticket-summaries")
+
+
+@router.get("/queue", response_model=list[TicketSummaryOut])
+async def list_ticket_queue(
+    response: Response,
+    filters: TicketFilters = Depends(ticket_filters),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: str | None = None,
+    sort: str = Query(DEFAULT_TICKET_SORT, pattern=SORT_PATTERN),
+    if_none_match: str | None = Header(default=None),
+    current_user: Principal = Depends(require_roles(Role.DIRECTOR, Role.PRINCIPAL, Role.VICE_PRINCIPAL, Role.TEACHER, Role.OFFICE, Role.TRANSPORT)),
+    db: AsyncSession = Depends(get_db),
+):
+    """The caller's role queue. Director and principal see every queue (optionally narrowed by routed_role)."""
+    if current_user.role not in ROUTING_ROLES:
+        filters = filters.model_copy(update={"routed_role": current_user.role})
+    return await _summary_page(db, current_user, response, filters, limit, cursor, sort, if_none_match, "ticket-queue")
+
+
+@router.get("/search", response_model=list[TicketSearchHit])
+async def search_tickets(
+    q: str = Query(..., min_length=2, max_length=200),
+    limit: int = Query(20, ge=1, le=MAX_SEARCH_RESULTS),
+    current_user: Principal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    rows = await search_tickets_for_user(db, current_user, q.strip(), limit=limit)
+    return [
+        TicketSearchHit(
+            id=r.id,
+            title=r.title,
+            status=r.status.value,
+            category=r.category,
+            updated_at=r.updated_at,
+            rank=r.rank,
+            snippet=r.snippet,
+            message_snippet=r.message_snippet,
+        )
+        for r in rows
+    ]
+
+
+@router.post("/bulk", response_model=BulkTicketOut)
+async def bulk_update(
+    body: BulkTicketOperation,
+    current_user: Principal = Depends(require_roles(Role.DIRECTOR, Role.PRINCIPAL, Role.VICE_PRINCIPAL, Role.TEACHER, Role.OFFICE, Role.TRANSPORT)),
+    db: AsyncSession = Depends(get_db),
+):
+    category = None
+    if body.operation == "status":
+        if body.status is None:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="status is required.")
+        values = {"status": TicketStatus(body.status)}
+        action, details = "ticket_status_changed", body.status
+    elif body.operation == "known_issue":
+        if body.known_issue is None:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="known_issue is required.")
+        if current_user.role != Role.TRANSPORT:
+            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Only transport staff can mark known issues.")
+        values = {"known_issue": body.known_issue}
+        category = TicketCategory.TRANSPORT
+        action, details = "ticket_known_issue_changed", str(body.known_issue).lower()
+    else:
+        if body.assigned_to_id is not None:
+            assignee = await db.get(User, body.assigned_to_id)
+            if not assignee or assignee.school_id != current_user.school_id or assignee.role == Role.PARENT:
+                raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid assignee.")
+        values = {"assigned_to_id": body.assigned_to_id}
+        action, details = "ticket_assigned", str(body.assigned_to_id)
+    updated, errors = await bulk_update_tickets(db, current_user, body.ticket_ids, values, category=category)
+    await log_audit_many(
+        db,
+        [
+            {
+                "school_id": current_user.school_id,
+                "user_id": current_user.id,
+                "action": action,
+                "resource_type": "ticket",
+                "resource_id": str(tid),
+                "details": details,
+            }
+            for tid in updated
+        ],
+    )
+    results = [
+        BulkTicketResult(id=tid, ok=tid not in errors, error=errors.get(tid))
+        for tid in dict.fromkeys(body.ticket_ids)
+    ]
+    return BulkTicketOut(updated=len(updated), results=results)
+
+
+@router.get("/events")
+async def ticket_events(
+    request: Request,
+    authorization: str | None = Header(default=None, alias="Authorization"),
+    last_event_id: str | None = Header(default=None),
+):
+    """SSE stream of ticket events visible to the caller. Resumes from Last-Event-ID while buffered."""
+    # Authenticate with a short-lived session: a long-lived stream must not pin a DB connection.
+    async with get_session_factory(request.app.state.engine)() as db:
+        current_user = await get_current_user(authorization, db)
+    sub, replay, resync = broker.subscribe(current_user, last_event_id)
+    return StreamingResponse(
+        broker.stream(sub, replay, resync),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 
 @router.get("/{ticket_id}", response_model=TicketOut)
 async def get_ticket(
     ticket_id: int,
-    current_user: User = Depends(get_current_user),
+    response: Response,
+    if_none_match: str | None = Header(default=None),
+    current_user: Principal = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
+    version = await get_ticket_version(db, ticket_id, current_user)
+    if version is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Ticket not found")
+    etag = make_etag("ticket", ticket_id, current_user.role.value, *version)
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+    response.headers["ETag"] = etag
     ticket = await get_ticket_for_user(db, ticket_id, current_user)
     if not ticket:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Ticket not found")
     return await _ticket_to_out(db, ticket, current_user)
 
 
-@router.post("/{ticket_id}/reply", response_model=TicketOut)
+@router.get("/{ticket_id}/messages", response_model=list[MessageOut])
+async def list_ticket_messages(
+    ticket_id: int,
+    after_id: int | None = None,
+    before_id: int | None = None,
+    limit: int = Query(MESSAGE_PAGE_SIZE, ge=1, le=MAX_MESSAGE_PAGE_SIZE),
+    current_user: Principal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    ticket = await get_ticket_for_user(db, ticket_id, current_user)
+    if not ticket:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Ticket not found")
+    messages = await get_ticket_messages_page(db, ticket_id, after_id=after_id, before_id=before_id, limit=limit)
+    is_staff_map = await get_staff_flags(db, list({m.sender_id for m in messages}))
+    return [_message_to_out(m, is_staff_map) for m in messages]
+
+
+@router.post("/{ticket_id}/reply", response_model=TicketOut | TicketDeltaOut)
 async def reply_ticket(
     ticket_id: int,
     body: MessageIn,
-    current_user: User = Depends(get_current_user),
+    response: Response,
+    prefer: str | None = Header(default=None),
+    current_user: Principal = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
     msg = await add_reply(db, ticket_id, current_user, body.body)
     if not msg:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Ticket not found")
+    if _prefers_minimal(prefer):
+        message = _message_to_out(msg, {current_user.id: current_user.role != Role.PARENT})
+        return await _ticket_delta(db, ticket_id, response, message)
     ticket = await get_ticket_for_user(db, ticket_id, current_user)
     return await _ticket_to_out(db, ticket, current_user)
 
 
-@router.patch("/{ticket_id}/status", response_model=TicketOut)
+@router.patch("/{ticket_id}/status", response_model=TicketOut | TicketDeltaOut)
 async def update_ticket_status(
     ticket_id: int,
     body: StatusUpdate,
-    current_user: User = Depends(require_roles(Role.DIRECTOR, Role.PRINCIPAL, Role.VICE_PRINCIPAL, Role.TEACHER, Role.OFFICE, Role.TRANSPORT)),
+    response: Response,
+    prefer: str | None = Header(default=None),
+    current_user: Principal = Depends(require_roles(Role.DIRECTOR, Role.PRINCIPAL, Role.VICE_PRINCIPAL, Role.TEACHER, Role.OFFICE, Role.TRANSPORT)),
     db: AsyncSession = Depends(get_db),
 ):
     status_map = {"in_progress": TicketStatus.IN_PROGRESS, "resolved": TicketStatus.RESOLVED}
@@ -157,6 +495,8 @@ async def update_ticket_status(
     ok = await set_ticket_status(db, ticket_id, current_user, status_map[body.status])
     if not ok:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Ticket not found.")
+    if _prefers_minimal(prefer):
+        return await _ticket_delta(db, ticket_id, response)
     ticket = await get_ticket_for_user(db, ticket_id, current_user)
     return await _ticket_to_out(db, ticket, current_user)
 
@@ -165,7 +505,7 @@ async def update_ticket_status(
 async def reopen_ticket(
     ticket_id: int,
     body: ReopenIn,
-    current_user: User = Depends(require_roles(Role.PARENT)),
+    current_user: Principal = Depends(require_roles(Role.PARENT)),
     db: AsyncSession = Depends(get_db),
 ):
     reopen = await request_reopen(db, ticket_id, current_user, body.reason)
@@ -180,7 +520,7 @@ async def reopen_ticket(
 @router.post("/{ticket_id}/satisfied")
 async def satisfied_ticket(
     ticket_id: int,
-    current_user: User = Depends(require_roles(Role.PARENT)),
+    current_user: Principal = Depends(require_roles(Role.PARENT)),
     db: AsyncSession = Depends(get_db),
 ):
     ok = await mark_satisfied(db, ticket_id, current_user)
@@ -193,20 +533,49 @@ async def satisfied_ticket(
 async def update_known_issue(
     ticket_id: int,
     body: KnownIssueUpdate,
-    current_user: User = Depends(require_roles(Role.TRANSPORT)),
+    response: Response,
+    prefer: str | None = Header(default=None),
+    current_user: Principal = Depends(require_roles(Role.TRANSPORT)),
     db: AsyncSession = Depends(get_db),
 ):
     ok = await set_ticket_known_issue(db, ticket_id, current_user, body.known_issue)
     if not ok:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Ticket not found.")
+    if _prefers_minimal(prefer):
+        return await _ticket_delta(db, ticket_id, response)
     ticket = await get_ticket_for_user(db, ticket_id, current_user)
     return await _ticket_to_out(db, ticket, current_user)
 
 
+@router.patch("/{ticket_id}/route")
+async def update_ticket_route(
+    ticket_id: int,
+    body: RouteUpdate,
+    response: Response,
+    prefer: str | None = Header(default=None),
+    current_user: Principal = Depends(require_roles(*ROUTING_ROLES)),
+    db: AsyncSession = Depends(get_db),
+):
+    if body.role == Role.PARENT:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Tickets cannot be routed to parents.")
+    ticket = await get_ticket_for_user(db, ticket_id, current_user)
+    if not ticket:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Ticket not found.")
+    previous = ticket.routed_role
+    ticket = await route_ticket(db, ticket_id, current_user, body.role)
+    await log_audit(
+        db, current_user.school_id, "ticket_rerouted", current_user.id, "ticket", str(ticket_id),
+        f"{previous.value} -> {body.role.value}",
+    )
+    if _prefers_minimal(prefer):
+        return await _ticket_delta(db, ticket_id, response)
+    return await _ticket_to_out(db, ticket, current_user)
+
+
 @router.post("/{ticket_id}/flag-abuse")
 async def flag_ticket_abuse(
     ticket_id: int,
-    current_user: User = Depends(require_roles(Role.DIRECTOR, Role.PRINCIPAL, Role.VICE_PRINCIPAL, Role.TEACHER, Role.OFFICE, Role.TRANSPORT)),
+    current_user: Principal = Depends(require_roles(Role.DIRECTOR, Role.PRINCIPAL, Role.VICE_PRINCIPAL, Role.TEACHER, Role.OFFICE, Role.TRANSPORT)),
     db: AsyncSession = Depends(get_db),
 ):
     ticket = await flag_abuse(db, ticket_id, current_user)
@@ -220,7 +589,7 @@ async def flag_ticket_abuse(
 async def post_internal_note(
     ticket_id: int,
     body: InternalNoteIn,
-    current_user: User = Depends(require_roles(Role.DIRECTOR, Role.PRINCIPAL, Role.VICE_PRINCIPAL, Role.TEACHER, Role.OFFICE, Role.TRANSPORT)),
+    current_user: Principal = Depends(require_roles(Role.DIRECTOR, Role.PRINCIPAL, Role.VICE_PRINCIPAL, Role.TEACHER, Role.OFFICE, Role.TRANSPORT)),
     db: AsyncSession = Depends(get_db),
 ):
     note = await add_internal_note(db, ticket_id, current_user, body.body)
@@ -0,0 +1,100 @@
+# ABOUTME: Benchmark for automatic assignment latency against a seeded open-ticket backlog.
+# ABOUTME: Run `python -m app.bench_assignment [--open-tickets 1000]`; all data is rolled back.
+
+import argparse
+import asyncio
+import statistics
+import time
+import uuid
+
+from sqlalchemy import func, insert, select
+
+from app.core.config import get_settings
+from app.core.db import get_engine, get_session_factory
+from app.models.ticket import Ticket, TicketCategory, TicketStatus
+from app.models.user import Role, User
+from app.services.assignment import pick_assignee
+
+
+async def _seed(session, school_id: int, staff: int, open_tickets: int) -> None:
+    parent = User(phone=f"+91990{uuid.uuid4().hex[:7]}", role=Role.PARENT, school_id=school_id)
+    teachers = [User(phone=f"+91991{uuid.uuid4().hex[:7]}", role=Role.TEACHER, school_id=school_id) for _ in range(staff)]
+    session.add_all([parent, *teachers])
+    await session.flush()
+    await session.execute(
+        insert(Ticket),
+        [
+            {
+                "school_id": school_id,
+                "created_by_id": parent.id,
+                "category": TicketCategory.ACADEMIC_TEACHING,
+                "status": TicketStatus.PENDING,
+                "routed_role": Role.TEACHER,
+                "assigned_to_id": teachers[i % staff].id,
+            }
+            for i in range(open_tickets)
+        ],
+    )
+
+
+async def _recount_pick(session, school_id: int, role: Role) -> int | None:
+    """The approach assignment replaces: recount open tickets per assignee on every create."""
+    open_counts = (
+        select(Ticket.assigned_to_id, func.count().label("n"))
+        .where(Ticket.school_id == school_id, Ticket.status != TicketStatus.RESOLVED, Ticket.deleted_at.is_(None))
+        .group_by(Ticket.assigned_to_id)
+        .subquery()
+    )
+    return await session.scalar(
+        select(User.id)
+        .outerjoin(open_counts, open_counts.c.assigned_to_id == User.id)
+        .where(User.school_id == school_id, User.role == role)
+        .order_by(func.coalesce(open_counts.c.n, 0), User.id)
+        .limit(1)
+    )
+
+
+async def _time(fn, iterations: int) -> list[float]:
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        await fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+def _report(label: str, samples: list[float]) -> None:
+    ordered = sorted(samples)
+    p95 = ordered[int(len(ordered) * 0.95) - 1]
+    print(f"{label:<18} p50={statistics.median(ordered):.2f}ms p95={p95:.2f}ms max={ordered[-1]:.2f}ms")
+
+
+async def run(open_tickets: int, staff: int, iterations: int) -> None:
+    settings = get_settings()
+    engine = get_engine(settings.database_url)
+    factory = get_session_factory(engine)
+    school_id = 900_000 + uuid.uuid4().int % 100_000
+    try:
+        async with factory() as session:
+            await _seed(session, school_id, staff, open_tickets)
+            # First pick seeds staff_workloads with a one-off recount; keep it out of the samples.
+            await pick_assignee(session, school_id, Role.TEACHER)
+            print(f"school={school_id} staff={staff} open_tickets={open_tickets} iterations={iterations}")
+            _report("pick_assignee", await _time(lambda: pick_assignee(session, school_id, Role.TEACHER), iterations))
+            _report("recount baseline", await _time(lambda: _recount_pick(session, school_id, Role.TEACHER), iterations))
+            await session.rollback()
+    finally:
+        await engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark automatic ticket assignment latency.")
+    parser.add_argument("--open-tickets", type=int, default=1000)
+    parser.add_argument("--staff", type=int, default=20)
+    parser.add_argument("--iterations", type=int, default=200)
+    args = parser.parse_args()
+    asyncio.run(run(args.open_tickets, args.staff, args.iterations))
+
+
+if __name__ == "__main__":
+    main()
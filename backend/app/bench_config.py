@@ -0,0 +1,66 @@
+# ABOUTME: Microbenchmark for per-request config CPU: Settings() and office-hours parsing per call vs cached.
+# ABOUTME: Run `python -m app.bench_config [--iterations 2000]`; needs no database.
+
+import argparse
+import os
+import statistics
+import time
+from datetime import datetime
+
+from jose import jwt
+
+from app.core.config import Settings, get_settings
+from app.core.security import decode_access_token
+from app.models.user import Role
+from app.services.auth_service import create_access_token
+from app.services.school_settings import resolve_config, school_settings_cache
+
+
+def _uncached_request(token: str) -> None:
+    """The previous per-request work: build Settings (re-reading .env) to decode the token, then again
+    for office hours, parsing both times."""
+    jwt.decode(token, Settings().jwt_access_secret, algorithms=["HS256"])
+    settings = Settings()
+    datetime.strptime(settings.office_hours_start, "%H:%M").time()
+    datetime.strptime(settings.office_hours_end, "%H:%M").time()
+
+
+def _cached_request(token: str) -> None:
+    decode_access_token(token)
+    school_settings_cache.get(1)
+
+
+def _time(fn, token: str, iterations: int) -> list[float]:
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        fn(token)
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+def _report(label: str, samples: list[float]) -> None:
+    samples = sorted(samples)
+    p95 = samples[int(len(samples) * 0.95) - 1]
+    print(f"{label:>16}: mean={statistics.mean(samples):.4f}ms p50={statistics.median(samples):.4f}ms p95={p95:.4f}ms")
+
+
+def run(iterations: int) -> None:
+    os.environ.setdefault("JWT_ACCESS_SECRET", "bench-secret")
+    get_settings.cache_clear()
+    school_settings_cache.put(resolve_config(1, None))
+    token = create_access_token(1, Role.PARENT, 1)
+    print(f"iterations={iterations}")
+    _report("uncached (before)", _time(_uncached_request, token, iterations))
+    _report("cached (after)", _time(_cached_request, token, iterations))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark per-request settings and token-decoding CPU.")
+    parser.add_argument("--iterations", type=int, default=2000)
+    args = parser.parse_args()
+    run(args.iterations)
+
+
+if __name__ == "__main__":
+    main()
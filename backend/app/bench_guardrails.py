@@ -0,0 +1,103 @@
+# ABOUTME: Microbenchmark for ticket-creation latency: sequential guardrail queries vs the single FILTER query.
+# ABOUTME: Run `python -m app.bench_guardrails [--history 50]` against Postgres; all data is rolled back.
+
+import argparse
+import asyncio
+import statistics
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import func, insert, select
+
+from app.core.config import get_settings
+from app.core.db import get_engine, get_session_factory
+from app.models.ticket import Ticket, TicketCategory, TicketStatus
+from app.models.user import Role, User
+from app.services.guardrails import OPEN_STATUSES, check_guardrails
+from app.services.ticket_service import create_ticket
+
+
+async def _sequential_guardrails(session, user: User, category: TicketCategory, urgency: bool) -> None:
+    """The previous implementation's round trips: open, last created, 7-day, open Other, urgent."""
+    now = datetime.now(timezone.utc)
+    week_ago = now - timedelta(days=7)
+    mine = Ticket.created_by_id == user.id
+    await session.scalar(select(func.count(Ticket.id)).where(mine, Ticket.school_id == user.school_id, Ticket.status.in_(OPEN_STATUSES)))
+    await session.scalar(select(func.max(Ticket.created_at)).where(mine))
+    await session.scalar(select(func.count(Ticket.id)).where(mine, Ticket.created_at >= week_ago))
+    if category == TicketCategory.OTHER:
+        await session.scalar(
+            select(func.count(Ticket.id)).where(
+                mine, Ticket.school_id == user.school_id, Ticket.category == category, Ticket.status.in_(OPEN_STATUSES)
+            )
+        )
+    if urgency:
+        await session.scalar(select(func.count(Ticket.id)).where(mine, Ticket.urgency.is_(True), Ticket.created_at >= week_ago))
+
+
+async def _time_creates(session, parent: User, guard, iterations: int) -> list[float]:
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        await guard(session, parent, TicketCategory.OTHER, True)
+        savepoint = await session.begin_nested()
+        await create_ticket(session, parent, [], TicketCategory.OTHER, "bench", None, False)
+        await savepoint.rollback()
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+def _report(label: str, samples: list[float]) -> None:
+    ordered = sorted(samples)
+    p95 = ordered[int(len(ordered) * 0.95) - 1]
+    print(f"{label:<22} p50={statistics.median(ordered):.2f}ms p95={p95:.2f}ms")
+
+
+async def run(history: int, iterations: int) -> None:
+    settings = get_settings()
+    if not settings.database_url or settings.database_url.startswith("sqlite"):
+        # The timed path takes a Postgres advisory lock; numbers only mean anything against Postgres.
+        print("bench_guardrails needs a Postgres DATABASE_URL; skipping.")
+        return
+    engine = get_engine(settings.database_url)
+    factory = get_session_factory(engine)
+    school_id = 900_000 + uuid.uuid4().int % 100_000
+    try:
+        async with factory() as session:
+            parent = User(phone=f"+91990{uuid.uuid4().hex[:7]}", role=Role.PARENT, school_id=school_id)
+            session.add(parent)
+            await session.flush()
+            old = datetime.now(timezone.utc) - timedelta(days=30)
+            await session.execute(
+                insert(Ticket),
+                [
+                    {
+                        "school_id": school_id,
+                        "created_by_id": parent.id,
+                        "category": TicketCategory.TRANSPORT,
+                        "status": TicketStatus.RESOLVED,
+                        "routed_role": Role.TRANSPORT,
+                        "created_at": old - timedelta(hours=i),
+                    }
+                    for i in range(history)
+                ],
+            )
+            print(f"school={school_id} history={history} iterations={iterations}")
+            _report("sequential (before)", await _time_creates(session, parent, _sequential_guardrails, iterations))
+            _report("single query (after)", await _time_creates(session, parent, check_guardrails, iterations))
+            await session.rollback()
+    finally:
+        await engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark ticket-creation latency with guardrail checks.")
+    parser.add_argument("--history", type=int, default=50, help="resolved tickets already owned by the parent")
+    parser.add_argument("--iterations", type=int, default=200)
+    args = parser.parse_args()
+    asyncio.run(run(args.history, args.iterations))
+
+
+if __name__ == "__main__":
+    main()
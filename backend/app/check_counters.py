@@ -0,0 +1,94 @@
+# ABOUTME: Consistency checker for denormalized ticket activity counters.
+# ABOUTME: Run `python -m app.check_counters [--fix]`; exits non-zero when drift remains.
+
+import argparse
+import asyncio
+import logging
+import sys
+
+from sqlalchemy import func, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import get_settings
+from app.core.db import get_engine, get_session_factory
+from app.models.ticket import InternalNote, Ticket, TicketMessage, TicketReopen
+from app.models.user import Role, User
+
+logger = logging.getLogger(__name__)
+
+
+def _expected_columns():
+    """Correlated subqueries recomputing each counter from its child table."""
+    return {
+        "message_count": select(func.count(TicketMessage.id))
+        .where(TicketMessage.ticket_id == Ticket.id)
+        .scalar_subquery(),
+        "last_message_at": select(func.max(TicketMessage.created_at))
+        .where(TicketMessage.ticket_id == Ticket.id)
+        .scalar_subquery(),
+        "first_staff_response_at": select(func.min(TicketMessage.created_at))
+        .join(User, User.id == TicketMessage.sender_id)
+        .where(TicketMessage.ticket_id == Ticket.id, User.role != Role.PARENT)
+        .scalar_subquery(),
+        "internal_notes_count": select(func.count(InternalNote.id))
+        .where(InternalNote.ticket_id == Ticket.id)
+        .scalar_subquery(),
+        "reopen_count": select(func.count(TicketReopen.id))
+        .where(TicketReopen.ticket_id == Ticket.id)
+        .scalar_subquery(),
+    }
+
+
+async def find_counter_drift(session: AsyncSession, ticket_ids: list[int] | None = None) -> list[int]:
+    """Ids of tickets whose stored counters disagree with their child tables."""
+    expected = _expected_columns()
+    mismatch = or_(*[getattr(Ticket, name).is_distinct_from(expr) for name, expr in expected.items()])
+    q = select(Ticket.id).where(mismatch).order_by(Ticket.id)
+    if ticket_ids is not None:
+        q = q.where(Ticket.id.in_(ticket_ids))
+    result = await session.execute(q)
+    return [r[0] for r in result.all()]
+
+
+async def repair_counter_drift(session: AsyncSession, ticket_ids: list[int]) -> None:
+    if not ticket_ids:
+        return
+    await session.execute(
+        update(Ticket)
+        .where(Ticket.id.in_(ticket_ids))
+        .values(updated_at=Ticket.updated_at, **_expected_columns())
+        .execution_options(synchronize_session=False)
+    )
+
+
+async def run_check(fix: bool) -> int:
+    settings = get_settings()
+    engine = get_engine(settings.database_url)
+    factory = get_session_factory(engine)
+    try:
+        async with factory() as session:
+            drifted = await find_counter_drift(session)
+            if not drifted:
+                logger.info("Ticket counters are consistent.")
+                return 0
+            logger.warning("Counter drift on %d ticket(s): %s", len(drifted), drifted[:50])
+            if not fix:
+                return 1
+            await repair_counter_drift(session, drifted)
+            await session.commit()
+            logger.info("Repaired counters on %d ticket(s).", len(drifted))
+            return 0
+    finally:
+        await engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Check denormalized ticket activity counters.")
+    parser.add_argument("--fix", action="store_true", help="recompute drifted counters from child tables")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s %(message)s")
+    sys.exit(asyncio.run(run_check(args.fix)))
+
+
+if __name__ == "__main__":
+    main()
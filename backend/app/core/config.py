@@ -1,5 +1,7 @@
 # ABOUTME: Pydantic settings for env-based configuration.
-# ABOUTME: Loads DATABASE_URL, JWT secrets, and optional integrations.
+# ABOUTME: Loads DATABASE_URL, JWT secrets, and optional integrations; parsed once per process.
+
+from functools import lru_cache
 
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
@@ -28,5 +30,8 @@ class Settings(BaseSettings):
     office_hours_timezone: str = "Asia/Kolkata"
 
 
+@lru_cache
 def get_settings() -> Settings:
+    """Process settings, read from the environment and .env on first use. Per-school values that can
+    change at runtime live in school_settings instead."""
     return Settings()
@@ -0,0 +1,168 @@
+# ABOUTME: Cross-instance pub/sub over Postgres LISTEN/NOTIFY on the app's asyncpg engine.
+# ABOUTME: One LISTEN connection per process, a channel per school plus a global channel, auto-reconnect.
+
+import asyncio
+import json
+import logging
+import uuid
+from collections import defaultdict
+from collections.abc import Callable
+
+from sqlalchemy import event as sa_event
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+logger = logging.getLogger(__name__)
+
+GLOBAL_CHANNEL = "syncdesk_global"
+# NOTIFY payloads must be under 8000 bytes; leave room for the envelope.
+MAX_PAYLOAD_BYTES = 7900
+_PENDING_KEY = "pending_notifications"
+
+# handler(school_id, data, truncated): truncated means data is the id-only ref, re-read what you need.
+Handler = Callable[[int | None, dict, bool], None]
+
+
+def school_channel(school_id: int) -> str:
+    return f"syncdesk_school_{school_id}"
+
+
+def encode_payload(origin: str, kind: str, school_id: int | None, data: dict, ref: dict | None = None) -> str:
+    """JSON envelope for NOTIFY; falls back to the id-only ref when the full data does not fit."""
+    payload = json.dumps({"o": origin, "k": kind, "s": school_id, "d": data}, default=str, separators=(",", ":"))
+    if len(payload.encode()) <= MAX_PAYLOAD_BYTES:
+        return payload
+    return json.dumps({"o": origin, "k": kind, "s": school_id, "d": ref or {}, "t": 1}, default=str, separators=(",", ":"))
+
+
+class PgPubSub:
+    """Process-wide notifications: local handlers run after commit, other instances hear it via NOTIFY."""
+
+    def __init__(self):
+        self.origin = uuid.uuid4().hex
+        self._handlers: dict[str, list[Handler]] = defaultdict(list)
+        self._channels: set[str] = {GLOBAL_CHANNEL}
+        self._conn = None
+        self._lock = asyncio.Lock()
+        self._task: asyncio.Task | None = None
+        self._stopping: asyncio.Event | None = None
+        self._reconnect_handlers: list[Callable[[], None]] = []
+
+    def subscribe(self, kind: str, handler: Handler) -> None:
+        self._handlers[kind].append(handler)
+
+    def on_reconnect(self, handler: Callable[[], None]) -> None:
+        """Called after the LISTEN connection is re-established; notifications may have been missed."""
+        self._reconnect_handlers.append(handler)
+
+    def dispatch(self, kind: str, school_id: int | None, data: dict, truncated: bool = False) -> None:
+        for handler in self._handlers.get(kind, []):
+            try:
+                handler(school_id, data, truncated)
+            except Exception:
+                logger.exception("pubsub handler for %s failed", kind)
+
+    def watch_school(self, school_id: int) -> None:
+        """Start hearing this school's channel; call when the process keeps state for the school."""
+        channel = school_channel(school_id)
+        if channel in self._channels:
+            return
+        self._channels.add(channel)
+        if self._conn is not None:
+            asyncio.get_running_loop().create_task(self._listen(self._conn, channel))
+
+    def _on_notify(self, conn, pid, channel, payload) -> None:
+        try:
+            msg = json.loads(payload)
+        except ValueError:
+            logger.warning("Ignoring malformed notification on %s", channel)
+            return
+        if msg.get("o") == self.origin:
+            return  # already dispatched locally after commit
+        self.dispatch(msg["k"], msg.get("s"), msg.get("d") or {}, bool(msg.get("t")))
+
+    async def _listen(self, conn, channel: str) -> None:
+        async with self._lock:
+            await conn.add_listener(channel, self._on_notify)
+
+    async def start(self, engine) -> None:
+        if engine.dialect.name != "postgresql" or self._task is not None:
+            return
+        self._stopping = asyncio.Event()
+        self._task = asyncio.get_running_loop().create_task(self._run(engine))
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._stopping.set()
+        await self._task
+        self._task = None
+
+    async def _run(self, engine) -> None:
+        backoff = 1.0
+        connected_before = False
+        while not self._stopping.is_set():
+            try:
+                async with engine.connect() as conn:
+                    raw = await conn.get_raw_connection()
+                    driver_conn = raw.driver_connection
+                    lost = asyncio.Event()
+                    driver_conn.add_termination_listener(lambda _c: lost.set())
+                    for channel in list(self._channels):
+                        await self._listen(driver_conn, channel)
+                    self._conn = driver_conn
+                    backoff = 1.0
+                    if connected_before:
+                        logger.info("pubsub reconnected; notifying %d handler(s)", len(self._reconnect_handlers))
+                        for handler in self._reconnect_handlers:
+                            handler()
+                    connected_before = True
+                    waiters = [asyncio.ensure_future(lost.wait()), asyncio.ensure_future(self._stopping.wait())]
+                    try:
+                        await asyncio.wait(waiters, return_when=asyncio.FIRST_COMPLETED)
+                    finally:
+                        for w in waiters:
+                            w.cancel()
+                        self._conn = None
+                    # Listeners live on the connection; never hand it back to the pool.
+                    await conn.invalidate()
+            except Exception:
+                logger.exception("pubsub LISTEN connection failed; retrying in %.0fs", backoff)
+            if self._stopping.is_set():
+                break
+            try:
+                await asyncio.wait_for(self._stopping.wait(), timeout=backoff)
+            except asyncio.TimeoutError:
+                pass
+            backoff = min(backoff * 2, 30.0)
+
+
+pubsub = PgPubSub()
+
+
+def queue_notification(session, kind: str, school_id: int | None, data: dict, ref: dict | None = None) -> None:
+    """Stage a notification on the session: NOTIFY is sent inside the transaction (so it is delivered
+    only on commit) and local handlers run after commit. Nothing is sent on rollback."""
+    session.info.setdefault(_PENDING_KEY, []).append((kind, school_id, data, ref))
+
+
+@sa_event.listens_for(Session, "before_commit")
+def _send_notifications(session: Session) -> None:
+    pending = session.info.get(_PENDING_KEY)
+    if not pending or session.get_bind().dialect.name != "postgresql":
+        return
+    for kind, school_id, data, ref in pending:
+        channel = GLOBAL_CHANNEL if school_id is None else school_channel(school_id)
+        session.execute(select(func.pg_notify(channel, encode_payload(pubsub.origin, kind, school_id, data, ref))))
+
+
+@sa_event.listens_for(Session, "after_commit")
+def _dispatch_local(session: Session) -> None:
+    for kind, school_id, data, _ref in session.info.pop(_PENDING_KEY, []):
+        pubsub.dispatch(kind, school_id, data)
+
+
+@sa_event.listens_for(Session, "after_soft_rollback")
+def _drop_pending(session: Session, previous_transaction) -> None:
+    if not previous_transaction.nested:
+        session.info.pop(_PENDING_KEY, None)
@@ -1,14 +1,14 @@
 # ABOUTME: JWT decode and get_current_user logic.
-# ABOUTME: Validates Bearer token and loads User from DB.
+# ABOUTME: Validates Bearer token and builds the Principal from its claims and the user cache.
 
 from fastapi import Depends, Header, HTTPException, status
 from jose import JWTError, jwt
-from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api.deps import get_db
 from app.core.config import get_settings
-from app.models.user import Role, User
+from app.core.user_cache import Principal, load_principal, user_cache
+from app.models.user import Role
 
 
 def decode_access_token(token: str) -> dict | None:
@@ -27,7 +27,7 @@ def decode_access_token(token: str) -> dict | None:
 async def get_current_user(
     authorization: str | None = Header(default=None, alias="Authorization"),
     db: AsyncSession = Depends(get_db),
-) -> User:
+) -> Principal:
     if not authorization or not authorization.startswith("Bearer "):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -40,19 +40,38 @@ async def get_current_user(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid token",
         )
-    user_id = payload["sub"]
-    result = await db.execute(select(User).where(User.id == int(user_id)))
-    user = result.scalar_one_or_none()
-    if not user:
+    try:
+        user_id = int(payload["sub"])
+        role = Role(payload["role"])
+        school_id = int(payload["school_id"])
+    except (KeyError, TypeError, ValueError):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid token",
+        )
+    # No query when the user is cached; the session opens a connection only on a miss.
+    principal = await load_principal(db, user_id)
+    if principal and (principal.role != role or principal.school_id != school_id):
+        # The cached entry may predate a change whose invalidation has not reached this instance yet
+        # (e.g. a token issued elsewhere right after a role change); check the database once.
+        user_cache.invalidate(user_id)
+        principal = await load_principal(db, user_id)
+    if not principal:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="User not found",
         )
-    return user
+    if principal.role != role or principal.school_id != school_id:
+        # Role or school changed since the token was issued; the client must sign in again.
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid token",
+        )
+    return principal
 
 
 def require_roles(*allowed: Role):
-    async def _check(user: User = Depends(get_current_user)) -> User:
+    async def _check(user: Principal = Depends(get_current_user)) -> Principal:
         if user.role not in allowed:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
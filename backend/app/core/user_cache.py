@@ -0,0 +1,110 @@
+# ABOUTME: Authenticated principal built from verified JWT claims plus a bounded per-process user cache.
+# ABOUTME: Fields not carried in the token come from the cache; user writes invalidate it on every instance.
+
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime, timezone, timedelta
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.pubsub import pubsub, queue_notification
+from app.models.user import Role, User
+
+USER_CACHE_TTL = timedelta(minutes=5)
+USER_CACHE_SIZE = 10_000
+
+
+@dataclass(frozen=True)
+class Principal:
+    """The authenticated user for one request. id, role and school_id come from the token; the rest
+    from the cached users row. Read-only: load a User from the session to change the account."""
+
+    id: int
+    role: Role
+    school_id: int
+    phone: str
+    name: str | None = None
+    email: str | None = None
+    restricted_to_admin_until: datetime | None = None
+    ticket_creation_blocked_until: datetime | None = None
+
+
+@dataclass(frozen=True)
+class _CachedUser:
+    principal: Principal
+    expires_at: datetime
+
+
+class UserCache:
+    """Per-user Principal as last read from the database, LRU-bounded with a TTL as a backstop for
+    missed invalidations."""
+
+    def __init__(self, maxsize: int = USER_CACHE_SIZE, ttl: timedelta = USER_CACHE_TTL):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: OrderedDict[int, _CachedUser] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, user_id: int, now: datetime) -> Principal | None:
+        entry = self._entries.get(user_id)
+        if entry is None or entry.expires_at <= now:
+            self._entries.pop(user_id, None)
+            self.misses += 1
+            return None
+        self._entries.move_to_end(user_id)
+        self.hits += 1
+        return entry.principal
+
+    def put(self, principal: Principal, now: datetime) -> None:
+        self._entries[principal.id] = _CachedUser(principal, now + self.ttl)
+        self._entries.move_to_end(principal.id)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, user_id: int) -> None:
+        self._entries.pop(user_id, None)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+user_cache = UserCache()
+pubsub.subscribe("user_invalidate", lambda school_id, data, truncated: user_cache.invalidate(data["user_id"]))
+# Invalidations sent while the LISTEN connection was down are lost; start over.
+pubsub.on_reconnect(user_cache.clear)
+
+
+def invalidate_user(session, school_id: int, user_id: int) -> None:
+    """Drop the user's cached row on every instance once the current transaction commits."""
+    queue_notification(session, "user_invalidate", school_id, {"user_id": user_id})
+
+
+def principal_from_user(user: User) -> Principal:
+    return Principal(
+        id=user.id,
+        role=user.role,
+        school_id=user.school_id,
+        phone=user.phone,
+        name=user.name,
+        email=user.email,
+        restricted_to_admin_until=user.restricted_to_admin_until,
+        ticket_creation_blocked_until=user.ticket_creation_blocked_until,
+    )
+
+
+async def load_principal(session: AsyncSession, user_id: int) -> Principal | None:
+    """The cached Principal for user_id, reading the users row only on a miss."""
+    now = datetime.now(timezone.utc)
+    principal = user_cache.get(user_id, now)
+    if principal is not None:
+        return principal
+    result = await session.execute(select(User).where(User.id == user_id))
+    user = result.scalar_one_or_none()
+    if user is None:
+        return None
+    principal = principal_from_user(user)
+    user_cache.put(principal, now)
+    pubsub.watch_school(principal.school_id)
+    return principal
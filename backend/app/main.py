@@ -7,10 +7,12 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from sqlalchemy import text
 
-from app.api import admin, announcements, auth, config, health, me, tickets
+from app.api import admin, announcements, auth, config, health, me, sync, tickets
 from app.core.config import get_settings
 from app.core.db import get_engine
+from app.core.pubsub import pubsub
 from app.core.logging import setup_logging
+from app.services.read_receipts import read_buffer
 
 
 @asynccontextmanager
@@ -24,7 +26,12 @@ async def lifespan(app: FastAPI):
             await conn.execute(text("SELECT 1"))
     except Exception as e:
         raise RuntimeError(f"Database connectivity check failed: {e}") from e
+    await pubsub.start(engine)
+    await read_buffer.start(engine)
     yield
+    # Drain buffered read receipts while the engine is still open.
+    await read_buffer.stop()
+    await pubsub.stop()
     await engine.dispose()
 
 
@@ -40,6 +47,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag", "X-Next-Cursor"],
 )
 
 
@@ -60,6 +68,7 @@ app.include_router(tickets.router)
 app.include_router(announcements.router)
 app.include_router(admin.router)
 app.include_router(config.router)
+app.include_router(sync.router)
 
 
 @app.get("/")
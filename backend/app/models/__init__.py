@@ -3,10 +3,12 @@
 from app.models.announcement import Announcement, AnnouncementRead
 from app.models.audit import AuditLog
 from app.models.base import Base
+from app.models.school_settings import SchoolSettings
 from app.models.student import Student, parent_students
 from app.models.ticket import InternalNote, Ticket, TicketCategory, TicketMessage, TicketReopen, TicketStatus, ticket_students
 from app.models.transport import TransportBroadcast
 from app.models.user import OTP, Role, User
+from app.models.workload import StaffWorkload
 
 __all__ = [
     "Announcement",
@@ -17,6 +19,8 @@ __all__ = [
     "User",
     "OTP",
     "Role",
+    "SchoolSettings",
+    "StaffWorkload",
     "Student",
     "parent_students",
     "Ticket",
@@ -3,7 +3,7 @@
 
 from datetime import datetime, timezone
 
-from sqlalchemy import DateTime, ForeignKey, Integer, String, Text
+from sqlalchemy import DateTime, ForeignKey, Index, Integer, String, Text, UniqueConstraint
 from sqlalchemy.orm import Mapped, mapped_column
 
 from app.models.base import Base
@@ -21,12 +21,33 @@ class Announcement(Base):
     target_grade: Mapped[str | None] = mapped_column(String(20), nullable=True)
     target_class: Mapped[str | None] = mapped_column(String(50), nullable=True)
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))
+    # Audience size snapshotted at creation and receipts counted as they land, for read-rate rollups.
+    recipient_count: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    read_count: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    archived_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
 
 
 class AnnouncementRead(Base):
     __tablename__ = "announcement_reads"
+    # One receipt per user per announcement; the feed's LEFT JOIN relies on it not fanning out.
+    __table_args__ = (
+        UniqueConstraint("announcement_id", "user_id", name="uq_announcement_reads_announcement_id_user_id"),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     announcement_id: Mapped[int] = mapped_column(Integer, ForeignKey("announcements.id"), nullable=False, index=True)
     user_id: Mapped[int] = mapped_column(Integer, ForeignKey("users.id"), nullable=False, index=True)
     read_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))
+
+
+# Sync walks a user's receipts in (read_at, id) order.
+Index("ix_announcement_reads_user_id_read_at_id", AnnouncementRead.user_id, AnnouncementRead.read_at, AnnouncementRead.id)
+# Feed keyset: newest first within a school.
+Index("ix_announcements_school_id_created_at_id", Announcement.school_id, Announcement.created_at.desc(), Announcement.id.desc())
+# Sync tombstones: only archived rows are indexed.
+Index(
+    "ix_announcements_school_id_archived_at",
+    Announcement.school_id,
+    Announcement.archived_at,
+    postgresql_where=Announcement.archived_at.is_not(None),
+)
@@ -0,0 +1,31 @@
+# ABOUTME: Per-school configuration: office hours, timezone, holidays and guardrail thresholds.
+# ABOUTME: NULL thresholds fall back to the code defaults; version is bumped on every update.
+
+from datetime import date, datetime, timezone
+
+from sqlalchemy import Date, DateTime, Integer, String
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.models.base import Base
+
+
+class SchoolSettings(Base):
+    __tablename__ = "school_settings"
+
+    school_id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    office_hours_start: Mapped[str | None] = mapped_column(String(5), nullable=True)
+    office_hours_end: Mapped[str | None] = mapped_column(String(5), nullable=True)
+    timezone: Mapped[str | None] = mapped_column(String(64), nullable=True)
+    holidays: Mapped[list[date]] = mapped_column(ARRAY(Date), default=list, nullable=False)
+    max_open_tickets: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    cooldown_minutes: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    max_tickets_7_days: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    max_open_other: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    max_urgent_7_days: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    version: Mapped[int] = mapped_column(Integer, default=1, nullable=False)
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        default=lambda: datetime.now(timezone.utc),
+        onupdate=lambda: datetime.now(timezone.utc),
+    )
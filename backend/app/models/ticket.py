@@ -4,10 +4,12 @@
 import enum
 from datetime import datetime, timezone
 
-from sqlalchemy import Boolean, DateTime, Enum, ForeignKey, Integer, String, Table, Column, Text
+from sqlalchemy import Boolean, Computed, DateTime, Enum, ForeignKey, Index, Integer, String, Table, Column, Text, and_
+from sqlalchemy.dialects.postgresql import TSVECTOR
 from sqlalchemy.orm import Mapped, mapped_column
 
 from app.models.base import Base
+from app.models.user import Role
 
 
 class TicketStatus(str, enum.Enum):
@@ -37,6 +39,12 @@ ticket_students = Table(
 )
 
 
+def _default_routed_role(context) -> Role:
+    from app.services.routing import get_role_for_category
+
+    return get_role_for_category(context.get_current_parameters()["category"])
+
+
 class Ticket(Base):
     __tablename__ = "tickets"
 
@@ -60,16 +68,83 @@ class Ticket(Base):
     abuse_flagged_by_id: Mapped[int | None] = mapped_column(Integer, ForeignKey("users.id"), nullable=True)
     escalation_snoozed_until: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
     deleted_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    # Role whose queue this ticket lands in; set from CATEGORY_TO_ROLE at creation, changed by re-routing.
+    routed_role: Mapped[Role] = mapped_column(Enum(Role), nullable=False, default=_default_routed_role)
+    # Activity counters maintained on write (add_reply, add_internal_note, request_reopen).
+    message_count: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    last_message_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    internal_notes_count: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    reopen_count: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    first_staff_response_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    # Generated full-text vector; deferred so listings never load it.
+    search_vector: Mapped[str | None] = mapped_column(
+        TSVECTOR,
+        Computed(
+            "to_tsvector('simple'::regconfig, coalesce(title, '') || ' ' || coalesce(description, ''))",
+            persisted=True,
+        ),
+        deferred=True,
+    )
+
+
+# Keyset pagination for ticket listings: ORDER BY updated_at DESC, id DESC.
+Index("ix_tickets_school_id_updated_at_id", Ticket.school_id, Ticket.updated_at.desc(), Ticket.id.desc())
+Index("ix_tickets_created_by_id_updated_at_id", Ticket.created_by_id, Ticket.updated_at.desc(), Ticket.id.desc())
+# Creation guardrails: per-parent cooldown (max created_at) and 7-day windows.
+Index("ix_tickets_created_by_id_created_at", Ticket.created_by_id, Ticket.created_at)
+Index(
+    "ix_tickets_school_id_created_at_id",
+    Ticket.school_id,
+    Ticket.created_at.desc(),
+    Ticket.id.desc(),
+    postgresql_where=Ticket.deleted_at.is_(None),
+)
+# Open-queue partial indexes stay small as resolved history grows.
+Index(
+    "ix_tickets_open_queue",
+    Ticket.school_id,
+    Ticket.updated_at.desc(),
+    Ticket.id.desc(),
+    postgresql_where=and_(Ticket.deleted_at.is_(None), Ticket.status != TicketStatus.RESOLVED),
+)
+Index("ix_tickets_search_vector", Ticket.search_vector, postgresql_using="gin")
+# Sync tombstones: only soft-deleted rows are indexed.
+Index(
+    "ix_tickets_school_id_deleted_at",
+    Ticket.school_id,
+    Ticket.deleted_at,
+    postgresql_where=Ticket.deleted_at.is_not(None),
+)
+Index("ix_tickets_school_id_routed_role_status", Ticket.school_id, Ticket.routed_role, Ticket.status)
+Index(
+    "ix_tickets_open_by_assignee",
+    Ticket.assigned_to_id,
+    Ticket.updated_at.desc(),
+    Ticket.id.desc(),
+    postgresql_where=and_(Ticket.deleted_at.is_(None), Ticket.status != TicketStatus.RESOLVED),
+)
 
 
 class TicketMessage(Base):
     __tablename__ = "ticket_messages"
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
-    ticket_id: Mapped[int] = mapped_column(Integer, ForeignKey("tickets.id"), nullable=False, index=True)
+    ticket_id: Mapped[int] = mapped_column(Integer, ForeignKey("tickets.id"), nullable=False)
     sender_id: Mapped[int] = mapped_column(Integer, ForeignKey("users.id"), nullable=False, index=True)
     body: Mapped[str] = mapped_column(Text, nullable=False)
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))
+    search_vector: Mapped[str | None] = mapped_column(
+        TSVECTOR,
+        Computed("to_tsvector('simple'::regconfig, body)", persisted=True),
+        deferred=True,
+    )
+
+
+# Thread reads and after_id/before_id cursors walk (ticket_id, id); also serves plain ticket_id lookups.
+Index("ix_ticket_messages_ticket_id_id", TicketMessage.ticket_id, TicketMessage.id)
+# Sync walks messages in (created_at, id) order.
+Index("ix_ticket_messages_created_at_id", TicketMessage.created_at, TicketMessage.id)
+Index("ix_ticket_messages_search_vector", TicketMessage.search_vector, postgresql_using="gin")
 
 
 class InternalNote(Base):
@@ -0,0 +1,19 @@
+# ABOUTME: Per-staff open-ticket counts used by automatic assignment.
+# ABOUTME: Maintained on write (create, resolve, reopen, reassign) instead of recounted per create.
+
+from sqlalchemy import ForeignKey, Index, Integer
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.models.base import Base
+
+
+class StaffWorkload(Base):
+    __tablename__ = "staff_workloads"
+
+    user_id: Mapped[int] = mapped_column(Integer, ForeignKey("users.id"), primary_key=True)
+    school_id: Mapped[int] = mapped_column(Integer, nullable=False)
+    open_count: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+
+
+# Least-loaded lookup: ORDER BY open_count, user_id within a school.
+Index("ix_staff_workloads_school_id_open_count", StaffWorkload.school_id, StaffWorkload.open_count, StaffWorkload.user_id)
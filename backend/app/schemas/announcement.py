@@ -25,3 +25,26 @@ class AnnouncementOut(BaseModel):
     target_class: str | None
     created_at: datetime
     read: bool = False
+
+
+MAX_READ_BATCH = 200
+
+
+class AnnouncementReadBatch(BaseModel):
+    announcement_ids: list[int] = Field(..., min_length=1, max_length=MAX_READ_BATCH)
+
+
+class AnnouncementReadBatchOut(BaseModel):
+    marked: list[int]
+    not_found: list[int]
+
+
+class AnnouncementReadRate(BaseModel):
+    id: int
+    title: str
+    created_at: datetime
+    recipient_count: int
+    # Readers who joined the audience after the snapshot still count, so read_count can exceed
+    # recipient_count; read_rate is capped at 1.0 (0.0 when nobody was targeted).
+    read_count: int
+    read_rate: float
@@ -0,0 +1,49 @@
+# ABOUTME: Request/response schemas for per-school settings (office hours, timezone, holidays, limits).
+
+from datetime import date, datetime
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+from pydantic import BaseModel, ConfigDict, Field, field_validator
+
+HOURS_PATTERN = r"^([01]\d|2[0-3]):[0-5]\d$"
+
+
+class SchoolSettingsUpdate(BaseModel):
+    """Only the fields sent are changed; null clears a value back to the default."""
+
+    office_hours_start: str | None = Field(None, pattern=HOURS_PATTERN)
+    office_hours_end: str | None = Field(None, pattern=HOURS_PATTERN)
+    timezone: str | None = None
+    holidays: list[date] | None = None
+    max_open_tickets: int | None = Field(None, ge=0)
+    cooldown_minutes: int | None = Field(None, ge=0)
+    max_tickets_7_days: int | None = Field(None, ge=0)
+    max_open_other: int | None = Field(None, ge=0)
+    max_urgent_7_days: int | None = Field(None, ge=0)
+
+    @field_validator("timezone")
+    @classmethod
+    def _known_timezone(cls, value: str | None) -> str | None:
+        if value is not None:
+            try:
+                ZoneInfo(value)
+            except (ZoneInfoNotFoundError, ValueError):
+                raise ValueError("Unknown timezone")
+        return value
+
+
+class SchoolSettingsOut(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    school_id: int
+    office_hours_start: str | None = None
+    office_hours_end: str | None = None
+    timezone: str | None = None
+    holidays: list[date] = []
+    max_open_tickets: int | None = None
+    cooldown_minutes: int | None = None
+    max_tickets_7_days: int | None = None
+    max_open_other: int | None = None
+    max_urgent_7_days: int | None = None
+    version: int = 0
+    updated_at: datetime | None = None
@@ -0,0 +1,39 @@
+# ABOUTME: Response schema for GET /sync (delta sync for the offline PWA).
+
+from datetime import datetime
+
+from pydantic import BaseModel
+
+from app.models.ticket import TicketCategory
+from app.schemas.announcement import AnnouncementOut
+from app.schemas.ticket import MessageOut
+
+
+class SyncTicketOut(BaseModel):
+    """Ticket row without its thread; messages arrive in SyncOut.messages."""
+
+    id: int
+    created_by_id: int
+    category: TicketCategory
+    status: str
+    urgency: bool
+    assigned_to_id: int | None
+    title: str | None
+    description: str | None
+    known_issue: bool = False
+    satisfied_at: datetime | None = None
+    created_at: datetime
+    updated_at: datetime
+    message_count: int = 0
+    student_ids: list[int] = []
+
+
+class SyncOut(BaseModel):
+    token: str
+    has_more: bool = False
+    tickets: list[SyncTicketOut] = []
+    messages: list[MessageOut] = []
+    announcements: list[AnnouncementOut] = []
+    read_announcement_ids: list[int] = []
+    deleted_ticket_ids: list[int] = []
+    archived_announcement_ids: list[int] = []
@@ -6,6 +6,7 @@ from datetime import datetime
 from pydantic import BaseModel, ConfigDict, Field
 
 from app.models.ticket import TicketCategory
+from app.models.user import Role
 
 
 class TicketCreate(BaseModel):
@@ -36,6 +37,46 @@ class KnownIssueUpdate(BaseModel):
     known_issue: bool
 
 
+class RouteUpdate(BaseModel):
+    role: Role
+
+
+MAX_BULK_TICKETS = 200
+
+
+class BulkTicketOperation(BaseModel):
+    """One operation applied to many tickets; only the field for the chosen operation is read."""
+
+    ticket_ids: list[int] = Field(..., min_length=1, max_length=MAX_BULK_TICKETS)
+    operation: str = Field(..., pattern="^(status|assign|known_issue)$")
+    status: str | None = Field(None, pattern="^(in_progress|resolved)$")
+    assigned_to_id: int | None = None
+    known_issue: bool | None = None
+
+
+class BulkTicketResult(BaseModel):
+    id: int
+    ok: bool
+    error: str | None = None  # "not_found" | "not_allowed"
+
+
+class BulkTicketOut(BaseModel):
+    updated: int
+    results: list[BulkTicketResult]
+
+
+class TicketFilters(BaseModel):
+    """Optional listing filters for GET /tickets; all given filters combine with AND."""
+
+    status: str | None = Field(None, pattern="^(pending|in_progress|resolved|open)$")  # open = not resolved
+    category: TicketCategory | None = None
+    urgency: bool | None = None
+    assigned_to: int | None = None
+    known_issue: bool | None = None
+    abuse_flagged: bool | None = None
+    routed_role: Role | None = None
+
+
 class MessageOut(BaseModel):
     model_config = ConfigDict(from_attributes=True)
 
@@ -67,3 +108,56 @@ class TicketOut(BaseModel):
     satisfied_at: datetime | None = None
     transport_footer: str | None = None
     known_issue: bool = False
+    routed_role: Role | None = None
+
+
+class TicketSummaryOut(BaseModel):
+    """Slim inbox row: no message bodies beyond a short preview of the latest one."""
+
+    id: int
+    created_by_id: int
+    category: TicketCategory
+    status: str
+    urgency: bool
+    assigned_to_id: int | None
+    title: str | None
+    known_issue: bool = False
+    created_at: datetime
+    updated_at: datetime
+    routed_role: Role
+    message_count: int = 0
+    last_message_preview: str | None = None
+    last_activity_at: datetime
+
+
+class TicketSearchHit(BaseModel):
+    """Ranked search result with highlighted snippets from the ticket text and best-matching message.
+    Snippets are HTML-escaped text whose only markup is <mark>…</mark> around matches."""
+
+    id: int
+    title: str | None
+    status: str
+    category: TicketCategory
+    updated_at: datetime
+    rank: float
+    snippet: str | None = None
+    message_snippet: str | None = None
+
+
+class TicketDeltaOut(BaseModel):
+    """Compact mutation response (Prefer: return=minimal): what changed, not the whole ticket."""
+
+    id: int
+    status: str
+    updated_at: datetime
+    known_issue: bool = False
+    message: MessageOut | None = None
+
+
+class TicketCreationStatus(BaseModel):
+    """Whether the parent may create a ticket now; remaining counts per guardrail quota."""
+
+    blocked: bool
+    reason: str | None = None
+    block_until: datetime | None = None
+    remaining: dict[str, int] = {}
@@ -9,6 +9,7 @@ import sys
 from sqlalchemy import insert, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.check_counters import repair_counter_drift
 from app.core.config import get_settings
 from app.core.db import get_engine, get_session_factory
 from app.models.announcement import Announcement
@@ -108,6 +109,8 @@ async def seed(session: AsyncSession) -> None:
     m5 = TicketMessage(ticket_id=t3.id, sender_id=parent.id, body="Child A has a new nut allergy. Please update records.")
     session.add_all([m1, m2, m3, m4, m5])
     await session.flush()
+    # Messages were inserted directly, so fill the tickets' activity counters from them.
+    await repair_counter_drift(session, [t1.id, t2.id, t3.id])
 
     a1 = Announcement(
         school_id=DEFAULT_SCHOOL_ID,
@@ -6,8 +6,10 @@ from datetime import datetime, timezone, timedelta
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.user_cache import invalidate_user
 from app.models.ticket import Ticket
 from app.models.user import Role, User
+from app.services.guardrails import invalidate_quota
 
 
 async def flag_abuse(
@@ -53,6 +55,7 @@ async def restrict_parent_to_admin(
         return None
     user.restricted_to_admin_until = datetime.now(timezone.utc) + timedelta(days=duration_days)
     await session.flush()
+    invalidate_user(session, user.school_id, user.id)
     return user
 
 
@@ -70,4 +73,6 @@ async def block_parent_ticket_creation(
         return None
     user.ticket_creation_blocked_until = datetime.now(timezone.utc) + timedelta(days=duration_days)
     await session.flush()
+    invalidate_quota(session, user.school_id, user.id)
+    invalidate_user(session, user.school_id, user.id)
     return user
@@ -1,31 +1,211 @@
-# ABOUTME: List announcements for user (by targeting), create (staff), mark read.
+# ABOUTME: List announcements for user (by targeting), create and archive (staff), mark read.
+# ABOUTME: Feed pages are cached per audience segment (school, audience, classes); reads are per user.
 
-from sqlalchemy import select
+import base64
+import binascii
+import json
+from collections import Counter
+from dataclasses import dataclass
+from datetime import datetime, timezone
+
+from sqlalchemy import and_, bindparam, false, func, literal, or_, select, true, tuple_, update
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.pubsub import queue_notification
 from app.models.announcement import Announcement, AnnouncementRead
+from app.models.student import Student, parent_students
 from app.models.user import Role, User
+from app.services.feed_cache import FeedSegment, feed_cache
+
+
+DEFAULT_FEED_PAGE_SIZE = 50
+MAX_FEED_PAGE_SIZE = 200
+# What a cached feed page holds per announcement; read state is per user and overlaid later.
+FEED_FIELDS = (
+    "id", "school_id", "author_id", "title", "content",
+    "target_audience", "target_grade", "target_class", "created_at",
+)
+
+
+def targeting_clause(user: User):
+    """Grade/class targeting for parents: an announcement with target_grade and/or target_class is shown
+    only if one linked student matches every set target (grade against the student's class, class
+    against the section). Staff see every grade. Correlated EXISTS, so it stays in the feed query."""
+    if user.role != Role.PARENT:
+        return true()
+    linked_match = (
+        select(parent_students.c.student_id)
+        .join(Student, Student.id == parent_students.c.student_id)
+        .where(
+            parent_students.c.parent_id == user.id,
+            Student.school_id == Announcement.school_id,
+            or_(Announcement.target_grade.is_(None), Student.class_name == Announcement.target_grade),
+            or_(Announcement.target_class.is_(None), Student.section == Announcement.target_class),
+        )
+        .exists()
+    )
+    return or_(and_(Announcement.target_grade.is_(None), Announcement.target_class.is_(None)), linked_match)
+
+
+def audience_clause(user: User):
+    """SQL form of who sees an announcement: parents never see staff-only posts, staff never see
+    parent-only ones, parents only see grade/class posts for their children, and nobody sees
+    archived ones."""
+    excluded = "staff" if user.role == Role.PARENT else "parents"
+    return and_(
+        Announcement.target_audience != excluded, Announcement.archived_at.is_(None), targeting_clause(user)
+    )
+
+
+def encode_announcement_cursor(created_at: datetime, announcement_id: int) -> str:
+    """Opaque keyset cursor pointing just past the given announcement in the feed order."""
+    raw = json.dumps({"v": created_at.isoformat(), "i": announcement_id}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_announcement_cursor(cursor: str) -> tuple[datetime, int] | None:
+    try:
+        data = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        return datetime.fromisoformat(data["v"]), int(data["i"])
+    except (binascii.Error, ValueError, TypeError, KeyError):
+        return None
 
 
-async def list_announcements_for_user(session: AsyncSession, user: User) -> list[tuple[Announcement, bool]]:
-    q = select(Announcement).where(Announcement.school_id == user.school_id).order_by(Announcement.created_at.desc())
-    result = await session.execute(q)
-    announcements = result.scalars().all()
-    out = []
-    for a in announcements:
-        if user.role == Role.PARENT and a.target_audience == "staff":
-            continue
-        if user.role != Role.PARENT and a.target_audience == "parents":
-            continue
-        read_result = await session.execute(
-            select(AnnouncementRead).where(
-                AnnouncementRead.announcement_id == a.id,
+async def get_feed_segment(session: AsyncSession, user: User) -> FeedSegment:
+    """The user's audience segment. Staff need no query; a parent's (class, section) set is cached."""
+    if user.role != Role.PARENT:
+        return FeedSegment(user.school_id, "staff")
+    now = datetime.now(timezone.utc)
+    segment = feed_cache.segment_for(user.id, now)
+    if segment is None:
+        result = await session.execute(
+            select(Student.class_name, Student.section)
+            .join(parent_students, parent_students.c.student_id == Student.id)
+            .where(parent_students.c.parent_id == user.id, Student.school_id == user.school_id)
+            .distinct()
+        )
+        segment = FeedSegment(user.school_id, "parents", tuple(sorted(tuple(row) for row in result.all())))
+        feed_cache.put_segment(user.id, segment, now)
+    return segment
+
+
+def segment_clause(segment: FeedSegment):
+    """audience_clause for everyone in the segment: targeting checks the segment's classes instead of
+    the user's links, so the same page serves every parent with the same children's classes."""
+    excluded = "parents" if segment.audience == "staff" else "staff"
+    clause = and_(
+        Announcement.school_id == segment.school_id,
+        Announcement.target_audience != excluded,
+        Announcement.archived_at.is_(None),
+    )
+    if segment.audience == "parents":
+        matches = [
+            and_(
+                or_(Announcement.target_grade.is_(None), Announcement.target_grade == class_name),
+                or_(Announcement.target_class.is_(None), Announcement.target_class == section),
+            )
+            for class_name, section in segment.classes
+        ]
+        clause = and_(
+            clause,
+            or_(and_(Announcement.target_grade.is_(None), Announcement.target_class.is_(None)), *matches),
+        )
+    return clause
+
+
+def announcement_feed_query(segment: FeedSegment, user_id: int, limit: int, after: tuple[datetime, int] | None = None):
+    """A segment's feed page plus this user's read state: one LEFT JOIN on their receipt, newest first."""
+    read = AnnouncementRead.id.is_not(None).label("read")
+    q = (
+        select(*(Announcement.__table__.c[name] for name in FEED_FIELDS), read)
+        .outerjoin(
+            AnnouncementRead,
+            and_(AnnouncementRead.announcement_id == Announcement.id, AnnouncementRead.user_id == user_id),
+        )
+        .where(segment_clause(segment))
+    )
+    if after is not None:
+        created_at, announcement_id = after
+        q = q.where(
+            tuple_(Announcement.created_at, Announcement.id)
+            < tuple_(literal(created_at, Announcement.created_at.type), announcement_id)
+        )
+    return q.order_by(Announcement.created_at.desc(), Announcement.id.desc()).limit(limit)
+
+
+async def get_feed_version(session: AsyncSession, segment: FeedSegment, user_id: int) -> tuple:
+    """Cheap validator for a user's feed, checked before any page is built: newest visible announcement,
+    visible count (archiving lowers it) and the user's newest read."""
+    max_read_id = select(func.max(AnnouncementRead.id)).where(AnnouncementRead.user_id == user_id).scalar_subquery()
+    result = await session.execute(
+        select(func.max(Announcement.id), func.count(Announcement.id), max_read_id).where(segment_clause(segment))
+    )
+    return tuple(result.one())
+
+
+@dataclass
+class FeedPage:
+    items: list[dict]
+    read_ids: set[int]
+    next_cursor: str | None
+
+
+async def get_feed_page(
+    session: AsyncSession,
+    user: User,
+    segment: FeedSegment,
+    limit: int = DEFAULT_FEED_PAGE_SIZE,
+    after: tuple[datetime, int] | None = None,
+) -> FeedPage:
+    """A feed page from the shared segment cache. On a miss the page and the user's reads come from one
+    query; on a hit only the user's receipts for the page's ids are read."""
+    key = (segment, limit, after)
+    items = feed_cache.get(key)
+    if items is None:
+        generation = feed_cache.generation(segment.school_id)
+        result = await session.execute(announcement_feed_query(segment, user.id, limit + 1, after))
+        rows = result.mappings().all()
+        items = tuple({name: row[name] for name in FEED_FIELDS} for row in rows)
+        read_ids = {row["id"] for row in rows if row["read"]}
+        feed_cache.put(key, items, generation)
+    elif items:
+        result = await session.execute(
+            select(AnnouncementRead.announcement_id).where(
                 AnnouncementRead.user_id == user.id,
+                AnnouncementRead.announcement_id.in_([item["id"] for item in items]),
             )
         )
-        read = read_result.scalar_one_or_none() is not None
-        out.append((a, read))
-    return out
+        read_ids = set(result.scalars().all())
+    else:
+        read_ids = set()
+    next_cursor = None
+    if len(items) > limit:
+        items = items[:limit]
+        next_cursor = encode_announcement_cursor(items[-1]["created_at"], items[-1]["id"])
+    return FeedPage(list(items), read_ids, next_cursor)
+
+
+def recipient_count_query(school_id: int, target_audience: str, target_grade: str | None, target_class: str | None):
+    """How many users the announcement reaches right now: the inverse of audience_clause."""
+    reaches = []
+    if target_audience in ("staff", "both"):
+        reaches.append(User.role != Role.PARENT)
+    if target_audience in ("parents", "both"):
+        parent = User.role == Role.PARENT
+        if target_grade is not None or target_class is not None:
+            linked = (
+                select(parent_students.c.student_id)
+                .join(Student, Student.id == parent_students.c.student_id)
+                .where(parent_students.c.parent_id == User.id, Student.school_id == school_id)
+            )
+            if target_grade is not None:
+                linked = linked.where(Student.class_name == target_grade)
+            if target_class is not None:
+                linked = linked.where(Student.section == target_class)
+            parent = and_(parent, linked.exists())
+        reaches.append(parent)
+    return select(func.count(User.id)).where(User.school_id == school_id, or_(false(), *reaches))
 
 
 async def create_announcement(
@@ -45,24 +225,98 @@ async def create_announcement(
         target_audience=target_audience,
         target_grade=target_grade,
         target_class=target_class,
+        recipient_count=await session.scalar(
+            recipient_count_query(author.school_id, target_audience, target_grade, target_class)
+        ),
     )
     session.add(a)
     await session.flush()
+    queue_notification(
+        session,
+        "announcement",
+        a.school_id,
+        {"announcement_id": a.id, "target_audience": target_audience, "target_grade": target_grade, "target_class": target_class},
+        ref={"announcement_id": a.id},
+    )
     return a
 
 
-async def mark_announcement_read(session: AsyncSession, announcement_id: int, user_id: int) -> bool:
-    r = await session.execute(select(Announcement).where(Announcement.id == announcement_id))
-    if r.scalar_one_or_none() is None:
-        return False
-    existing = await session.execute(
-        select(AnnouncementRead).where(
-            AnnouncementRead.announcement_id == announcement_id,
-            AnnouncementRead.user_id == user_id,
+async def archive_announcement(session: AsyncSession, school_id: int, announcement_id: int) -> Announcement | None:
+    """Hide an announcement from feeds, sync and receipts; existing receipts and counters are kept."""
+    result = await session.execute(
+        update(Announcement)
+        .where(
+            Announcement.id == announcement_id,
+            Announcement.school_id == school_id,
+            Announcement.archived_at.is_(None),
         )
+        .values(archived_at=func.now())
+        .returning(Announcement),
+        execution_options={"synchronize_session": False, "populate_existing": True},
+    )
+    a = result.scalar_one_or_none()
+    if a is not None:
+        queue_notification(session, "announcement_archived", school_id, {"announcement_id": a.id})
+    return a
+
+
+def _visible_ids_query(user: User, announcement_ids: list[int]):
+    return select(Announcement.id).where(
+        Announcement.id.in_(announcement_ids), Announcement.school_id == user.school_id, audience_clause(user)
+    )
+
+
+async def visible_announcement_ids(session: AsyncSession, user: User, announcement_ids: list[int]) -> set[int]:
+    result = await session.execute(_visible_ids_query(user, announcement_ids))
+    return set(result.scalars().all())
+
+
+async def mark_announcements_read(session: AsyncSession, user: User, announcement_ids: list[int]) -> set[int]:
+    """Record the user's receipts for every listed announcement they can see, in one statement:
+    a CTE picks the visible ids, INSERT ... ON CONFLICT DO NOTHING writes the new receipts and the
+    announcements' read_count is bumped for exactly those, so repeats and concurrent reports are
+    harmless. Returns the visible ids (already read or not)."""
+    visible = _visible_ids_query(user, announcement_ids).cte("visible")
+    inserted = (
+        insert(AnnouncementRead)
+        .from_select(
+            ["announcement_id", "user_id", "read_at"],
+            select(visible.c.id, literal(user.id), func.now()),
+        )
+        .on_conflict_do_nothing(index_elements=["announcement_id", "user_id"])
+        .returning(AnnouncementRead.announcement_id)
+        .cte("inserted")
+    )
+    # One new receipt per announcement at most, since they are all for this user.
+    counted = (
+        update(Announcement)
+        .where(Announcement.id.in_(select(inserted.c.announcement_id)))
+        .values(read_count=Announcement.read_count + 1)
+        .cte("counted")
+    )
+    result = await session.execute(select(visible.c.id).add_cte(inserted).add_cte(counted))
+    return set(result.scalars().all())
+
+
+async def list_read_rates(session: AsyncSession, school_id: int, limit: int) -> list[Announcement]:
+    """Newest announcements with their rollup counters; no join over announcement_reads."""
+    result = await session.execute(
+        select(Announcement)
+        .where(Announcement.school_id == school_id)
+        .order_by(Announcement.created_at.desc(), Announcement.id.desc())
+        .limit(limit)
+    )
+    return list(result.scalars().all())
+
+
+async def add_read_counts(session: AsyncSession, announcement_ids: list[int]) -> None:
+    """Bump read_count once per newly stored receipt. Rows are updated in id order so concurrent
+    flushes lock them in the same order."""
+    counts = Counter(announcement_ids)
+    if not counts:
+        return
+    table = Announcement.__table__
+    await session.execute(
+        update(table).where(table.c.id == bindparam("aid")).values(read_count=table.c.read_count + bindparam("n")),
+        [{"aid": announcement_id, "n": n} for announcement_id, n in sorted(counts.items())],
     )
-    if existing.scalar_one_or_none():
-        return True
-    session.add(AnnouncementRead(announcement_id=announcement_id, user_id=user_id))
-    await session.flush()
-    return True
@@ -0,0 +1,106 @@
+# ABOUTME: Load-aware automatic assignment: least-loaded staff member in the ticket's routed role.
+# ABOUTME: Open counts live in staff_workloads and are adjusted on every open/close/reassign.
+
+from collections import Counter
+
+from sqlalchemy import bindparam, exists, func, select, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.ticket import Ticket, TicketStatus
+from app.models.user import Role, User
+from app.models.workload import StaffWorkload
+
+
+def _open_count_for(user_id_col):
+    return (
+        select(func.count())
+        .select_from(Ticket)
+        .where(
+            Ticket.assigned_to_id == user_id_col,
+            Ticket.status != TicketStatus.RESOLVED,
+            Ticket.deleted_at.is_(None),
+        )
+        .scalar_subquery()
+    )
+
+
+async def _ensure_workloads(session: AsyncSession, *conditions) -> set[int]:
+    """Create missing workload rows for users matching conditions, seeded with a one-off recount.
+
+    Returns the ids that were created; their count already reflects the current ticket rows.
+    """
+    missing = (
+        select(User.id, User.school_id, _open_count_for(User.id))
+        .where(*conditions, ~exists().where(StaffWorkload.user_id == User.id))
+        .order_by(User.id)
+    )
+    result = await session.execute(
+        insert(StaffWorkload)
+        .from_select(["user_id", "school_id", "open_count"], missing)
+        .on_conflict_do_nothing(index_elements=["user_id"])
+        .returning(StaffWorkload.user_id)
+    )
+    return set(result.scalars().all())
+
+
+async def pick_assignee(session: AsyncSession, school_id: int, role: Role) -> int | None:
+    """Reserve the least-loaded staff member in (school, role) and count the new ticket against them.
+
+    Rows held by concurrent, uncommitted creates are skipped (FOR UPDATE SKIP LOCKED), so
+    simultaneous creates spread across staff instead of all landing on the same person.
+    """
+    await _ensure_workloads(session, User.school_id == school_id, User.role == role)
+    candidates = (
+        select(StaffWorkload.user_id)
+        .join(User, User.id == StaffWorkload.user_id)
+        .where(StaffWorkload.school_id == school_id, User.role == role)
+        .order_by(StaffWorkload.open_count, StaffWorkload.user_id)
+        .limit(1)
+    )
+    user_id = await session.scalar(candidates.with_for_update(of=StaffWorkload, skip_locked=True))
+    if user_id is None:
+        # Everyone is reserved by in-flight creates: wait for the least-loaded one instead.
+        user_id = await session.scalar(candidates.with_for_update(of=StaffWorkload))
+    if user_id is None:
+        return None
+    await session.execute(
+        update(StaffWorkload)
+        .where(StaffWorkload.user_id == user_id)
+        .values(open_count=StaffWorkload.open_count + 1)
+    )
+    return user_id
+
+
+async def adjust_workloads(session: AsyncSession, deltas: Counter) -> None:
+    """Apply {user_id: +/-n} open-count changes after the ticket write they describe.
+
+    Zero deltas and unassigned (None) are ignored; rows seeded here already include the write.
+    """
+    deltas = {uid: d for uid, d in deltas.items() if uid is not None and d}
+    if not deltas:
+        return
+    seeded = await _ensure_workloads(session, User.id.in_(list(deltas)))
+    deltas = {uid: d for uid, d in deltas.items() if uid not in seeded}
+    if not deltas:
+        return
+    table = StaffWorkload.__table__
+    # Rows are updated in user_id order so concurrent writes lock them in the same order.
+    await session.execute(
+        update(table)
+        .where(table.c.user_id == bindparam("uid"))
+        .values(open_count=table.c.open_count + bindparam("delta")),
+        [{"uid": uid, "delta": d} for uid, d in sorted(deltas.items())],
+    )
+
+
+def workload_deltas(before: list[tuple[int | None, bool]], after: list[tuple[int | None, bool]]) -> Counter:
+    """Open-count changes between (assignee, is_open) pairs before and after a write."""
+    deltas: Counter = Counter()
+    for assignee, is_open in before:
+        if is_open:
+            deltas[assignee] -= 1
+    for assignee, is_open in after:
+        if is_open:
+            deltas[assignee] += 1
+    return deltas
@@ -1,5 +1,6 @@
 # ABOUTME: Audit log writes for critical actions.
 
+from sqlalchemy import insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models.audit import AuditLog
@@ -24,3 +25,10 @@ async def log_audit(
     )
     session.add(entry)
     await session.flush()
+
+
+async def log_audit_many(session: AsyncSession, entries: list[dict]) -> None:
+    """Write several audit rows in a single INSERT. Each entry holds log_audit's keyword fields."""
+    if not entries:
+        return
+    await session.execute(insert(AuditLog).values(entries))
@@ -9,6 +9,7 @@ from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.config import get_settings
+from app.core.user_cache import invalidate_user
 from app.models.user import OTP, Role, User
 from app.services.otp_service import (
     generate_otp_code,
@@ -83,8 +84,10 @@ async def verify_otp_and_issue_token(
         if stub_staff_ok and user.role == Role.PARENT:
             user.role = Role.TEACHER
             await session.flush()
+            invalidate_user(session, user.school_id, user.id)
         elif stub_ok and user.role != Role.PARENT:
             user.role = Role.PARENT
             await session.flush()
+            invalidate_user(session, user.school_id, user.id)
     token = create_access_token(user.id, user.role, user.school_id)
     return (user, token)
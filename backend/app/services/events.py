@@ -0,0 +1,172 @@
+# ABOUTME: In-process broker for live ticket events streamed over SSE (GET /tickets/events).
+# ABOUTME: Events ride the pub/sub layer, so every instance's subscribers see them after commit.
+
+import asyncio
+import json
+import uuid
+from collections import deque
+from dataclasses import dataclass, field
+
+from app.core.pubsub import pubsub, queue_notification
+from app.models.ticket import Ticket
+from app.models.user import Role, User
+
+REPLAY_BUFFER_SIZE = 2000
+SUBSCRIBER_QUEUE_SIZE = 256
+HEARTBEAT_SECONDS = 15.0
+
+
+@dataclass(frozen=True)
+class TicketEvent:
+    epoch: str
+    seq: int
+    type: str
+    ticket_id: int
+    school_id: int
+    created_by_id: int
+    staff_only: bool
+    data: dict
+
+    @property
+    def id(self) -> str:
+        """SSE id, "<epoch>-<seq>": sequences are per broker, so an id is only meaningful to the broker
+        that issued it."""
+        return f"{self.epoch}-{self.seq}"
+
+
+def parse_event_id(value: str) -> tuple[str, int] | None:
+    epoch, sep, seq = value.rpartition("-")
+    if not sep or not epoch or not seq.isdigit():
+        return None
+    return epoch, int(seq)
+
+
+@dataclass(eq=False)
+class Subscription:
+    """One SSE connection: a bounded queue plus the viewer's scope for filtering."""
+
+    user_id: int
+    school_id: int
+    is_parent: bool
+    queue: asyncio.Queue = field(default_factory=lambda: asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE))
+    overflowed: bool = False
+
+    def can_see(self, ev: TicketEvent) -> bool:
+        # Same scoping as get_ticket_for_user; staff-only events never reach parents.
+        if self.is_parent:
+            return ev.created_by_id == self.user_id and not ev.staff_only
+        return ev.school_id == self.school_id
+
+
+class EventBroker:
+    """Fan-out of committed ticket events to SSE subscribers, with a replay buffer for Last-Event-ID."""
+
+    def __init__(self, buffer_size: int = REPLAY_BUFFER_SIZE):
+        # Each broker (one per process) numbers events independently. The epoch prefix tells it apart, so
+        # a Last-Event-ID from another instance or from before a restart triggers a resync.
+        self.epoch = uuid.uuid4().hex[:12]
+        self._next_id = 0
+        self._buffer: deque[TicketEvent] = deque(maxlen=buffer_size)
+        self._subscribers: set[Subscription] = set()
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subscribers)
+
+    def publish(self, type_: str, ticket_id: int, school_id: int, created_by_id: int, staff_only: bool, data: dict) -> TicketEvent:
+        self._next_id += 1
+        ev = TicketEvent(self.epoch, self._next_id, type_, ticket_id, school_id, created_by_id, staff_only, data)
+        self._buffer.append(ev)
+        for sub in list(self._subscribers):
+            if sub.overflowed or not sub.can_see(ev):
+                continue
+            try:
+                sub.queue.put_nowait(ev)
+            except asyncio.QueueFull:
+                # Slow consumer: end its stream; the client reconnects and replays from Last-Event-ID.
+                sub.overflowed = True
+        return ev
+
+    def subscribe(self, user: User, last_event_id: str | None = None) -> tuple[Subscription, list[TicketEvent], bool]:
+        """Register a subscriber. Returns (subscription, replayed events, resync_needed)."""
+        sub = Subscription(user_id=user.id, school_id=user.school_id, is_parent=user.role == Role.PARENT)
+        pubsub.watch_school(user.school_id)
+        replay: list[TicketEvent] = []
+        resync = False
+        if last_event_id:
+            parsed = parse_event_id(last_event_id)
+            oldest = self._buffer[0].seq if self._buffer else self._next_id + 1
+            if parsed is None or parsed[0] != self.epoch:
+                resync = True
+            elif parsed[1] < oldest - 1 or parsed[1] > self._next_id:
+                resync = True
+            else:
+                replay = [ev for ev in self._buffer if ev.seq > parsed[1] and sub.can_see(ev)]
+        self._subscribers.add(sub)
+        return sub, replay, resync
+
+    def unsubscribe(self, sub: Subscription) -> None:
+        self._subscribers.discard(sub)
+
+    def resync_all(self) -> None:
+        """Tell every subscriber to refetch: events may have been missed (e.g. pub/sub reconnect)."""
+        for sub in list(self._subscribers):
+            try:
+                sub.queue.put_nowait(None)
+            except asyncio.QueueFull:
+                sub.overflowed = True
+
+    async def stream(
+        self, sub: Subscription, replay: list[TicketEvent], resync: bool, heartbeat: float = HEARTBEAT_SECONDS
+    ):
+        """Async generator of SSE frames for one subscriber; unsubscribes when the client goes away."""
+        try:
+            yield "retry: 3000\n\n"
+            if resync:
+                yield "event: resync\ndata: {}\n\n"
+            for ev in replay:
+                yield format_sse(ev)
+            while True:
+                try:
+                    ev = await asyncio.wait_for(sub.queue.get(), timeout=heartbeat)
+                except asyncio.TimeoutError:
+                    yield ": heartbeat\n\n"
+                    continue
+                if sub.overflowed:
+                    return
+                yield "event: resync\ndata: {}\n\n" if ev is None else format_sse(ev)
+        finally:
+            self.unsubscribe(sub)
+
+
+broker = EventBroker()
+
+
+def queue_ticket_event(session, type_: str, ticket: Ticket, data: dict, staff_only: bool = False) -> None:
+    """Stage an event on the session; it reaches every instance's subscribers after commit, never on rollback."""
+    queue_notification(
+        session,
+        "ticket_event",
+        ticket.school_id,
+        {
+            "type": type_,
+            "ticket_id": ticket.id,
+            "created_by_id": ticket.created_by_id,
+            "staff_only": staff_only,
+            "data": {"ticket_id": ticket.id, **data},
+        },
+    )
+
+
+def _on_ticket_event(school_id: int | None, payload: dict, truncated: bool) -> None:
+    broker.publish(
+        payload["type"], payload["ticket_id"], school_id, payload["created_by_id"], payload["staff_only"], payload["data"]
+    )
+
+
+pubsub.subscribe("ticket_event", _on_ticket_event)
+pubsub.on_reconnect(broker.resync_all)
+
+
+def format_sse(ev: TicketEvent) -> str:
+    return f"id: {ev.id}\nevent: {ev.type}\ndata: {json.dumps(ev.data, default=str)}\n\n"
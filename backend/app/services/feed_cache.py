@@ -0,0 +1,125 @@
+# ABOUTME: Process-local cache of rendered announcement feed pages, shared by every user in a segment.
+# ABOUTME: Keyed by school, audience and grade/class set; read flags are overlaid per user at response time.
+
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import NamedTuple
+
+from app.core.pubsub import pubsub
+
+FEED_CACHE_MAX_BYTES = 16 * 1024 * 1024
+# Parent-student links change outside the API; bound how long a parent's segment can be stale.
+SEGMENT_TTL = timedelta(minutes=5)
+SEGMENT_CACHE_SIZE = 10_000
+
+
+class FeedSegment(NamedTuple):
+    """Everything that decides which announcements a user sees. Parents with children in the same
+    (class, section) set share a segment; all staff of a school share one."""
+
+    school_id: int
+    audience: str  # "parents" | "staff"
+    classes: tuple[tuple[str, str], ...] = ()
+
+
+@dataclass(frozen=True)
+class _Page:
+    items: tuple[dict, ...]
+    size: int
+
+
+def _estimate_size(items) -> int:
+    return sum(64 + sum(len(str(v)) for v in item.values()) for item in items)
+
+
+class FeedCache:
+    """LRU of feed pages (rendered announcements, no read flags) bounded by an estimate of their size,
+    plus each parent's segment. Creating or archiving an announcement drops the school's pages."""
+
+    def __init__(self, max_bytes: int = FEED_CACHE_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self._pages: OrderedDict[tuple, _Page] = OrderedDict()
+        self._bytes = 0
+        self._epoch = 0
+        self._generations: dict[int, int] = {}
+        self._segments: OrderedDict[int, tuple[FeedSegment, datetime]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def generation(self, school_id: int) -> tuple[int, int]:
+        """Token for a fill: a page loaded before an invalidation or clear must not be stored after it."""
+        return self._epoch, self._generations.get(school_id, 0)
+
+    def get(self, key: tuple) -> tuple[dict, ...] | None:
+        page = self._pages.get(key)
+        if page is None:
+            self.misses += 1
+            return None
+        self._pages.move_to_end(key)
+        self.hits += 1
+        return page.items
+
+    def put(self, key: tuple, items: list[dict], generation: tuple[int, int]) -> None:
+        """Store a page loaded under `generation`; skipped if the school was invalidated meanwhile."""
+        segment = key[0]
+        if generation != self.generation(segment.school_id):
+            return
+        page = _Page(tuple(items), _estimate_size(items))
+        if page.size > self.max_bytes:
+            return
+        self._drop(key)
+        self._pages[key] = page
+        self._bytes += page.size
+        while self._bytes > self.max_bytes:
+            oldest = next(iter(self._pages))
+            self._drop(oldest)
+            self.evictions += 1
+
+    def _drop(self, key: tuple) -> None:
+        page = self._pages.pop(key, None)
+        if page is not None:
+            self._bytes -= page.size
+
+    def invalidate_school(self, school_id: int) -> None:
+        self._generations[school_id] = self._generations.get(school_id, 0) + 1
+        for key in [k for k in self._pages if k[0].school_id == school_id]:
+            self._drop(key)
+
+    def segment_for(self, user_id: int, now: datetime) -> FeedSegment | None:
+        entry = self._segments.get(user_id)
+        if entry is None or entry[1] <= now:
+            self._segments.pop(user_id, None)
+            return None
+        self._segments.move_to_end(user_id)
+        return entry[0]
+
+    def put_segment(self, user_id: int, segment: FeedSegment, now: datetime) -> None:
+        self._segments[user_id] = (segment, now + SEGMENT_TTL)
+        self._segments.move_to_end(user_id)
+        while len(self._segments) > SEGMENT_CACHE_SIZE:
+            self._segments.popitem(last=False)
+
+    def clear(self) -> None:
+        self._epoch += 1
+        self._pages.clear()
+        self._bytes = 0
+        self._segments.clear()
+
+    def metrics(self) -> dict:
+        return {
+            "pages": len(self._pages),
+            "bytes": self._bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+
+feed_cache = FeedCache()
+pubsub.subscribe("announcement", lambda school_id, data, truncated: feed_cache.invalidate_school(school_id))
+pubsub.subscribe("announcement_archived", lambda school_id, data, truncated: feed_cache.invalidate_school(school_id))
+# Invalidations sent while the LISTEN connection was down are lost; start over.
+pubsub.on_reconnect(feed_cache.clear)
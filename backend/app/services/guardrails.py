@@ -1,21 +1,132 @@
 # ABOUTME: Ticket creation guardrails: open count, cooldown, 7-day cap, one open Other.
-# ABOUTME: Returns user-friendly error message or None if allowed.
+# ABOUTME: Rules are declarative FILTER aggregates evaluated in one query; returns a message or None.
 
+from collections import OrderedDict
+from collections.abc import Callable
+from dataclasses import dataclass
 from datetime import datetime, timezone, timedelta
 
-from sqlalchemy import func, select
+from sqlalchemy import ColumnElement, func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.pubsub import pubsub, queue_notification
 from app.models.ticket import Ticket, TicketCategory, TicketStatus
 from app.models.user import Role, User
+from app.services.school_settings import get_school_config
 
 MAX_OPEN_TICKETS = 3
 COOLDOWN_MINUTES = 30
 MAX_TICKETS_7_DAYS = 5
 MAX_OPEN_OTHER = 1
+MAX_URGENT_7_DAYS = 1
 
 
 URGENT_ALLOWED_CATEGORIES = (TicketCategory.TRANSPORT, TicketCategory.HEALTH_SAFETY)
+OPEN_STATUSES = (TicketStatus.PENDING, TicketStatus.IN_PROGRESS)
+
+BLOCKED_MESSAGE = "Ticket creation is temporarily unavailable. Please contact the school office."
+
+# First key of the two-key advisory lock taken per parent while their creation limits are checked;
+# the second key is the parent's user id. Keep it distinct from any other advisory lock namespace.
+TICKET_CREATION_LOCK_NAMESPACE = 1001
+
+
+@dataclass(frozen=True)
+class GuardrailLimits:
+    """Thresholds for one school: the defaults above, overridden per school in school_settings."""
+
+    max_open_tickets: int = MAX_OPEN_TICKETS
+    cooldown_minutes: int = COOLDOWN_MINUTES
+    max_tickets_7_days: int = MAX_TICKETS_7_DAYS
+    max_open_other: int = MAX_OPEN_OTHER
+    max_urgent_7_days: int = MAX_URGENT_7_DAYS
+
+
+async def get_limits(session: AsyncSession, school_id: int) -> GuardrailLimits:
+    config = await get_school_config(session, school_id)
+    return GuardrailLimits(**config.thresholds)
+
+
+def _aware(value: datetime) -> datetime:
+    return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value
+
+
+@dataclass(frozen=True)
+class GuardrailRule:
+    """One creation limit. aggregate(user, now) is a FILTERed aggregate over the parent's tickets,
+    evaluated together with every other rule in a single query; None means the rule only looks at the
+    request. violated(value, now, limits) checks the value against the school's GuardrailLimits.
+    applies(category, urgency) decides whether the rule runs for this request."""
+
+    name: str
+    message: str
+    violated: Callable[[object, datetime, GuardrailLimits], bool]
+    aggregate: Callable[[User, datetime], ColumnElement] | None = None
+    applies: Callable[[TicketCategory, bool], bool] = lambda category, urgency: True
+    # False for rules that only block some requests (a category or urgency); status views skip them.
+    blocks_all: bool = True
+
+
+# Evaluated in order; the first violated rule's message is returned.
+GUARDRAIL_RULES: tuple[GuardrailRule, ...] = (
+    GuardrailRule(
+        name="open_tickets",
+        message="You already have the maximum number of open tickets. Please wait for existing tickets to be resolved before creating a new one.",
+        aggregate=lambda user, now: func.count(Ticket.id).filter(
+            Ticket.school_id == user.school_id, Ticket.status.in_(OPEN_STATUSES)
+        ),
+        violated=lambda value, now, limits: value >= limits.max_open_tickets,
+    ),
+    GuardrailRule(
+        name="cooldown",
+        message="Please wait a few minutes between creating tickets. You can try again shortly.",
+        aggregate=lambda user, now: func.max(Ticket.created_at),
+        violated=lambda value, now, limits: (
+            value is not None and (now - _aware(value)).total_seconds() < limits.cooldown_minutes * 60
+        ),
+    ),
+    GuardrailRule(
+        name="weekly",
+        message="You have reached the limit of tickets per week. Please wait until next week or contact the school office.",
+        aggregate=lambda user, now: func.count(Ticket.id).filter(Ticket.created_at >= now - timedelta(days=7)),
+        violated=lambda value, now, limits: value >= limits.max_tickets_7_days,
+    ),
+    GuardrailRule(
+        name="open_other",
+        message="You already have an open ticket in the \"Other\" category. Please wait for it to be resolved before creating another.",
+        aggregate=lambda user, now: func.count(Ticket.id).filter(
+            Ticket.school_id == user.school_id,
+            Ticket.category == TicketCategory.OTHER,
+            Ticket.status.in_(OPEN_STATUSES),
+        ),
+        violated=lambda value, now, limits: value >= limits.max_open_other,
+        applies=lambda category, urgency: category == TicketCategory.OTHER,
+        blocks_all=False,
+    ),
+    GuardrailRule(
+        name="urgent_category",
+        message="Urgent tickets are only allowed for Transport and Health & Safety.",
+        violated=lambda value, now, limits: True,
+        applies=lambda category, urgency: urgency and category not in URGENT_ALLOWED_CATEGORIES,
+        blocks_all=False,
+    ),
+    GuardrailRule(
+        name="urgent_weekly",
+        message="You may only have one urgent ticket per week.",
+        aggregate=lambda user, now: func.count(Ticket.id).filter(
+            Ticket.urgency.is_(True), Ticket.created_at >= now - timedelta(days=7)
+        ),
+        violated=lambda value, now, limits: value >= limits.max_urgent_7_days,
+        applies=lambda category, urgency: urgency,
+        blocks_all=False,
+    ),
+)
+
+
+async def lock_ticket_creation(session: AsyncSession, user_id: int) -> None:
+    """Serialize ticket creation per parent until the surrounding transaction ends, so concurrent
+    requests cannot all pass the limits before any of their tickets is committed."""
+    await session.execute(select(func.pg_advisory_xact_lock(TICKET_CREATION_LOCK_NAMESPACE, user_id)))
 
 
 async def check_guardrails(
@@ -28,72 +139,153 @@ async def check_guardrails(
         return None
     now = datetime.now(timezone.utc)
     until_blocked = getattr(created_by, "ticket_creation_blocked_until", None)
-    if until_blocked:
-        ut = until_blocked.replace(tzinfo=timezone.utc) if until_blocked.tzinfo is None else until_blocked
-        if ut > now:
-            return "Ticket creation is temporarily unavailable. Please contact the school office."
-    open_statuses = (TicketStatus.PENDING, TicketStatus.IN_PROGRESS)
-
-    result = await session.execute(
-        select(func.count(Ticket.id)).where(
-            Ticket.created_by_id == created_by.id,
-            Ticket.school_id == created_by.school_id,
-            Ticket.status.in_(open_statuses),
-        )
-    )
-    open_count = result.scalar() or 0
-    if open_count >= MAX_OPEN_TICKETS:
-        return "You already have the maximum number of open tickets. Please wait for existing tickets to be resolved before creating a new one."
-
-    result = await session.execute(
-        select(func.max(Ticket.created_at)).where(
-            Ticket.created_by_id == created_by.id,
-        )
-    )
-    last_created = result.scalar()
-    if last_created:
-        if last_created.tzinfo is None:
-            last_created = last_created.replace(tzinfo=timezone.utc)
-        if (now - last_created).total_seconds() < COOLDOWN_MINUTES * 60:
-            return "Please wait a few minutes between creating tickets. You can try again shortly."
-
-    seven_days_ago = now - timedelta(days=7)
-    result = await session.execute(
-        select(func.count(Ticket.id)).where(
-            Ticket.created_by_id == created_by.id,
-            Ticket.created_at >= seven_days_ago,
-        )
-    )
-    recent_count = result.scalar() or 0
-    if recent_count >= MAX_TICKETS_7_DAYS:
-        return "You have reached the limit of tickets per week. Please wait until next week or contact the school office."
-
-    if category == TicketCategory.OTHER:
-        result = await session.execute(
-            select(func.count(Ticket.id)).where(
-                Ticket.created_by_id == created_by.id,
-                Ticket.school_id == created_by.school_id,
-                Ticket.category == TicketCategory.OTHER,
-                Ticket.status.in_(open_statuses),
-            )
-        )
-        open_other = result.scalar() or 0
-        if open_other >= MAX_OPEN_OTHER:
-            return "You already have an open ticket in the \"Other\" category. Please wait for it to be resolved before creating another."
-
-    if urgency:
-        if category not in URGENT_ALLOWED_CATEGORIES:
-            return "Urgent tickets are only allowed for Transport and Health & Safety."
-        seven_days_ago = now - timedelta(days=7)
-        result = await session.execute(
-            select(func.count(Ticket.id)).where(
-                Ticket.created_by_id == created_by.id,
-                Ticket.urgency.is_(True),
-                Ticket.created_at >= seven_days_ago,
-            )
-        )
-        urgent_count = result.scalar() or 0
-        if urgent_count >= 1:
-            return "You may only have one urgent ticket per week."
+    if until_blocked and _aware(until_blocked) > now:
+        return BLOCKED_MESSAGE
 
+    limits = await get_limits(session, created_by.school_id)
+    # Held until commit: the caller creates the ticket in this same transaction.
+    await lock_ticket_creation(session, created_by.id)
+    rules = [rule for rule in GUARDRAIL_RULES if rule.applies(category, urgency)]
+    aggregates = [rule.aggregate(created_by, now).label(rule.name) for rule in rules if rule.aggregate is not None]
+    values = {}
+    if aggregates:
+        result = await session.execute(select(*aggregates).where(Ticket.created_by_id == created_by.id))
+        values = result.one()._asdict()
+    for rule in rules:
+        if rule.violated(values.get(rule.name), now, limits):
+            return rule.message
     return None
+
+
+# --- Cached quota state for GET /me/ticket-creation-status ---------------------------------------
+
+QUOTA_WINDOW = timedelta(days=7)
+QUOTA_CACHE_TTL = timedelta(minutes=10)
+QUOTA_CACHE_SIZE = 10_000
+
+
+@dataclass
+class QuotaState:
+    """Every rule's aggregate for one parent, valid until the next time-based change (a cooldown
+    ending, a ticket leaving the 7-day window, a block expiring) or an explicit invalidation."""
+
+    values: dict
+    week_oldest: datetime | None
+    blocked_until: datetime | None
+    valid_until: datetime
+
+
+@dataclass
+class CreationStatus:
+    blocked: bool
+    reason: str | None
+    block_until: datetime | None
+    remaining: dict[str, int]
+
+
+class QuotaCache:
+    """Per-parent QuotaState, LRU-bounded. Entries expire at valid_until or on invalidate()."""
+
+    def __init__(self, maxsize: int = QUOTA_CACHE_SIZE):
+        self.maxsize = maxsize
+        self._entries: OrderedDict[int, QuotaState] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, user_id: int, now: datetime) -> QuotaState | None:
+        state = self._entries.get(user_id)
+        if state is None or state.valid_until <= now:
+            self._entries.pop(user_id, None)
+            self.misses += 1
+            return None
+        self._entries.move_to_end(user_id)
+        self.hits += 1
+        return state
+
+    def put(self, user_id: int, state: QuotaState) -> None:
+        self._entries[user_id] = state
+        self._entries.move_to_end(user_id)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, user_id: int) -> None:
+        self._entries.pop(user_id, None)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+quota_cache = QuotaCache()
+pubsub.subscribe("quota_invalidate", lambda school_id, data, truncated: quota_cache.invalidate(data["user_id"]))
+# Expiry times depend on the school's cooldown; settings changes are rare, so start over.
+pubsub.subscribe("school_settings_changed", lambda school_id, data, truncated: quota_cache.clear())
+
+
+def invalidate_quota(session, school_id: int, user_id: int) -> None:
+    """Drop the parent's cached quota on every instance once the current transaction commits."""
+    queue_notification(session, "quota_invalidate", school_id, {"user_id": user_id})
+
+
+async def load_quota_state(session: AsyncSession, user: User, now: datetime, limits: GuardrailLimits) -> QuotaState:
+    """All rule aggregates in one query, regardless of category or urgency."""
+    aggregates = [rule.aggregate(user, now).label(rule.name) for rule in GUARDRAIL_RULES if rule.aggregate is not None]
+    week_oldest = func.min(Ticket.created_at).filter(Ticket.created_at >= now - QUOTA_WINDOW).label("week_oldest")
+    urgent_oldest = func.min(Ticket.created_at).filter(
+        Ticket.urgency.is_(True), Ticket.created_at >= now - QUOTA_WINDOW
+    ).label("urgent_week_oldest")
+    result = await session.execute(select(*aggregates, week_oldest, urgent_oldest).where(Ticket.created_by_id == user.id))
+    values = result.one()._asdict()
+    blocked_until = getattr(user, "ticket_creation_blocked_until", None)
+    blocked_until = _aware(blocked_until) if blocked_until and _aware(blocked_until) > now else None
+
+    expiries = [now + QUOTA_CACHE_TTL]
+    if values["cooldown"] is not None:
+        expiries.append(_aware(values["cooldown"]) + timedelta(minutes=limits.cooldown_minutes))
+    for oldest in (values["week_oldest"], values["urgent_week_oldest"]):
+        if oldest is not None:
+            expiries.append(_aware(oldest) + QUOTA_WINDOW)
+    if blocked_until is not None:
+        expiries.append(blocked_until)
+    valid_until = min(e for e in expiries if e > now)
+    return QuotaState(
+        values=values,
+        week_oldest=_aware(values["week_oldest"]) if values["week_oldest"] else None,
+        blocked_until=blocked_until,
+        valid_until=valid_until,
+    )
+
+
+def _block_until(rule: GuardrailRule, state: QuotaState, limits: GuardrailLimits) -> datetime | None:
+    if rule.name == "cooldown":
+        return _aware(state.values["cooldown"]) + timedelta(minutes=limits.cooldown_minutes)
+    if rule.name == "weekly" and state.week_oldest is not None:
+        return state.week_oldest + QUOTA_WINDOW
+    return None  # open_tickets lifts when a ticket is resolved, not at a known time
+
+
+async def get_creation_status(session: AsyncSession, user: User) -> CreationStatus:
+    """Whether the parent can create a ticket right now, from the cached quota state when valid."""
+    if user.role != Role.PARENT:
+        return CreationStatus(blocked=False, reason=None, block_until=None, remaining={})
+    now = datetime.now(timezone.utc)
+    limits = await get_limits(session, user.school_id)
+    state = quota_cache.get(user.id, now)
+    if state is None:
+        state = await load_quota_state(session, user, now, limits)
+        quota_cache.put(user.id, state)
+        pubsub.watch_school(user.school_id)
+    v = state.values
+    remaining = {
+        "open_tickets": max(limits.max_open_tickets - v["open_tickets"], 0),
+        "weekly": max(limits.max_tickets_7_days - v["weekly"], 0),
+        "open_other": max(limits.max_open_other - v["open_other"], 0),
+        "urgent_weekly": max(limits.max_urgent_7_days - v["urgent_weekly"], 0),
+    }
+    if state.blocked_until is not None:
+        return CreationStatus(blocked=True, reason=BLOCKED_MESSAGE, block_until=state.blocked_until, remaining=remaining)
+    for rule in GUARDRAIL_RULES:
+        if rule.blocks_all and rule.aggregate is not None and rule.violated(v[rule.name], now, limits):
+            return CreationStatus(
+                blocked=True, reason=rule.message, block_until=_block_until(rule, state, limits), remaining=remaining
+            )
+    return CreationStatus(blocked=False, reason=None, block_until=None, remaining=remaining)
@@ -0,0 +1,201 @@
+# ABOUTME: Write-behind buffer for announcement read receipts: de-duplicated in memory, flushed in bulk.
+# ABOUTME: Flushes on a size or time threshold and drains on shutdown; at-least-once via the unique key.
+
+import asyncio
+import logging
+import time
+from collections import defaultdict
+from datetime import datetime, timezone
+
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.exc import IntegrityError
+
+from app.core.db import get_session_factory
+from app.models.announcement import AnnouncementRead
+from app.services.announcement_service import add_read_counts
+
+logger = logging.getLogger(__name__)
+
+FLUSH_INTERVAL_SECONDS = 1.0
+FLUSH_SIZE = 500
+# Past this many unflushed receipts (e.g. the database is down), callers write synchronously instead.
+MAX_BUFFERED = 50_000
+INSERT_CHUNK = 1000
+
+
+class ReadReceiptBuffer:
+    """Pending (announcement_id, user_id) receipts for this process. Receipts stay visible through
+    pending_for() until their flush commits, so a user's own feed never shows them unread; other
+    instances see them after the next flush."""
+
+    def __init__(self, flush_interval: float = FLUSH_INTERVAL_SECONDS, flush_size: int = FLUSH_SIZE):
+        self.flush_interval = flush_interval
+        self.flush_size = flush_size
+        self._pending: dict[tuple[int, int], datetime] = {}
+        self._inflight: dict[tuple[int, int], datetime] = {}
+        self._by_user: dict[int, set[int]] = defaultdict(set)
+        self._factory = None
+        self._task: asyncio.Task | None = None
+        self._wake: asyncio.Event | None = None
+        self._stopping = False
+        self._flush_lock = asyncio.Lock()
+        self.flushes = 0
+        self.flushed_rows = 0
+        self.failures = 0
+        self.dropped = 0
+        self.last_flush_ms = 0.0
+        self.max_flush_ms = 0.0
+        self._total_flush_ms = 0.0
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None
+
+    @property
+    def depth(self) -> int:
+        return len(self._pending) + len(self._inflight)
+
+    def accepting(self) -> bool:
+        return self.running and self.depth < MAX_BUFFERED
+
+    def add(self, user_id: int, announcement_ids) -> None:
+        now = datetime.now(timezone.utc)
+        for announcement_id in announcement_ids:
+            key = (announcement_id, user_id)
+            if key in self._pending or key in self._inflight:
+                continue
+            self._pending[key] = now
+            self._by_user[user_id].add(announcement_id)
+        if len(self._pending) >= self.flush_size and self._wake is not None:
+            self._wake.set()
+
+    def pending_for(self, user_id: int) -> set[int]:
+        return self._by_user.get(user_id, set())
+
+    async def start(self, engine) -> None:
+        if self._task is not None:
+            return
+        self._factory = get_session_factory(engine)
+        self._wake = asyncio.Event()
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the flush loop and write everything still buffered. The loop is asked to exit rather
+        than cancelled, so a flush that is already running gets to commit."""
+        task, self._task = self._task, None
+        if task is not None:
+            self._stopping = True
+            self._wake.set()
+            try:
+                await task
+            finally:
+                self._stopping = False
+        await self.flush()
+        if self.depth:
+            logger.error("Dropping %d unflushed read receipts on shutdown", self.depth)
+
+    async def _run(self) -> None:
+        while not self._stopping:
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            await self.flush()
+
+    async def flush(self) -> None:
+        async with self._flush_lock:
+            if not self._pending or self._factory is None:
+                return
+            self._inflight, self._pending = self._pending, {}
+            rows = [
+                {"announcement_id": announcement_id, "user_id": user_id, "read_at": read_at}
+                for (announcement_id, user_id), read_at in self._inflight.items()
+            ]
+            start = time.perf_counter()
+            try:
+                try:
+                    await self._write(rows)
+                except IntegrityError:
+                    # A permanently bad row (its announcement or user was deleted after the read) fails
+                    # the whole batch; write row by row so only the bad ones are dropped.
+                    await self._write_each(rows)
+            except Exception:
+                # Transient (e.g. the database is unreachable): retry with the next flush; the unique
+                # key makes a repeated insert harmless.
+                logger.exception("Flushing %d read receipts failed", len(rows))
+                self.failures += 1
+                self._requeue()
+                return
+            except BaseException:
+                # Cancelled mid-flush: keep the receipts for whoever flushes next instead of losing them.
+                self._requeue()
+                raise
+            elapsed = (time.perf_counter() - start) * 1000
+            for announcement_id, user_id in self._inflight:
+                ids = self._by_user.get(user_id)
+                if ids is not None:
+                    ids.discard(announcement_id)
+                    if not ids:
+                        del self._by_user[user_id]
+            self._inflight = {}
+            self.flushes += 1
+            self.flushed_rows += len(rows)
+            self.last_flush_ms = elapsed
+            self.max_flush_ms = max(self.max_flush_ms, elapsed)
+            self._total_flush_ms += elapsed
+
+    def _insert(self, rows: list[dict]):
+        return (
+            insert(AnnouncementRead)
+            .values(rows)
+            .on_conflict_do_nothing(index_elements=["announcement_id", "user_id"])
+            .returning(AnnouncementRead.announcement_id)
+        )
+
+    async def _write(self, rows: list[dict]) -> None:
+        async with self._factory() as session:
+            stored: list[int] = []
+            for i in range(0, len(rows), INSERT_CHUNK):
+                result = await session.execute(self._insert(rows[i:i + INSERT_CHUNK]))
+                stored.extend(result.scalars().all())
+            # Only receipts that were actually new count, so a retried flush never double counts.
+            await add_read_counts(session, stored)
+            await session.commit()
+
+    async def _write_each(self, rows: list[dict]) -> None:
+        async with self._factory() as session:
+            stored: list[int] = []
+            dropped: list[dict] = []
+            for row in rows:
+                try:
+                    async with session.begin_nested():
+                        result = await session.execute(self._insert([row]))
+                except IntegrityError:
+                    dropped.append(row)
+                    continue
+                stored.extend(result.scalars().all())
+            await add_read_counts(session, stored)
+            await session.commit()
+        if dropped:
+            self.dropped += len(dropped)
+            logger.warning("Dropped %d read receipts that can no longer be stored: %s", len(dropped), dropped[:10])
+
+    def _requeue(self) -> None:
+        self._pending = {**self._inflight, **self._pending}
+        self._inflight = {}
+
+    def metrics(self) -> dict:
+        return {
+            "queue_depth": self.depth,
+            "flushes": self.flushes,
+            "flushed_rows": self.flushed_rows,
+            "failures": self.failures,
+            "dropped": self.dropped,
+            "last_flush_ms": round(self.last_flush_ms, 3),
+            "max_flush_ms": round(self.max_flush_ms, 3),
+            "avg_flush_ms": round(self._total_flush_ms / self.flushes, 3) if self.flushes else 0.0,
+        }
+
+
+read_buffer = ReadReceiptBuffer()
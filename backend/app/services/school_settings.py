@@ -0,0 +1,135 @@
+# ABOUTME: Resolved per-school configuration held in a process-wide cache with versioned invalidation.
+# ABOUTME: Office hours and guardrail limits read from here; updates bump the version and notify every instance.
+
+import logging
+from dataclasses import dataclass, field
+from datetime import date, datetime, time
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import get_settings
+from app.core.pubsub import pubsub, queue_notification
+from app.models.school_settings import SchoolSettings
+
+logger = logging.getLogger(__name__)
+
+THRESHOLD_FIELDS = ("max_open_tickets", "cooldown_minutes", "max_tickets_7_days", "max_open_other", "max_urgent_7_days")
+DEFAULT_OFFICE_HOURS = ("08:00", "17:00")
+
+
+@dataclass(frozen=True)
+class SchoolConfig:
+    """A school's settings with process defaults applied and values pre-parsed. version 0 means the
+    school has no row yet."""
+
+    school_id: int
+    version: int
+    office_hours_start: str
+    office_hours_end: str
+    start: time
+    end: time
+    timezone: ZoneInfo
+    holidays: frozenset[date] = frozenset()
+    # Only the thresholds the school overrides; guardrails fall back to their defaults for the rest.
+    thresholds: dict[str, int] = field(default_factory=dict)
+
+
+def _parse_hours(start: str, end: str) -> tuple[str, str, time, time]:
+    try:
+        return start, end, datetime.strptime(start, "%H:%M").time(), datetime.strptime(end, "%H:%M").time()
+    except ValueError:
+        start, end = DEFAULT_OFFICE_HOURS
+        return start, end, datetime.strptime(start, "%H:%M").time(), datetime.strptime(end, "%H:%M").time()
+
+
+def _zone(name: str) -> ZoneInfo:
+    try:
+        return ZoneInfo(name)
+    except (ZoneInfoNotFoundError, ValueError):
+        logger.warning("Unknown timezone %r; using UTC", name)
+        return ZoneInfo("UTC")
+
+
+def resolve_config(school_id: int, row: SchoolSettings | None) -> SchoolConfig:
+    settings = get_settings()
+    start, end, start_time, end_time = _parse_hours(
+        (row and row.office_hours_start) or settings.office_hours_start,
+        (row and row.office_hours_end) or settings.office_hours_end,
+    )
+    return SchoolConfig(
+        school_id=school_id,
+        version=row.version if row else 0,
+        office_hours_start=start,
+        office_hours_end=end,
+        start=start_time,
+        end=end_time,
+        timezone=_zone((row and row.timezone) or settings.office_hours_timezone),
+        holidays=frozenset(row.holidays or ()) if row else frozenset(),
+        thresholds={name: getattr(row, name) for name in THRESHOLD_FIELDS if row and getattr(row, name) is not None},
+    )
+
+
+class SchoolSettingsCache:
+    """SchoolConfig per school. Invalidations carry the new version, and a config older than the newest
+    announced version is never cached, so a load racing an update cannot reinstate stale settings."""
+
+    def __init__(self):
+        self._entries: dict[int, SchoolConfig] = {}
+        self._announced: dict[int, int] = {}
+
+    def get(self, school_id: int) -> SchoolConfig | None:
+        return self._entries.get(school_id)
+
+    def put(self, config: SchoolConfig) -> None:
+        if config.version < self._announced.get(config.school_id, 0):
+            return
+        self._entries[config.school_id] = config
+
+    def invalidate(self, school_id: int, version: int) -> None:
+        self._announced[school_id] = max(version, self._announced.get(school_id, 0))
+        cached = self._entries.get(school_id)
+        if cached is not None and cached.version < version:
+            del self._entries[school_id]
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+school_settings_cache = SchoolSettingsCache()
+pubsub.subscribe(
+    "school_settings_changed",
+    lambda school_id, data, truncated: school_settings_cache.invalidate(school_id, data["version"]),
+)
+pubsub.on_reconnect(school_settings_cache.clear)
+
+
+async def get_school_config(session: AsyncSession, school_id: int) -> SchoolConfig:
+    """The school's configuration; reads school_settings only when the process has no current copy."""
+    config = school_settings_cache.get(school_id)
+    if config is not None:
+        return config
+    config = resolve_config(school_id, await get_school_settings(session, school_id))
+    school_settings_cache.put(config)
+    pubsub.watch_school(school_id)
+    return config
+
+
+async def get_school_settings(session: AsyncSession, school_id: int) -> SchoolSettings | None:
+    result = await session.execute(select(SchoolSettings).where(SchoolSettings.school_id == school_id))
+    return result.scalar_one_or_none()
+
+
+async def update_school_settings(session: AsyncSession, school_id: int, values: dict) -> SchoolSettings:
+    """Upsert the given fields and bump the version; every instance drops its copy after commit."""
+    stmt = insert(SchoolSettings).values(school_id=school_id, version=1, **values)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[SchoolSettings.school_id],
+        set_={**values, "version": SchoolSettings.version + 1, "updated_at": stmt.excluded.updated_at},
+    ).returning(SchoolSettings)
+    result = await session.execute(stmt, execution_options={"populate_existing": True})
+    row = result.scalar_one()
+    queue_notification(session, "school_settings_changed", school_id, {"version": row.version})
+    return row
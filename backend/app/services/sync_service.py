@@ -0,0 +1,248 @@
+# ABOUTME: Delta sync for the offline PWA: rows changed since an opaque high-water token.
+# ABOUTME: Every section keys on (timestamp, id) and is re-read over a short overlap window.
+
+import base64
+import binascii
+import json
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import literal, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.announcement import Announcement, AnnouncementRead
+from app.models.ticket import Ticket, TicketMessage
+from app.models.user import Role, User
+from app.services.announcement_service import audience_clause, targeting_clause
+
+SYNC_PAGE_SIZE = 200
+# A row can commit with a timestamp (or serial id) older than rows already seen. No section's mark
+# moves past now - SYNC_OVERLAP, so those late commits are still picked up; clients upsert by id.
+# Buffered read receipts carry their read time and are flushed well within this window.
+SYNC_OVERLAP = timedelta(seconds=5)
+
+
+@dataclass
+class SyncMark:
+    """High-water mark: last (timestamp, id) seen per section. A section with no timestamp yet (a
+    token from before messages, announcements and reads were time-keyed) resumes from its id."""
+
+    ticket_at: datetime | None = None
+    ticket_id: int = 0
+    message_at: datetime | None = None
+    message_id: int = 0
+    announcement_at: datetime | None = None
+    announcement_id: int = 0
+    read_at: datetime | None = None
+    read_id: int = 0
+    # Tombstones: last (deleted_at, id) of a deleted ticket and (archived_at, id) of an archived announcement.
+    deleted_at: datetime | None = None
+    deleted_id: int = 0
+    archived_at: datetime | None = None
+    archived_id: int = 0
+
+
+@dataclass
+class SyncDelta:
+    mark: SyncMark
+    tickets: list = field(default_factory=list)
+    messages: list = field(default_factory=list)
+    announcements: list = field(default_factory=list)
+    read_announcement_ids: list[int] = field(default_factory=list)
+    deleted_ticket_ids: list[int] = field(default_factory=list)
+    archived_announcement_ids: list[int] = field(default_factory=list)
+    has_more: bool = False
+
+
+def _encode_at(value: datetime | None) -> str | None:
+    return value.isoformat() if value else None
+
+
+def _decode_at(value: str | None) -> datetime | None:
+    return datetime.fromisoformat(value) if value else None
+
+
+def encode_sync_token(mark: SyncMark) -> str:
+    raw = json.dumps(
+        {
+            "t": _encode_at(mark.ticket_at),
+            "ti": mark.ticket_id,
+            "mt": _encode_at(mark.message_at),
+            "m": mark.message_id,
+            "at": _encode_at(mark.announcement_at),
+            "a": mark.announcement_id,
+            "rt": _encode_at(mark.read_at),
+            "r": mark.read_id,
+            "d": _encode_at(mark.deleted_at),
+            "di": mark.deleted_id,
+            "x": _encode_at(mark.archived_at),
+            "xi": mark.archived_id,
+        },
+        separators=(",", ":"),
+    )
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_sync_token(token: str) -> SyncMark | None:
+    try:
+        data = json.loads(base64.urlsafe_b64decode(token + "=" * (-len(token) % 4)))
+        ticket_at = _decode_at(data["t"])
+        # Tokens without a tombstone mark sent deletions since their ticket mark, and archives not at all.
+        now = datetime.now(timezone.utc)
+        legacy_deleted_at = ticket_at - SYNC_OVERLAP if ticket_at else now - SYNC_OVERLAP
+        return SyncMark(
+            ticket_at=ticket_at,
+            ticket_id=int(data["ti"]),
+            message_at=_decode_at(data.get("mt")),
+            message_id=int(data["m"]),
+            announcement_at=_decode_at(data.get("at")),
+            announcement_id=int(data["a"]),
+            read_at=_decode_at(data.get("rt")),
+            read_id=int(data["r"]),
+            deleted_at=_decode_at(data["d"]) if "d" in data else legacy_deleted_at,
+            deleted_id=int(data.get("di", 0)),
+            archived_at=_decode_at(data.get("x")) or now - SYNC_OVERLAP,
+            archived_id=int(data.get("xi", 0)),
+        )
+    except (binascii.Error, ValueError, TypeError, KeyError):
+        return None
+
+
+def _after(at_col, id_col, mark_at: datetime | None, mark_id: int):
+    """Rows past a section's mark in (timestamp, id) order."""
+    if mark_at is None:
+        return id_col > mark_id
+    return tuple_(at_col, id_col) > tuple_(literal(mark_at, at_col.type), literal(mark_id))
+
+
+def _advance(rows: list, at_attr: str, more: bool, mark_at: datetime | None, mark_id: int, cutoff: datetime):
+    """Next (timestamp, id) mark for a section after sending rows."""
+    if not rows:
+        return mark_at, mark_id
+    last_at, last_id = getattr(rows[-1], at_attr), rows[-1].id
+    if more or last_at <= cutoff:
+        return last_at, last_id
+    if mark_at is None or cutoff > mark_at:
+        # Recent rows stay inside the overlap window and are re-sent until they age out of it.
+        return cutoff, 0
+    return mark_at, mark_id
+
+
+def _visible_tickets(user: User):
+    conditions = [Ticket.school_id == user.school_id]
+    if user.role == Role.PARENT:
+        conditions.append(Ticket.created_by_id == user.id)
+    return conditions
+
+
+async def get_sync_delta(session: AsyncSession, user: User, since: SyncMark | None, limit: int = SYNC_PAGE_SIZE) -> SyncDelta:
+    """Everything visible to user that changed after since (or a full snapshot when since is None).
+
+    Each section returns at most limit rows; has_more tells the client to call again with the new token.
+    """
+    now = datetime.now(timezone.utc)
+    cutoff = now - SYNC_OVERLAP
+    # A snapshot already leaves out deleted and archived rows, so tombstones start from now.
+    mark = since or SyncMark(deleted_at=cutoff, archived_at=cutoff)
+    visible = _visible_tickets(user)
+
+    ticket_q = select(Ticket).where(
+        *visible, Ticket.deleted_at.is_(None), _after(Ticket.updated_at, Ticket.id, mark.ticket_at, mark.ticket_id)
+    )
+    tickets = list(
+        (await session.execute(ticket_q.order_by(Ticket.updated_at, Ticket.id).limit(limit + 1))).scalars().all()
+    )
+
+    message_q = (
+        select(TicketMessage)
+        .join(Ticket, Ticket.id == TicketMessage.ticket_id)
+        .where(
+            *visible,
+            Ticket.deleted_at.is_(None),
+            _after(TicketMessage.created_at, TicketMessage.id, mark.message_at, mark.message_id),
+        )
+        .order_by(TicketMessage.created_at, TicketMessage.id)
+        .limit(limit + 1)
+    )
+    messages = list((await session.execute(message_q)).scalars().all())
+
+    announcement_q = (
+        select(Announcement)
+        .where(
+            Announcement.school_id == user.school_id,
+            audience_clause(user),
+            _after(Announcement.created_at, Announcement.id, mark.announcement_at, mark.announcement_id),
+        )
+        .order_by(Announcement.created_at, Announcement.id)
+        .limit(limit + 1)
+    )
+    announcements = list((await session.execute(announcement_q)).scalars().all())
+
+    read_q = (
+        select(AnnouncementRead.id, AnnouncementRead.announcement_id, AnnouncementRead.read_at)
+        .where(
+            AnnouncementRead.user_id == user.id,
+            _after(AnnouncementRead.read_at, AnnouncementRead.id, mark.read_at, mark.read_id),
+        )
+        .order_by(AnnouncementRead.read_at, AnnouncementRead.id)
+        .limit(limit + 1)
+    )
+    reads = list((await session.execute(read_q)).all())
+
+    deleted_q = (
+        select(Ticket.id, Ticket.deleted_at)
+        .where(
+            *visible,
+            Ticket.deleted_at.is_not(None),
+            _after(Ticket.deleted_at, Ticket.id, mark.deleted_at, mark.deleted_id),
+        )
+        .order_by(Ticket.deleted_at, Ticket.id)
+        .limit(limit + 1)
+    )
+    deleted = list((await session.execute(deleted_q)).all())
+
+    archived_q = (
+        select(Announcement.id, Announcement.archived_at)
+        .where(
+            Announcement.school_id == user.school_id,
+            Announcement.archived_at.is_not(None),
+            targeting_clause(user),
+            _after(Announcement.archived_at, Announcement.id, mark.archived_at, mark.archived_id),
+        )
+        .order_by(Announcement.archived_at, Announcement.id)
+        .limit(limit + 1)
+    )
+    archived = list((await session.execute(archived_q)).all())
+
+    sections = (tickets, messages, announcements, reads, deleted, archived)
+    more = [len(rows) > limit for rows in sections]
+    tickets, messages, announcements, reads, deleted, archived = (rows[:limit] for rows in sections)
+
+    new_mark = SyncMark()
+    new_mark.ticket_at, new_mark.ticket_id = _advance(
+        tickets, "updated_at", more[0], mark.ticket_at, mark.ticket_id, cutoff
+    )
+    new_mark.message_at, new_mark.message_id = _advance(
+        messages, "created_at", more[1], mark.message_at, mark.message_id, cutoff
+    )
+    new_mark.announcement_at, new_mark.announcement_id = _advance(
+        announcements, "created_at", more[2], mark.announcement_at, mark.announcement_id, cutoff
+    )
+    new_mark.read_at, new_mark.read_id = _advance(reads, "read_at", more[3], mark.read_at, mark.read_id, cutoff)
+    new_mark.deleted_at, new_mark.deleted_id = _advance(
+        deleted, "deleted_at", more[4], mark.deleted_at, mark.deleted_id, cutoff
+    )
+    new_mark.archived_at, new_mark.archived_id = _advance(
+        archived, "archived_at", more[5], mark.archived_at, mark.archived_id, cutoff
+    )
+
+    return SyncDelta(
+        mark=new_mark,
+        tickets=tickets,
+        messages=messages,
+        announcements=announcements,
+        read_announcement_ids=[r.announcement_id for r in reads],
+        deleted_ticket_ids=[r.id for r in deleted],
+        archived_announcement_ids=[r.id for r in archived],
+        has_more=any(more),
+    )
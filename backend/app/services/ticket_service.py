@@ -1,7 +1,13 @@
 # ABOUTME: Ticket creation, reply, internal notes, and listing with visibility rules.
 # ABOUTME: Staff reply auto-sets status to In Progress.
 
-from sqlalchemy import func, insert, select
+import base64
+import binascii
+import json
+from datetime import datetime
+
+from sqlalchemy import Integer, any_, bindparam, func, insert, literal, literal_column, select, true, tuple_, union_all, update
+from sqlalchemy.dialects.postgresql import ARRAY
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models.ticket import (
@@ -14,6 +20,11 @@ from app.models.ticket import (
     ticket_students,
 )
 from app.models.user import Role, User
+from app.schemas.ticket import TicketFilters
+from app.services.assignment import adjust_workloads, pick_assignee, workload_deltas
+from app.services.events import queue_ticket_event
+from app.services.guardrails import invalidate_quota
+from app.services.routing import get_role_for_category
 
 
 async def create_ticket(
@@ -25,6 +36,7 @@ async def create_ticket(
     description: str | None,
     urgency: bool,
 ) -> Ticket:
+    routed_role = get_role_for_category(category)
     ticket = Ticket(
         school_id=created_by.school_id,
         created_by_id=created_by.id,
@@ -33,15 +45,27 @@ async def create_ticket(
         urgency=urgency,
         title=title,
         description=description,
+        routed_role=routed_role,
+        assigned_to_id=await pick_assignee(session, created_by.school_id, routed_role),
     )
     session.add(ticket)
     await session.flush()
     for sid in student_ids:
         await session.execute(insert(ticket_students).values(ticket_id=ticket.id, student_id=sid))
     await session.flush()
+    invalidate_quota(session, ticket.school_id, created_by.id)
     return ticket
 
 
+async def _update_ticket(session: AsyncSession, ticket_id: int, **values) -> Ticket | None:
+    """Single UPDATE ... RETURNING; refreshes the identity-mapped Ticket so counters stay atomic."""
+    result = await session.execute(
+        update(Ticket).where(Ticket.id == ticket_id).values(**values).returning(Ticket),
+        execution_options={"synchronize_session": False, "populate_existing": True},
+    )
+    return result.scalar_one_or_none()
+
+
 async def get_ticket_for_user(session: AsyncSession, ticket_id: int, user: User) -> Ticket | None:
     result = await session.execute(
         select(Ticket).where(Ticket.id == ticket_id, Ticket.deleted_at.is_(None))
@@ -58,18 +82,285 @@ async def get_ticket_for_user(session: AsyncSession, ticket_id: int, user: User)
     return ticket
 
 
-async def list_tickets_for_user(session: AsyncSession, user: User) -> list[Ticket]:
-    q = select(Ticket).where(
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+
+# Sort key -> (column, descending). Every sort is tie-broken on id in the same direction.
+TICKET_SORTS = {
+    "-updated_at": (Ticket.updated_at, True),
+    "updated_at": (Ticket.updated_at, False),
+    "-created_at": (Ticket.created_at, True),
+    "created_at": (Ticket.created_at, False),
+}
+DEFAULT_TICKET_SORT = "-updated_at"
+
+
+def encode_ticket_cursor(ticket, sort: str = DEFAULT_TICKET_SORT) -> str:
+    """Opaque keyset cursor pointing just past the given ticket (or row) in the sort order."""
+    column, _ = TICKET_SORTS[sort]
+    value = getattr(ticket, column.key)
+    raw = json.dumps({"s": sort, "v": value.isoformat(), "i": ticket.id}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_ticket_cursor(cursor: str, sort: str = DEFAULT_TICKET_SORT) -> tuple[datetime, int] | None:
+    """Returns None for malformed cursors and for cursors issued under a different sort."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        data = json.loads(raw)
+        if data["s"] != sort:
+            return None
+        return datetime.fromisoformat(data["v"]), int(data["i"])
+    except (binascii.Error, ValueError, TypeError, KeyError):
+        return None
+
+
+def _apply_ticket_filters(q, filters: TicketFilters):
+    if filters.status == "open":
+        q = q.where(Ticket.status != TicketStatus.RESOLVED)
+    elif filters.status is not None:
+        q = q.where(Ticket.status == TicketStatus(filters.status))
+        if filters.status != TicketStatus.RESOLVED.value:
+            # Redundant, but lets the planner match the open-queue partial indexes.
+            q = q.where(Ticket.status != TicketStatus.RESOLVED)
+    if filters.category is not None:
+        q = q.where(Ticket.category == filters.category)
+    if filters.urgency is not None:
+        q = q.where(Ticket.urgency.is_(filters.urgency))
+    if filters.assigned_to is not None:
+        q = q.where(Ticket.assigned_to_id == filters.assigned_to)
+    if filters.known_issue is not None:
+        q = q.where(Ticket.known_issue.is_(filters.known_issue))
+    if filters.abuse_flagged is not None:
+        q = q.where(Ticket.abuse_flagged.is_(filters.abuse_flagged))
+    if filters.routed_role is not None:
+        q = q.where(Ticket.routed_role == filters.routed_role)
+    return q
+
+
+def _scope_ticket_query(
+    q,
+    user: User,
+    after: tuple[datetime, int] | None,
+    sort: str = DEFAULT_TICKET_SORT,
+    filters: TicketFilters | None = None,
+):
+    """Apply listing visibility, filters, keyset position and ordering."""
+    q = q.where(
         Ticket.school_id == user.school_id,
         Ticket.deleted_at.is_(None),
     )
     if user.role == Role.PARENT:
         q = q.where(Ticket.created_by_id == user.id)
-    q = q.order_by(Ticket.updated_at.desc())
-    result = await session.execute(q)
+    if filters is not None:
+        q = _apply_ticket_filters(q, filters)
+    column, descending = TICKET_SORTS[sort]
+    if after is not None:
+        value, ticket_id = after
+        key = tuple_(column, Ticket.id)
+        bound = tuple_(literal(value, column.type), ticket_id)
+        q = q.where(key < bound if descending else key > bound)
+    if descending:
+        return q.order_by(column.desc(), Ticket.id.desc())
+    return q.order_by(column, Ticket.id)
+
+
+def ticket_list_query(
+    user: User,
+    limit: int | None = None,
+    after: tuple[datetime, int] | None = None,
+    sort: str = DEFAULT_TICKET_SORT,
+    filters: TicketFilters | None = None,
+):
+    q = _scope_ticket_query(select(Ticket), user, after, sort, filters)
+    if limit is not None:
+        q = q.limit(limit)
+    return q
+
+
+async def list_tickets_for_user(
+    session: AsyncSession,
+    user: User,
+    limit: int | None = None,
+    after: tuple[datetime, int] | None = None,
+    sort: str = DEFAULT_TICKET_SORT,
+    filters: TicketFilters | None = None,
+) -> list[Ticket]:
+    result = await session.execute(ticket_list_query(user, limit, after, sort, filters))
     return list(result.scalars().all())
 
 
+SUMMARY_PREVIEW_CHARS = 120
+
+
+async def list_ticket_summaries_for_user(
+    session: AsyncSession,
+    user: User,
+    limit: int,
+    after: tuple[datetime, int] | None = None,
+    sort: str = DEFAULT_TICKET_SORT,
+    filters: TicketFilters | None = None,
+) -> list:
+    """Inbox rows as plain Core rows: ticket columns plus message count and last message preview."""
+    last_msg = (
+        select(TicketMessage.body)
+        .where(TicketMessage.ticket_id == Ticket.id)
+        .order_by(TicketMessage.id.desc())
+        .limit(1)
+        .lateral("last_msg")
+    )
+    q = (
+        select(
+            Ticket.id,
+            Ticket.created_by_id,
+            Ticket.category,
+            Ticket.status,
+            Ticket.urgency,
+            Ticket.assigned_to_id,
+            Ticket.title,
+            Ticket.known_issue,
+            Ticket.created_at,
+            Ticket.updated_at,
+            Ticket.routed_role,
+            Ticket.message_count,
+            func.left(last_msg.c.body, SUMMARY_PREVIEW_CHARS).label("last_message_preview"),
+            func.greatest(Ticket.updated_at, Ticket.last_message_at).label("last_activity_at"),
+        )
+        .select_from(Ticket)
+        .outerjoin(last_msg, true())
+    )
+    q = _scope_ticket_query(q, user, after, sort, filters).limit(limit)
+    result = await session.execute(q)
+    return list(result.all())
+
+
+SEARCH_CONFIG = literal_column("'simple'::regconfig")
+SEARCH_HEADLINE_OPTIONS = "MaxFragments=2, MaxWords=18, MinWords=6, StartSel=<mark>, StopSel=</mark>"
+# Headlines are HTML: user text is escaped before ts_headline, so <mark> is the only markup in a snippet.
+HTML_ESCAPES = (("&", "&amp;"), ("<", "&lt;"), (">", "&gt;"), ('"', "&quot;"), ("'", "&#x27;"))
+
+
+def _html_escape(text):
+    for char, entity in HTML_ESCAPES:
+        text = func.replace(text, char, entity)
+    return text
+
+
+def _headline(text, tsq):
+    return func.ts_headline(SEARCH_CONFIG, _html_escape(text), tsq, SEARCH_HEADLINE_OPTIONS)
+
+
+MAX_SEARCH_RESULTS = 50
+
+
+def ticket_search_query(user: User, text: str, limit: int = 20):
+    """Ranked full-text search over ticket title/description and message bodies.
+
+    Visibility matches get_ticket_for_user. Headlines are computed only for the returned page.
+    """
+    tsq = func.websearch_to_tsquery(SEARCH_CONFIG, text)
+    visible = [Ticket.school_id == user.school_id, Ticket.deleted_at.is_(None)]
+    if user.role == Role.PARENT:
+        visible.append(Ticket.created_by_id == user.id)
+
+    # Ticket and message matches are collected separately so each side can use its GIN index,
+    # then summed per ticket.
+    ticket_hits = select(
+        Ticket.id.label("ticket_id"),
+        func.ts_rank(Ticket.search_vector, tsq).label("rank"),
+    ).where(Ticket.search_vector.op("@@")(tsq), *visible)
+    message_hits = (
+        select(
+            TicketMessage.ticket_id,
+            func.max(func.ts_rank(TicketMessage.search_vector, tsq)).label("rank"),
+        )
+        .join(Ticket, Ticket.id == TicketMessage.ticket_id)
+        .where(TicketMessage.search_vector.op("@@")(tsq), *visible)
+        .group_by(TicketMessage.ticket_id)
+    )
+    hits = union_all(ticket_hits, message_hits).subquery("hits")
+    rank = func.sum(hits.c.rank)
+    top = (
+        select(
+            Ticket.id,
+            Ticket.title,
+            Ticket.description,
+            Ticket.status,
+            Ticket.category,
+            Ticket.updated_at,
+            rank.label("rank"),
+        )
+        .join(hits, hits.c.ticket_id == Ticket.id)
+        .group_by(Ticket.id)
+        .order_by(rank.desc(), Ticket.id.desc())
+        .limit(limit)
+        .subquery("top")
+    )
+    best_message = (
+        select(TicketMessage.body)
+        .where(TicketMessage.ticket_id == top.c.id, TicketMessage.search_vector.op("@@")(tsq))
+        .order_by(func.ts_rank(TicketMessage.search_vector, tsq).desc(), TicketMessage.id.desc())
+        .limit(1)
+        .lateral("best_message")
+    )
+    ticket_text = func.coalesce(top.c.title, "") + " " + func.coalesce(top.c.description, "")
+    q = (
+        select(
+            top.c.id,
+            top.c.title,
+            top.c.status,
+            top.c.category,
+            top.c.updated_at,
+            top.c.rank,
+            _headline(ticket_text, tsq).label("snippet"),
+            _headline(best_message.c.body, tsq).label("message_snippet"),
+        )
+        .select_from(top)
+        .outerjoin(best_message, true())
+        .order_by(top.c.rank.desc(), top.c.id.desc())
+    )
+    return q
+
+
+async def search_tickets_for_user(session: AsyncSession, user: User, text: str, limit: int = 20) -> list:
+    result = await session.execute(ticket_search_query(user, text, limit))
+    return list(result.all())
+
+
+async def get_ticket_list_version(session: AsyncSession, user: User) -> tuple:
+    """Cheap validator for a user's ticket listing.
+
+    Replies bump tickets.updated_at through the activity counters, so count + newest update
+    (+ note total for staff, since notes deliberately leave updated_at alone) covers every change.
+    """
+    columns = [func.count(Ticket.id), func.max(Ticket.updated_at)]
+    if user.role != Role.PARENT:
+        columns.append(func.coalesce(func.sum(Ticket.internal_notes_count), 0))
+    q = select(*columns).where(Ticket.school_id == user.school_id, Ticket.deleted_at.is_(None))
+    if user.role == Role.PARENT:
+        q = q.where(Ticket.created_by_id == user.id)
+    result = await session.execute(q)
+    return tuple(result.one())
+
+
+async def get_ticket_version(session: AsyncSession, ticket_id: int, user: User) -> tuple | None:
+    """Cheap validator for one ticket as the user sees it, or None when it is not visible."""
+    columns = [Ticket.updated_at, Ticket.message_count]
+    if user.role != Role.PARENT:
+        columns.append(Ticket.internal_notes_count)
+    q = select(*columns).where(
+        Ticket.id == ticket_id,
+        Ticket.school_id == user.school_id,
+        Ticket.deleted_at.is_(None),
+    )
+    if user.role == Role.PARENT:
+        q = q.where(Ticket.created_by_id == user.id)
+    result = await session.execute(q)
+    row = result.one_or_none()
+    return tuple(row) if row is not None else None
+
+
 async def add_reply(
     session: AsyncSession,
     ticket_id: int,
@@ -82,10 +373,16 @@ async def add_reply(
     msg = TicketMessage(ticket_id=ticket_id, sender_id=sender.id, body=body)
     session.add(msg)
     await session.flush()
+    values = {"message_count": Ticket.message_count + 1, "last_message_at": msg.created_at}
     is_staff = sender.role != Role.PARENT
-    if is_staff and ticket.status == TicketStatus.PENDING:
-        ticket.status = TicketStatus.IN_PROGRESS
-        await session.flush()
+    if is_staff:
+        values["first_staff_response_at"] = func.coalesce(Ticket.first_staff_response_at, msg.created_at)
+        if ticket.status == TicketStatus.PENDING:
+            values["status"] = TicketStatus.IN_PROGRESS
+    ticket = await _update_ticket(session, ticket_id, **values)
+    queue_ticket_event(
+        session, "message.created", ticket, {"message_id": msg.id, "sender_id": sender.id, "status": ticket.status.value}
+    )
     return msg
 
 
@@ -103,29 +400,79 @@ async def add_internal_note(
     note = InternalNote(ticket_id=ticket_id, author_id=author.id, body=body)
     session.add(note)
     await session.flush()
+    # Notes are staff-internal: keep updated_at so parents' inbox order and validators don't move.
+    await _update_ticket(
+        session,
+        ticket_id,
+        internal_notes_count=Ticket.internal_notes_count + 1,
+        updated_at=Ticket.updated_at,
+    )
+    queue_ticket_event(session, "internal_note.created", ticket, {"note_id": note.id}, staff_only=True)
     return note
 
 
-async def get_ticket_messages(session: AsyncSession, ticket_id: int) -> list[TicketMessage]:
-    result = await session.execute(
-        select(TicketMessage).where(TicketMessage.ticket_id == ticket_id).order_by(TicketMessage.created_at)
-    )
-    return list(result.scalars().all())
+MESSAGE_PAGE_SIZE = 50
+MAX_MESSAGE_PAGE_SIZE = 200
+
+
+async def get_ticket_messages_page(
+    session: AsyncSession,
+    ticket_id: int,
+    after_id: int | None = None,
+    before_id: int | None = None,
+    limit: int = MESSAGE_PAGE_SIZE,
+) -> list[TicketMessage]:
+    """One page of a thread in id order.
+
+    after_id returns the oldest messages newer than it (polling for new replies); otherwise the
+    newest messages older than before_id, or the latest page when neither is given.
+    """
+    q = select(TicketMessage).where(TicketMessage.ticket_id == ticket_id)
+    if after_id is not None:
+        q = q.where(TicketMessage.id > after_id)
+    if before_id is not None:
+        q = q.where(TicketMessage.id < before_id)
+    if after_id is not None:
+        result = await session.execute(q.order_by(TicketMessage.id).limit(limit))
+        return list(result.scalars().all())
+    result = await session.execute(q.order_by(TicketMessage.id.desc()).limit(limit))
+    return list(reversed(result.scalars().all()))
 
 
-async def get_internal_notes_count(session: AsyncSession, ticket_id: int) -> int:
-    from sqlalchemy import func
+async def get_ticket_student_ids_map(session: AsyncSession, ticket_ids: list[int]) -> dict[int, list[int]]:
+    out: dict[int, list[int]] = {tid: [] for tid in ticket_ids}
+    if not ticket_ids:
+        return out
     result = await session.execute(
-        select(func.count(InternalNote.id)).where(InternalNote.ticket_id == ticket_id)
+        select(ticket_students.c.ticket_id, ticket_students.c.student_id).where(
+            ticket_students.c.ticket_id.in_(ticket_ids)
+        )
     )
-    return result.scalar() or 0
+    for ticket_id, student_id in result.all():
+        out[ticket_id].append(student_id)
+    return out
 
 
-async def get_ticket_student_ids(session: AsyncSession, ticket_id: int) -> list[int]:
+async def get_ticket_messages_map(session: AsyncSession, ticket_ids: list[int]) -> dict[int, list[TicketMessage]]:
+    out: dict[int, list[TicketMessage]] = {tid: [] for tid in ticket_ids}
+    if not ticket_ids:
+        return out
     result = await session.execute(
-        select(ticket_students.c.student_id).where(ticket_students.c.ticket_id == ticket_id)
+        select(TicketMessage)
+        .where(TicketMessage.ticket_id.in_(ticket_ids))
+        .order_by(TicketMessage.ticket_id, TicketMessage.created_at, TicketMessage.id)
     )
-    return [r[0] for r in result.all()]
+    for msg in result.scalars().all():
+        out[msg.ticket_id].append(msg)
+    return out
+
+
+async def get_staff_flags(session: AsyncSession, user_ids: list[int]) -> dict[int, bool]:
+    """Map user id -> True when the user is staff (any role other than parent)."""
+    if not user_ids:
+        return {}
+    result = await session.execute(select(User.id, User.role).where(User.id.in_(user_ids)))
+    return {uid: role != Role.PARENT for uid, role in result.all()}
 
 
 async def get_parent_student_ids(session: AsyncSession, parent_id: int) -> list[int]:
@@ -150,17 +497,29 @@ async def request_reopen(
         return None
     if user.role != Role.PARENT:
         return None
+    if ticket.reopen_count >= MAX_REOPEN_PER_TICKET:
+        return None
+    # Guarded UPDATE so two concurrent requests cannot both pass the limit.
     result = await session.execute(
-        select(func.count(TicketReopen.id)).where(TicketReopen.ticket_id == ticket_id)
+        update(Ticket)
+        .where(
+            Ticket.id == ticket_id,
+            Ticket.status == TicketStatus.RESOLVED,
+            Ticket.reopen_count < MAX_REOPEN_PER_TICKET,
+        )
+        .values(reopen_count=Ticket.reopen_count + 1, status=TicketStatus.PENDING, satisfied_at=None)
+        .returning(Ticket),
+        execution_options={"synchronize_session": False, "populate_existing": True},
     )
-    if (result.scalar() or 0) >= MAX_REOPEN_PER_TICKET:
+    ticket = result.scalar_one_or_none()
+    if ticket is None:
         return None
+    await adjust_workloads(session, workload_deltas([], [(ticket.assigned_to_id, True)]))
+    queue_ticket_event(session, "ticket.reopened", ticket, {"status": ticket.status.value})
+    invalidate_quota(session, ticket.school_id, ticket.created_by_id)
     reopen = TicketReopen(ticket_id=ticket_id, requested_by_id=user.id, reason=reason)
     session.add(reopen)
     await session.flush()
-    ticket.status = TicketStatus.PENDING
-    ticket.satisfied_at = None
-    await session.flush()
     return reopen
 
 
@@ -180,6 +539,19 @@ async def set_ticket_known_issue(
     return True
 
 
+ROUTING_ROLES = (Role.DIRECTOR, Role.PRINCIPAL)
+
+
+async def route_ticket(session: AsyncSession, ticket_id: int, user: User, role: Role) -> Ticket | None:
+    """Move a ticket to another role's queue. Returns None if not visible or the caller may not route."""
+    if user.role not in ROUTING_ROLES or role == Role.PARENT:
+        return None
+    ticket = await get_ticket_for_user(session, ticket_id, user)
+    if not ticket:
+        return None
+    return await _update_ticket(session, ticket_id, routed_role=role)
+
+
 async def set_ticket_status(
     session: AsyncSession,
     ticket_id: int,
@@ -191,11 +563,79 @@ async def set_ticket_status(
     ticket = await get_ticket_for_user(session, ticket_id, user)
     if not ticket:
         return False
+    before = [(ticket.assigned_to_id, ticket.status != TicketStatus.RESOLVED)]
     ticket.status = new_status
     await session.flush()
+    await adjust_workloads(session, workload_deltas(before, [(ticket.assigned_to_id, new_status != TicketStatus.RESOLVED)]))
+    queue_ticket_event(session, "ticket.status", ticket, {"status": new_status.value})
+    invalidate_quota(session, ticket.school_id, ticket.created_by_id)
     return True
 
 
+def _id_array(ids: list[int]):
+    # One array parameter (id = ANY(:ids)) instead of an IN list, so the statement text is the same for any count.
+    return any_(bindparam("ids", ids, type_=ARRAY(Integer)))
+
+
+async def bulk_update_tickets(
+    session: AsyncSession,
+    user: User,
+    ticket_ids: list[int],
+    values: dict,
+    category: TicketCategory | None = None,
+) -> tuple[list[int], dict[int, str]]:
+    """Apply one set of column values to many tickets with a visibility check and a single UPDATE.
+
+    Returns (updated ids, {id: error}) where error is "not_found" (missing or not visible) or
+    "not_allowed" (visible but outside the required category).
+    """
+    ids = list(dict.fromkeys(ticket_ids))
+    if user.role == Role.PARENT:
+        return [], {tid: "not_found" for tid in ids}
+    result = await session.execute(
+        select(
+            Ticket.id, Ticket.school_id, Ticket.created_by_id, Ticket.category, Ticket.assigned_to_id, Ticket.status
+        ).where(
+            Ticket.id == _id_array(ids),
+            Ticket.school_id == user.school_id,
+            Ticket.deleted_at.is_(None),
+        )
+    )
+    visible = {row.id: row for row in result.all()}
+    errors: dict[int, str] = {}
+    eligible: list[int] = []
+    for tid in ids:
+        if tid not in visible:
+            errors[tid] = "not_found"
+        elif category is not None and visible[tid].category != category:
+            errors[tid] = "not_allowed"
+        else:
+            eligible.append(tid)
+    if eligible:
+        await session.execute(
+            update(Ticket).where(Ticket.id == _id_array(eligible)).values(**values),
+            execution_options={"synchronize_session": False},
+        )
+        rows = [visible[tid] for tid in eligible]
+        before = [(r.assigned_to_id, r.status != TicketStatus.RESOLVED) for r in rows]
+        after = [
+            (
+                values.get("assigned_to_id", r.assigned_to_id),
+                values.get("status", r.status) != TicketStatus.RESOLVED,
+            )
+            for r in rows
+        ]
+        await adjust_workloads(session, workload_deltas(before, after))
+        event_type = "ticket.status" if "status" in values else "ticket.updated"
+        data = {k: v.value if isinstance(v, TicketStatus) else v for k, v in values.items()}
+        for r in rows:
+            queue_ticket_event(session, event_type, r, data)
+        if "status" in values:
+            for parent_id in {r.created_by_id for r in rows}:
+                invalidate_quota(session, user.school_id, parent_id)
+    return eligible, errors
+
+
 async def mark_satisfied(
     session: AsyncSession,
     ticket_id: int,
@@ -8,6 +8,7 @@ from jose import jwt
 from app.core.config import get_settings
 from app.models.announcement import Announcement
 from app.models.user import Role, User
+from app.services.feed_cache import feed_cache
 
 
 def _make_token(role: Role, user_id: int, school_id: int = 1) -> str:
@@ -44,7 +45,206 @@ async def test_parent_lists_announcements(client, db_session):
     a = Announcement(school_id=1, author_id=parent.id, title="Test", content="Body", target_audience="parents")
     db_session.add(a)
     await db_session.commit()
+    feed_cache.invalidate_school(1)
     r = await client.get("/announcements", headers={"Authorization": f"Bearer {_make_token(Role.PARENT, parent.id)}"})
     assert r.status_code == 200
     assert len(r.json()) >= 1
-    assert r.json()[0]["title"] == "Test"
\ No newline at end of file
+    assert r.json()[0]["title"] == "Test"
+
+@pytest.mark.asyncio
+async def test_announcements_conditional_get(client, db_session):
+    parent = User(phone=f"+91999{uuid.uuid4().hex[:7]}", role=Role.PARENT, school_id=1)
+    db_session.add(parent)
+    await db_session.commit()
+    headers = {"Authorization": f"Bearer {_make_token(Role.PARENT, parent.id)}"}
+    r1 = await client.get("/announcements", headers=headers)
+    assert r1.status_code == 200
+    r2 = await client.get("/announcements", headers={**headers, "If-None-Match": r1.headers["ETag"]})
+    assert r2.status_code == 304
+
+
+async def _school_with_parent(db_session, class_name="5", section="A"):
+    from sqlalchemy import insert
+    from app.models.student import Student, parent_students
+
+    school_id = 100_000 + uuid.uuid4().int % 1_000_000
+    parent = User(phone=f"+91999{uuid.uuid4().hex[:7]}", role=Role.PARENT, school_id=school_id)
+    author = User(phone=f"+91999{uuid.uuid4().hex[:7]}", role=Role.PRINCIPAL, school_id=school_id)
+    student = Student(school_id=school_id, class_name=class_name, section=section)
+    db_session.add_all([parent, author, student])
+    await db_session.flush()
+    await db_session.execute(insert(parent_students).values(parent_id=parent.id, student_id=student.id))
+    return school_id, parent, author
+
+
+@pytest.mark.asyncio
+async def test_feed_applies_audience_and_grade_class_targeting(client, db_session):
+    school_id, parent, author = await _school_with_parent(db_session)
+    for title, audience, grade, cls in [
+        ("everyone", "both", None, None),
+        ("grade 5", "parents", "5", None),
+        ("grade 5 section A", "parents", "5", "A"),
+        ("grade 5 section B", "parents", "5", "B"),
+        ("grade 6", "both", "6", None),
+        ("staff only", "staff", None, None),
+    ]:
+        db_session.add(Announcement(
+            school_id=school_id, author_id=author.id, title=title, content="Body",
+            target_audience=audience, target_grade=grade, target_class=cls,
+        ))
+    await db_session.commit()
+
+    r = await client.get("/announcements", headers={"Authorization": f"Bearer {_make_token(Role.PARENT, parent.id, school_id)}"})
+    assert sorted(a["title"] for a in r.json()) == ["everyone", "grade 5", "grade 5 section A"]
+    r = await client.get("/announcements", headers={"Authorization": f"Bearer {_make_token(Role.PRINCIPAL, author.id, school_id)}"})
+    assert "grade 6" in {a["title"] for a in r.json()}
+    assert "staff only" in {a["title"] for a in r.json()}
+
+
+@pytest.mark.asyncio
+async def test_feed_query_count_independent_of_history(client, db_session):
+    from sqlalchemy import event
+    from app.main import app
+    from app.models.announcement import AnnouncementRead
+
+    school_id, parent, author = await _school_with_parent(db_session)
+    await db_session.commit()
+    headers = {"Authorization": f"Bearer {_make_token(Role.PARENT, parent.id, school_id)}"}
+    statements: list[str] = []
+
+    def _count(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    async def add_announcements(n: int):
+        for i in range(n):
+            a = Announcement(school_id=school_id, author_id=author.id, title=f"A{i}", content="Body", target_audience="both")
+            db_session.add(a)
+            await db_session.flush()
+            if i % 2 == 0:
+                db_session.add(AnnouncementRead(announcement_id=a.id, user_id=parent.id))
+        await db_session.commit()
+        # Inserted behind create_announcement's back, so drop the cached pages by hand.
+        feed_cache.invalidate_school(school_id)
+
+    sync_engine = app.state.engine.sync_engine
+    await add_announcements(1)
+    assert (await client.get("/announcements", headers=headers)).status_code == 200
+    event.listen(sync_engine, "before_cursor_execute", _count)
+    try:
+        statements.clear()
+        r = await client.get("/announcements", headers=headers)
+        small = len(statements)
+        await add_announcements(9)
+        statements.clear()
+        r = await client.get("/announcements", headers=headers)
+        assert len(statements) == small
+    finally:
+        event.remove(sync_engine, "before_cursor_execute", _count)
+    data = r.json()
+    assert len(data) == 10
+    assert sum(a["read"] for a in data) == 6
+
+
+@pytest.mark.asyncio
+async def test_feed_keyset_pagination(client, db_session):
+    from datetime import datetime, timezone, timedelta
+
+    school_id, parent, author = await _school_with_parent(db_session)
+    base = datetime.now(timezone.utc)
+    for i in range(5):
+        db_session.add(Announcement(
+            school_id=school_id, author_id=author.id, title=f"A{i}", content="Body",
+            target_audience="both", created_at=base + timedelta(minutes=i),
+        ))
+    await db_session.commit()
+    headers = {"Authorization": f"Bearer {_make_token(Role.PARENT, parent.id, school_id)}"}
+
+    titles = []
+    cursor = None
+    while True:
+        params = {"limit": 2} if cursor is None else {"limit": 2, "cursor": cursor}
+        r = await client.get("/announcements", headers=headers, params=params)
+        assert r.status_code == 200
+        titles += [a["title"] for a in r.json()]
+        cursor = r.headers.get("X-Next-Cursor")
+        if cursor is None:
+            break
+    assert titles == ["A4", "A3", "A2", "A1", "A0"]
+    r = await client.get("/announcements", headers=headers, params={"cursor": "not-a-cursor"})
+    assert r.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_batch_read_is_single_idempotent_statement(client, db_session):
+    from sqlalchemy import event, func, select
+    from app.main import app
+    from app.models.announcement import AnnouncementRead
+
+    school_id, parent, author = await _school_with_parent(db_session)
+    visible = [
+        Announcement(school_id=school_id, author_id=author.id, title=f"A{i}", content="Body", target_audience="both")
+        for i in range(3)
+    ]
+    hidden = Announcement(school_id=school_id, author_id=author.id, title="Staff", content="Body", target_audience="staff")
+    db_session.add_all([*visible, hidden])
+    await db_session.commit()
+    headers = {"Authorization": f"Bearer {_make_token(Role.PARENT, parent.id, school_id)}"}
+    assert (await client.post(f"/announcements/{visible[0].id}/read", headers=headers)).status_code == 200
+
+    ids = [a.id for a in visible] + [hidden.id, 987654321]
+    statements: list[str] = []
+
+    def _count(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    sync_engine = app.state.engine.sync_engine
+    event.listen(sync_engine, "before_cursor_execute", _count)
+    try:
+        r = await client.post("/announcements/read", headers=headers, json={"announcement_ids": ids})
+    finally:
+        event.remove(sync_engine, "before_cursor_execute", _count)
+    assert r.status_code == 200
+    assert r.json() == {"marked": [a.id for a in visible], "not_found": [hidden.id, 987654321]}
+    assert len(statements) == 1
+
+    r = await client.post("/announcements/read", headers=headers, json={"announcement_ids": ids})
+    assert r.json()["marked"] == [a.id for a in visible]
+    count = await db_session.scalar(select(func.count(AnnouncementRead.id)).where(AnnouncementRead.user_id == parent.id))
+    assert count == 3
+    assert (await client.post(f"/announcements/{hidden.id}/read", headers=headers)).status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_read_rate_uses_audience_snapshot_and_counters(client, db_session):
+    from sqlalchemy import insert
+    from app.models.student import Student, parent_students
+
+    school_id, parent, author = await _school_with_parent(db_session)
+    other_parent = User(phone=f"+91999{uuid.uuid4().hex[:7]}", role=Role.PARENT, school_id=school_id)
+    teacher = User(phone=f"+91999{uuid.uuid4().hex[:7]}", role=Role.TEACHER, school_id=school_id)
+    other_student = Student(school_id=school_id, class_name="6", section="A")
+    db_session.add_all([other_parent, teacher, other_student])
+    await db_session.flush()
+    await db_session.execute(insert(parent_students).values(parent_id=other_parent.id, student_id=other_student.id))
+    await db_session.commit()
+    author_headers = {"Authorization": f"Bearer {_make_token(Role.PRINCIPAL, author.id, school_id)}"}
+
+    r = await client.post(
+        "/announcements",
+        headers=author_headers,
+        json={"title": "Grade 5 trip", "content": "Body", "target_audience": "both", "target_grade": "5"},
+    )
+    announcement_id = r.json()["id"]
+    for user in (parent, teacher):
+        headers = {"Authorization": f"Bearer {_make_token(user.role, user.id, school_id)}"}
+        for _ in range(2):
+            r = await client.post("/announcements/read", headers=headers, json={"announcement_ids": [announcement_id]})
+            assert r.json()["marked"] == [announcement_id]
+
+    r = await client.get("/admin/announcements/read-rates", headers=author_headers)
+    assert r.status_code == 200
+    rate = next(a for a in r.json() if a["id"] == announcement_id)
+    # Staff (author, teacher) plus the grade 5 parent; the grade 6 parent is not in the audience.
+    assert rate["recipient_count"] == 3
+    assert rate["read_count"] == 2
+    assert rate["read_rate"] == round(2 / 3, 4)
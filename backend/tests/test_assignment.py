@@ -0,0 +1,39 @@
+# ABOUTME: Tests for load-aware automatic assignment on ticket creation.
+# ABOUTME: New tickets go to the least-loaded staff in the routed role; resolve/reopen move the counts.
+
+import uuid
+
+import pytest
+
+from app.models.ticket import TicketCategory, TicketStatus
+from app.models.user import Role, User
+from app.models.workload import StaffWorkload
+from app.services.ticket_service import create_ticket, request_reopen, set_ticket_status
+
+
+@pytest.mark.asyncio
+async def test_create_assigns_least_loaded_staff_in_routed_role(db_session):
+    school_id = 9000 + uuid.uuid4().int % 1000
+    parent = User(phone=f"+91999{uuid.uuid4().hex[:7]}", role=Role.PARENT, school_id=school_id)
+    t1 = User(phone=f"+91998{uuid.uuid4().hex[:7]}", role=Role.TEACHER, school_id=school_id)
+    t2 = User(phone=f"+91998{uuid.uuid4().hex[:7]}", role=Role.TEACHER, school_id=school_id)
+    office = User(phone=f"+91997{uuid.uuid4().hex[:7]}", role=Role.OFFICE, school_id=school_id)
+    db_session.add_all([parent, t1, t2, office])
+    await db_session.flush()
+
+    tickets = [
+        await create_ticket(db_session, parent, [], TicketCategory.ACADEMIC_TEACHING, f"Homework {i}", None, False)
+        for i in range(3)
+    ]
+    assignees = [t.assigned_to_id for t in tickets]
+    assert set(assignees) == {t1.id, t2.id}
+    assert office.id not in assignees
+    counts = {uid: (await db_session.get(StaffWorkload, uid, populate_existing=True)).open_count for uid in (t1.id, t2.id)}
+    assert sorted(counts.values()) == [1, 2]
+
+    busiest = max(counts, key=counts.get)
+    resolved = next(t for t in tickets if t.assigned_to_id == busiest)
+    await set_ticket_status(db_session, resolved.id, t1, TicketStatus.RESOLVED)
+    assert (await db_session.get(StaffWorkload, busiest, populate_existing=True)).open_count == counts[busiest] - 1
+    assert await request_reopen(db_session, resolved.id, parent, "Still pending") is not None
+    assert (await db_session.get(StaffWorkload, busiest, populate_existing=True)).open_count == counts[busiest]
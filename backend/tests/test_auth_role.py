@@ -40,3 +40,106 @@ async def test_me_returns_200_with_valid_token(client, db_session):
     assert r.status_code == 200
     assert r.json()["role"] == "parent"
     assert r.json()["phone"] == phone
+
+
+@pytest.mark.asyncio
+async def test_cached_user_needs_no_queries(client, db_session):
+    import uuid
+    from sqlalchemy import event
+    from app.main import app
+    from app.models.user import User
+
+    user = User(phone=f"+91999{uuid.uuid4().hex[:7]}", role=Role.TEACHER, school_id=1)
+    db_session.add(user)
+    await db_session.commit()
+    headers = {"Authorization": f"Bearer {_make_token(role=Role.TEACHER, user_id=user.id)}"}
+    assert (await client.get("/me", headers=headers)).status_code == 200
+    assert (await client.get("/config/office-hours", headers=headers)).status_code == 200
+
+    statements = []
+
+    def _count(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    sync_engine = app.state.engine.sync_engine
+    event.listen(sync_engine, "before_cursor_execute", _count)
+    try:
+        assert (await client.get("/me", headers=headers)).status_code == 200
+        assert (await client.get("/config/office-hours", headers=headers)).status_code == 200
+    finally:
+        event.remove(sync_engine, "before_cursor_execute", _count)
+    assert statements == []
+
+
+@pytest.mark.asyncio
+async def test_role_change_invalidates_cached_user(client, db_session):
+    import uuid
+    from app.core.user_cache import invalidate_user
+    from app.models.user import User
+
+    user = User(phone=f"+91999{uuid.uuid4().hex[:7]}", role=Role.PARENT, school_id=1)
+    db_session.add(user)
+    await db_session.commit()
+    parent_token = _make_token(role=Role.PARENT, user_id=user.id)
+    r = await client.get("/me", headers={"Authorization": f"Bearer {parent_token}"})
+    assert r.status_code == 200
+
+    user.role = Role.TEACHER
+    invalidate_user(db_session, user.school_id, user.id)
+    await db_session.commit()
+    r = await client.get("/me", headers={"Authorization": f"Bearer {parent_token}"})
+    assert r.status_code == 401
+    teacher_token = _make_token(role=Role.TEACHER, user_id=user.id)
+    r = await client.get("/me", headers={"Authorization": f"Bearer {teacher_token}"})
+    assert r.status_code == 200
+    assert r.json()["role"] == "teacher"
+
+
+@pytest.mark.asyncio
+async def test_new_token_accepted_before_invalidation_arrives(client, db_session):
+    import uuid
+    from app.models.user import User
+
+    user = User(phone=f"+91999{uuid.uuid4().hex[:7]}", role=Role.PARENT, school_id=1)
+    db_session.add(user)
+    await db_session.commit()
+    r = await client.get("/me", headers={"Authorization": f"Bearer {_make_token(role=Role.PARENT, user_id=user.id)}"})
+    assert r.status_code == 200
+
+    # Role changed by another instance; its invalidation has not reached this one yet.
+    user.role = Role.TEACHER
+    await db_session.commit()
+    r = await client.get("/me", headers={"Authorization": f"Bearer {_make_token(role=Role.TEACHER, user_id=user.id)}"})
+    assert r.status_code == 200
+    assert r.json()["role"] == "teacher"
+    r = await client.get("/me", headers={"Authorization": f"Bearer {_make_token(role=Role.PARENT, user_id=user.id)}"})
+    assert r.status_code == 401
+
+
+@pytest.mark.asyncio
+async def test_block_is_seen_by_cached_parent(client, db_session):
+    import uuid
+    from app.models.student import Student, parent_students
+    from app.models.user import User
+    from sqlalchemy import insert
+
+    director = User(phone=f"+91999{uuid.uuid4().hex[:7]}", role=Role.DIRECTOR, school_id=1)
+    parent = User(phone=f"+91999{uuid.uuid4().hex[:7]}", role=Role.PARENT, school_id=1)
+    student = Student(school_id=1, class_name="5", section="A")
+    db_session.add_all([director, parent, student])
+    await db_session.flush()
+    await db_session.execute(insert(parent_students).values(parent_id=parent.id, student_id=student.id))
+    await db_session.commit()
+    parent_headers = {"Authorization": f"Bearer {_make_token(role=Role.PARENT, user_id=parent.id)}"}
+    assert (await client.get("/me", headers=parent_headers)).status_code == 200
+
+    director_headers = {"Authorization": f"Bearer {_make_token(role=Role.DIRECTOR, user_id=director.id)}"}
+    r = await client.post(f"/admin/users/{parent.id}/block-tickets", headers=director_headers)
+    assert r.status_code == 200
+    r = await client.post(
+        "/tickets",
+        headers=parent_headers,
+        json={"student_ids": [student.id], "category": "transport", "title": "Bus delay"},
+    )
+    assert r.status_code == 400
+    assert "temporarily unavailable" in r.json()["detail"]
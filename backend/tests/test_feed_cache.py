@@ -0,0 +1,117 @@
+# ABOUTME: Tests for the shared announcement feed cache: per-segment hits, per-user read overlay,
+# ABOUTME: invalidation on create and archive, and the LRU size bound.
+
+import uuid
+from datetime import datetime, timezone, timedelta
+
+import pytest
+from jose import jwt
+from sqlalchemy import insert
+
+from app.core.config import get_settings
+from app.models.announcement import AnnouncementRead
+from app.models.student import Student, parent_students
+from app.models.user import Role, User
+from app.services.feed_cache import FeedCache, FeedSegment, feed_cache
+
+
+def _make_token(role: Role, user_id: int, school_id: int = 1) -> str:
+    settings = get_settings()
+    exp = datetime.now(timezone.utc) + timedelta(minutes=15)
+    return jwt.encode(
+        {"sub": str(user_id), "role": role.value, "school_id": school_id, "exp": exp},
+        settings.jwt_access_secret,
+        algorithm="HS256",
+    )
+
+
+async def _school(db_session):
+    """A fresh school with a principal and two parents whose children are both in 5-A."""
+    school_id = 100_000 + uuid.uuid4().int % 1_000_000
+    principal = User(phone=f"+91999{uuid.uuid4().hex[:7]}", role=Role.PRINCIPAL, school_id=school_id)
+    parents = [User(phone=f"+91999{uuid.uuid4().hex[:7]}", role=Role.PARENT, school_id=school_id) for _ in range(2)]
+    students = [Student(school_id=school_id, class_name="5", section="A") for _ in range(2)]
+    db_session.add_all([principal, *parents, *students])
+    await db_session.flush()
+    for parent, student in zip(parents, students):
+        await db_session.execute(insert(parent_students).values(parent_id=parent.id, student_id=student.id))
+    await db_session.commit()
+    return school_id, principal, parents
+
+
+def _headers(user: User, school_id: int) -> dict:
+    return {"Authorization": f"Bearer {_make_token(user.role, user.id, school_id)}"}
+
+
+@pytest.mark.asyncio
+async def test_parents_in_one_segment_share_a_page_with_their_own_reads(client, db_session):
+    school_id, principal, (first, second) = await _school(db_session)
+    r = await client.post(
+        "/announcements",
+        headers=_headers(principal, school_id),
+        json={"title": "Grade 5 trip", "content": "Bring lunch.", "target_audience": "parents", "target_grade": "5"},
+    )
+    announcement_id = r.json()["id"]
+    db_session.add(AnnouncementRead(announcement_id=announcement_id, user_id=first.id))
+    await db_session.commit()
+
+    hits, misses = feed_cache.hits, feed_cache.misses
+    r = await client.get("/announcements", headers=_headers(first, school_id))
+    assert [(a["id"], a["read"]) for a in r.json()] == [(announcement_id, True)]
+    r = await client.get("/announcements", headers=_headers(second, school_id))
+    assert [(a["id"], a["read"]) for a in r.json()] == [(announcement_id, False)]
+    assert (feed_cache.misses - misses, feed_cache.hits - hits) == (1, 1)
+
+    # A matching If-None-Match is answered from the validator without building the page.
+    r = await client.get("/announcements", headers={**_headers(second, school_id), "If-None-Match": r.headers["ETag"]})
+    assert r.status_code == 304
+    assert (feed_cache.misses - misses, feed_cache.hits - hits) == (1, 1)
+
+    metrics = (await client.get("/health/metrics")).json()["feed_cache"]
+    assert metrics["pages"] >= 1
+    assert metrics["bytes"] <= metrics["max_bytes"]
+
+
+@pytest.mark.asyncio
+async def test_create_and_archive_invalidate_cached_pages(client, db_session):
+    school_id, principal, (parent, _) = await _school(db_session)
+    staff = _headers(principal, school_id)
+    body = {"title": "Sports day", "content": "Friday.", "target_audience": "both"}
+    first_id = (await client.post("/announcements", headers=staff, json=body)).json()["id"]
+    r = await client.get("/announcements", headers=_headers(parent, school_id))
+    assert [a["id"] for a in r.json()] == [first_id]
+    etag = r.headers["ETag"]
+
+    second_id = (await client.post("/announcements", headers=staff, json=body)).json()["id"]
+    r = await client.get("/announcements", headers={**_headers(parent, school_id), "If-None-Match": etag})
+    assert r.status_code == 200
+    assert [a["id"] for a in r.json()] == [second_id, first_id]
+
+    assert (await client.post(f"/announcements/{first_id}/archive", headers=staff)).status_code == 200
+    r = await client.get("/announcements", headers=_headers(parent, school_id))
+    assert [a["id"] for a in r.json()] == [second_id]
+    r = await client.get("/announcements", headers=staff)
+    assert [a["id"] for a in r.json()] == [second_id]
+    assert (await client.post(f"/announcements/{first_id}/read", headers=_headers(parent, school_id))).status_code == 404
+    assert (await client.post(f"/announcements/{first_id}/archive", headers=staff)).status_code == 404
+    assert (await client.post(f"/announcements/{second_id}/archive", headers=_headers(parent, school_id))).status_code == 403
+
+
+def test_cache_evicts_least_recently_used_pages_past_its_size_bound():
+    item = {"id": 1, "title": "x" * 400}
+    cache = FeedCache(max_bytes=1500)
+    keys = [(FeedSegment(7, "parents", (("5", str(i)),)), 50, None) for i in range(4)]
+    for key in keys[:3]:
+        cache.put(key, [item], cache.generation(7))
+    assert cache.get(keys[0]) is not None
+    cache.put(keys[3], [item], cache.generation(7))
+    assert cache.get(keys[1]) is None
+    assert cache.get(keys[0]) is not None
+    assert cache.metrics()["evictions"] == 1
+    assert cache.metrics()["bytes"] <= 1500
+
+    # A page loaded before an invalidation is not stored after it.
+    generation = cache.generation(7)
+    cache.invalidate_school(7)
+    cache.put(keys[1], [item], generation)
+    assert cache.metrics()["pages"] == 0
@@ -9,7 +9,8 @@ import pytest
 from app.models.ticket import Ticket, TicketCategory, TicketStatus, ticket_students
 from app.models.user import Role, User
 from app.services.guardrails import check_guardrails
-from sqlalchemy import insert
+from app.services.school_settings import get_school_config
+from sqlalchemy import event, insert
 
 
 @pytest.mark.asyncio
@@ -67,4 +68,36 @@ async def test_guardrails_urgent_only_allowed_categories(db_session):
     await db_session.commit()
     err = await check_guardrails(db_session, parent, TicketCategory.OTHER, urgency=True)
     assert err is not None
-    assert "Urgent" in err and "Transport" in err
\ No newline at end of file
+    assert "Urgent" in err and "Transport" in err
+
+
+@pytest.mark.asyncio
+async def test_guardrails_single_round_trip(db_session):
+    parent = User(phone=f"+91999{uuid.uuid4().hex[:7]}", role=Role.PARENT, school_id=1)
+    db_session.add(parent)
+    await db_session.flush()
+    db_session.add(Ticket(
+        school_id=1,
+        created_by_id=parent.id,
+        category=TicketCategory.OTHER,
+        status=TicketStatus.PENDING,
+        created_at=datetime.now(timezone.utc) - timedelta(hours=2),
+    ))
+    await db_session.commit()
+    # School settings are cached per process; load them before counting.
+    await get_school_config(db_session, parent.school_id)
+    statements = []
+
+    def _count(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    sync_engine = db_session.bind.sync_engine
+    event.listen(sync_engine, "before_cursor_execute", _count)
+    try:
+        err = await check_guardrails(db_session, parent, TicketCategory.OTHER, urgency=False)
+    finally:
+        event.remove(sync_engine, "before_cursor_execute", _count)
+    assert err is not None and "Other" in err
+    # One per-parent advisory lock, then every rule in a single query.
+    assert len(statements) == 2
+    assert "pg_advisory_xact_lock" in statements[0]
@@ -0,0 +1,68 @@
+# ABOUTME: Tests for the LISTEN/NOTIFY pub/sub layer: payload limits, origin filtering, commit semantics.
+# ABOUTME: The end-to-end test listens on a real connection, as another instance would.
+
+import asyncio
+import json
+import uuid
+
+import pytest
+from sqlalchemy import select
+
+from app.core.config import get_settings
+from app.core.db import get_engine, get_session_factory
+from app.core.pubsub import MAX_PAYLOAD_BYTES, PgPubSub, encode_payload, pubsub, queue_notification
+
+
+def test_oversized_payload_falls_back_to_ref():
+    payload = encode_payload("o", "announcement", 1, {"body": "x" * 10_000}, ref={"announcement_id": 7})
+    assert len(payload.encode()) <= MAX_PAYLOAD_BYTES
+    msg = json.loads(payload)
+    assert msg["d"] == {"announcement_id": 7}
+    assert msg["t"] == 1
+
+
+def test_own_notifications_are_not_redispatched():
+    local = PgPubSub()
+    seen = []
+    local.subscribe("k", lambda school_id, data, truncated: seen.append((school_id, data, truncated)))
+    local._on_notify(None, 0, "syncdesk_school_1", encode_payload(local.origin, "k", 1, {"a": 1}))
+    assert seen == []
+    local._on_notify(None, 0, "syncdesk_school_1", encode_payload("other-instance", "k", 1, {"a": 1}))
+    assert seen == [(1, {"a": 1}, False)]
+
+
+@pytest.mark.asyncio
+async def test_local_handlers_run_after_commit_only(db_session):
+    kind = f"test_{uuid.uuid4().hex}"
+    seen = []
+    pubsub.subscribe(kind, lambda school_id, data, truncated: seen.append(data))
+    await db_session.execute(select(1))
+    queue_notification(db_session, kind, 1, {"n": 1})
+    await db_session.rollback()
+    assert seen == []
+    queue_notification(db_session, kind, 1, {"n": 2})
+    assert seen == []
+    await db_session.commit()
+    assert seen == [{"n": 2}]
+
+
+@pytest.mark.asyncio
+async def test_notify_reaches_other_instance():
+    engine = get_engine(get_settings().database_url)
+    other = PgPubSub()
+    received: asyncio.Queue = asyncio.Queue()
+    other.subscribe("ticket_event_test", lambda school_id, data, truncated: received.put_nowait((school_id, data)))
+    other.watch_school(42)
+    await other.start(engine)
+    try:
+        for _ in range(50):
+            if other._conn is not None:
+                break
+            await asyncio.sleep(0.05)
+        async with get_session_factory(engine)() as session:
+            queue_notification(session, "ticket_event_test", 42, {"ticket_id": 1})
+            await session.commit()
+        assert await asyncio.wait_for(received.get(), timeout=5) == (42, {"ticket_id": 1})
+    finally:
+        await other.stop()
+        await engine.dispose()
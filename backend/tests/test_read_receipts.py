@@ -0,0 +1,131 @@
+# ABOUTME: Tests for the write-behind read receipt buffer: overlay before flush, size trigger, drain.
+# ABOUTME: Uses the real engine; receipts land in announcement_reads once flushed.
+
+import asyncio
+import uuid
+from datetime import datetime, timezone, timedelta
+
+import pytest
+from jose import jwt
+from sqlalchemy import func, select
+
+from app.core.config import get_settings
+from app.main import app
+from app.models.announcement import Announcement, AnnouncementRead
+from app.models.user import Role, User
+from app.services.feed_cache import feed_cache
+from app.services.read_receipts import ReadReceiptBuffer, read_buffer
+
+
+def _make_token(role: Role, user_id: int, school_id: int = 1) -> str:
+    settings = get_settings()
+    exp = datetime.now(timezone.utc) + timedelta(minutes=15)
+    return jwt.encode(
+        {"sub": str(user_id), "role": role.value, "school_id": school_id, "exp": exp},
+        settings.jwt_access_secret,
+        algorithm="HS256",
+    )
+
+
+async def _reads(db_session, user_id: int) -> int:
+    return await db_session.scalar(select(func.count(AnnouncementRead.id)).where(AnnouncementRead.user_id == user_id))
+
+
+async def _parent_with_announcements(db_session, n: int):
+    parent = User(phone=f"+91999{uuid.uuid4().hex[:7]}", role=Role.PARENT, school_id=1)
+    db_session.add(parent)
+    await db_session.flush()
+    announcements = [
+        Announcement(school_id=1, author_id=parent.id, title=f"A{i}", content="Body", target_audience="both")
+        for i in range(n)
+    ]
+    db_session.add_all(announcements)
+    await db_session.commit()
+    feed_cache.invalidate_school(1)
+    return parent, announcements
+
+
+@pytest.mark.asyncio
+async def test_buffered_reads_show_before_flush_and_drain_on_stop(client, db_session):
+    parent, announcements = await _parent_with_announcements(db_session, 2)
+    headers = {"Authorization": f"Bearer {_make_token(Role.PARENT, parent.id)}"}
+    interval, read_buffer.flush_interval = read_buffer.flush_interval, 60
+    await read_buffer.start(app.state.engine)
+    try:
+        r = await client.post(f"/announcements/{announcements[0].id}/read", headers=headers)
+        assert r.status_code == 200
+        r = await client.post("/announcements/read", headers=headers, json={"announcement_ids": [a.id for a in announcements]})
+        assert r.json()["marked"] == [a.id for a in announcements]
+        assert await _reads(db_session, parent.id) == 0
+
+        feed = (await client.get("/announcements", headers=headers)).json()
+        assert all(a["read"] for a in feed if a["id"] in {x.id for x in announcements})
+        assert (await client.get("/health/metrics")).json()["read_receipts"]["queue_depth"] >= 2
+    finally:
+        await read_buffer.stop()
+        read_buffer.flush_interval = interval
+    assert await _reads(db_session, parent.id) == 2
+    assert read_buffer.pending_for(parent.id) == set()
+    assert read_buffer.metrics()["flushes"] >= 1
+
+
+@pytest.mark.asyncio
+async def test_buffer_flushes_on_size_and_deduplicates(client, db_session):
+    parent, announcements = await _parent_with_announcements(db_session, 3)
+    buffer = ReadReceiptBuffer(flush_interval=60, flush_size=3)
+    await buffer.start(app.state.engine)
+    try:
+        buffer.add(parent.id, [announcements[0].id, announcements[1].id])
+        buffer.add(parent.id, [announcements[0].id])
+        assert buffer.depth == 2
+        buffer.add(parent.id, [announcements[2].id])
+        for _ in range(50):
+            if buffer.flushes:
+                break
+            await asyncio.sleep(0.02)
+        assert buffer.flushes == 1
+        assert buffer.depth == 0
+        assert await _reads(db_session, parent.id) == 3
+        # At-least-once: re-flushing receipts already stored is a no-op, counters included.
+        buffer.add(parent.id, [announcements[0].id])
+        await buffer.flush()
+        assert await _reads(db_session, parent.id) == 3
+        counts = await db_session.scalars(
+            select(Announcement.read_count).where(Announcement.id.in_([a.id for a in announcements]))
+        )
+        assert list(counts) == [1, 1, 1]
+    finally:
+        await buffer.stop()
+
+
+@pytest.mark.asyncio
+async def test_stop_during_flush_keeps_receipts(client, db_session):
+    parent, announcements = await _parent_with_announcements(db_session, 2)
+    buffer = ReadReceiptBuffer(flush_interval=60, flush_size=1)
+    await buffer.start(app.state.engine)
+    buffer.add(parent.id, [a.id for a in announcements])
+    for _ in range(100):
+        if buffer._inflight:
+            break
+        await asyncio.sleep(0)
+    assert buffer._inflight
+    await buffer.stop()
+    assert await _reads(db_session, parent.id) == 2
+    assert buffer.depth == 0
+
+
+@pytest.mark.asyncio
+async def test_permanently_bad_receipt_is_dropped_not_retried(client, db_session):
+    parent, announcements = await _parent_with_announcements(db_session, 1)
+    buffer = ReadReceiptBuffer(flush_interval=60)
+    await buffer.start(app.state.engine)
+    try:
+        # The second announcement does not exist (e.g. deleted after the read): a foreign key violation.
+        buffer.add(parent.id, [announcements[0].id, 2_000_000_000])
+        await buffer.flush()
+        assert buffer.depth == 0
+        assert buffer.metrics()["dropped"] == 1
+        assert buffer.failures == 0
+        assert await _reads(db_session, parent.id) == 1
+    finally:
+        await buffer.stop()
@@ -0,0 +1,110 @@
+# ABOUTME: Tests for per-school settings: admin update, office hours from cache, guardrail overrides.
+# ABOUTME: Each test uses its own school so stored settings do not leak into other tests.
+
+import uuid
+from datetime import datetime, timezone, timedelta
+from zoneinfo import ZoneInfo
+
+import pytest
+from jose import jwt
+from sqlalchemy import insert
+
+from app.core.config import get_settings
+from app.models.student import Student, parent_students
+from app.models.user import Role, User
+from app.services.school_settings import SchoolSettingsCache, resolve_config
+
+
+def _make_token(role: Role, user_id: int, school_id: int = 1) -> str:
+    settings = get_settings()
+    exp = datetime.now(timezone.utc) + timedelta(minutes=15)
+    return jwt.encode(
+        {"sub": str(user_id), "role": role.value, "school_id": school_id, "exp": exp},
+        settings.jwt_access_secret,
+        algorithm="HS256",
+    )
+
+
+def _school_id() -> int:
+    return 100_000 + uuid.uuid4().int % 1_000_000
+
+
+@pytest.mark.asyncio
+async def test_settings_update_reaches_cached_office_hours(client, db_session):
+    school_id = _school_id()
+    director = User(phone=f"+91999{uuid.uuid4().hex[:7]}", role=Role.DIRECTOR, school_id=school_id)
+    db_session.add(director)
+    await db_session.commit()
+    headers = {"Authorization": f"Bearer {_make_token(Role.DIRECTOR, director.id, school_id)}"}
+
+    r = await client.get("/config/office-hours", headers=headers)
+    assert r.status_code == 200
+    assert r.json()["holiday"] is False
+
+    today = datetime.now(ZoneInfo("Pacific/Auckland")).date()
+    r = await client.patch(
+        "/admin/school-settings",
+        headers=headers,
+        json={"office_hours_start": "09:30", "timezone": "Pacific/Auckland", "holidays": [today.isoformat()]},
+    )
+    assert r.status_code == 200
+    assert r.json()["version"] == 1
+
+    r = await client.get("/config/office-hours", headers=headers)
+    data = r.json()
+    assert data["start"] == "09:30"
+    assert data["timezone"] == "Pacific/Auckland"
+    assert data["holiday"] is True
+    assert data["in_office_hours"] is False
+
+    r = await client.patch("/admin/school-settings", headers=headers, json={"holidays": []})
+    assert r.json()["version"] == 2
+    assert r.json()["office_hours_start"] == "09:30"
+    r = await client.get("/config/office-hours", headers=headers)
+    assert r.json()["holiday"] is False
+
+
+@pytest.mark.asyncio
+async def test_settings_update_rejects_bad_values(client, db_session):
+    school_id = _school_id()
+    director = User(phone=f"+91999{uuid.uuid4().hex[:7]}", role=Role.DIRECTOR, school_id=school_id)
+    db_session.add(director)
+    await db_session.commit()
+    headers = {"Authorization": f"Bearer {_make_token(Role.DIRECTOR, director.id, school_id)}"}
+    assert (await client.patch("/admin/school-settings", headers=headers, json={"timezone": "Mars/Olympus"})).status_code == 422
+    assert (await client.patch("/admin/school-settings", headers=headers, json={"office_hours_end": "25:00"})).status_code == 422
+    assert (await client.patch("/admin/school-settings", headers=headers, json={"max_open_tickets": -1})).status_code == 422
+
+
+@pytest.mark.asyncio
+async def test_school_thresholds_override_guardrails(client, db_session):
+    school_id = _school_id()
+    director = User(phone=f"+91999{uuid.uuid4().hex[:7]}", role=Role.DIRECTOR, school_id=school_id)
+    parent = User(phone=f"+91999{uuid.uuid4().hex[:7]}", role=Role.PARENT, school_id=school_id)
+    student = Student(school_id=school_id, class_name="5", section="A")
+    db_session.add_all([director, parent, student])
+    await db_session.flush()
+    await db_session.execute(insert(parent_students).values(parent_id=parent.id, student_id=student.id))
+    await db_session.commit()
+    director_headers = {"Authorization": f"Bearer {_make_token(Role.DIRECTOR, director.id, school_id)}"}
+    parent_headers = {"Authorization": f"Bearer {_make_token(Role.PARENT, parent.id, school_id)}"}
+
+    r = await client.patch(
+        "/admin/school-settings", headers=director_headers, json={"max_open_tickets": 1, "cooldown_minutes": 0}
+    )
+    assert r.status_code == 200
+    body = {"student_ids": [student.id], "category": "transport", "title": "Bus delay"}
+    assert (await client.post("/tickets", headers=parent_headers, json=body)).status_code == 200
+    r = await client.post("/tickets", headers=parent_headers, json=body)
+    assert r.status_code == 400
+    assert "maximum number of open tickets" in r.json()["detail"]
+    r = await client.get("/me/ticket-creation-status", headers=parent_headers)
+    assert r.json()["remaining"]["open_tickets"] == 0
+
+
+def test_cache_ignores_configs_older_than_announced_version():
+    cache = SchoolSettingsCache()
+    stale = resolve_config(7, None)
+    cache.invalidate(7, version=3)
+    cache.put(stale)
+    assert cache.get(7) is None
@@ -0,0 +1,142 @@
+# ABOUTME: Tests for GET /sync delta sync: snapshot, incremental changes, tombstones, token validation.
+# ABOUTME: Parent scoping matches the ticket list; staff-only announcements are excluded.
+
+import uuid
+from datetime import datetime, timezone, timedelta
+
+import pytest
+from jose import jwt
+
+from app.core.config import get_settings
+from app.models.announcement import Announcement
+from app.models.ticket import Ticket, TicketCategory, TicketMessage, TicketStatus
+from app.models.user import Role, User
+
+
+def _make_token(role: Role, user_id: int, school_id: int = 1) -> str:
+    settings = get_settings()
+    exp = datetime.now(timezone.utc) + timedelta(minutes=15)
+    return jwt.encode(
+        {"sub": str(user_id), "role": role.value, "school_id": school_id, "exp": exp},
+        settings.jwt_access_secret,
+        algorithm="HS256",
+    )
+
+
+@pytest.mark.asyncio
+async def test_sync_returns_only_changes_since_token(client, db_session):
+    school_id = 5000 + uuid.uuid4().int % 1000
+    parent = User(phone=f"+91999{uuid.uuid4().hex[:7]}", role=Role.PARENT, school_id=school_id)
+    other = User(phone=f"+91999{uuid.uuid4().hex[:7]}", role=Role.PARENT, school_id=school_id)
+    db_session.add_all([parent, other])
+    await db_session.flush()
+    mine = Ticket(school_id=school_id, created_by_id=parent.id, category=TicketCategory.TRANSPORT, status=TicketStatus.PENDING)
+    theirs = Ticket(school_id=school_id, created_by_id=other.id, category=TicketCategory.TRANSPORT, status=TicketStatus.PENDING)
+    db_session.add_all([mine, theirs])
+    await db_session.flush()
+    # Older than the overlap window, so the next sync does not send them again.
+    earlier = datetime.now(timezone.utc) - timedelta(minutes=1)
+    db_session.add(TicketMessage(ticket_id=mine.id, sender_id=parent.id, body="Bus late", created_at=earlier))
+    db_session.add_all([
+        Announcement(school_id=school_id, author_id=other.id, title="Holiday", content="Closed", target_audience="both", created_at=earlier),
+        Announcement(school_id=school_id, author_id=other.id, title="Staff meet", content="4pm", target_audience="staff", created_at=earlier),
+    ])
+    await db_session.commit()
+    headers = {"Authorization": f"Bearer {_make_token(Role.PARENT, parent.id, school_id)}"}
+
+    first = (await client.get("/sync", headers=headers)).json()
+    assert [t["id"] for t in first["tickets"]] == [mine.id]
+    assert [m["body"] for m in first["messages"]] == ["Bus late"]
+    assert [a["title"] for a in first["announcements"]] == ["Holiday"]
+    assert first["has_more"] is False
+
+    second = (await client.get("/sync", params={"since": first["token"]}, headers=headers)).json()
+    assert second["messages"] == [] and second["announcements"] == []
+
+    db_session.add(TicketMessage(ticket_id=mine.id, sender_id=parent.id, body="Still waiting"))
+    mine.deleted_at = datetime.now(timezone.utc)
+    await db_session.commit()
+    third = (await client.get("/sync", params={"since": second["token"]}, headers=headers)).json()
+    assert third["deleted_ticket_ids"] == [mine.id]
+    assert third["tickets"] == [] and third["messages"] == []
+
+    bad = await client.get("/sync", params={"since": "not-a-token"}, headers=headers)
+    assert bad.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_sync_delivers_lower_id_committed_after_higher_one(client, db_session):
+    school_id = 5000 + uuid.uuid4().int % 1000
+    parent = User(phone=f"+91999{uuid.uuid4().hex[:7]}", role=Role.PARENT, school_id=school_id)
+    db_session.add(parent)
+    await db_session.flush()
+    ticket = Ticket(school_id=school_id, created_by_id=parent.id, category=TicketCategory.TRANSPORT, status=TicketStatus.PENDING)
+    db_session.add(ticket)
+    await db_session.flush()
+    # Two writers take ids a < b; b commits first and is synced before a commits.
+    late = TicketMessage(ticket_id=ticket.id, sender_id=parent.id, body="Slow writer")
+    early = TicketMessage(ticket_id=ticket.id, sender_id=parent.id, body="Fast writer")
+    db_session.add_all([late, early])
+    await db_session.flush()
+    late_id = late.id
+    await db_session.delete(late)
+    await db_session.commit()
+    headers = {"Authorization": f"Bearer {_make_token(Role.PARENT, parent.id, school_id)}"}
+
+    first = (await client.get("/sync", headers=headers)).json()
+    assert [m["body"] for m in first["messages"]] == ["Fast writer"]
+
+    db_session.add(TicketMessage(id=late_id, ticket_id=ticket.id, sender_id=parent.id, body="Slow writer"))
+    await db_session.commit()
+    second = (await client.get("/sync", params={"since": first["token"]}, headers=headers)).json()
+    assert "Slow writer" in [m["body"] for m in second["messages"]]
+
+
+@pytest.mark.asyncio
+async def test_sync_reports_archived_announcements(client, db_session):
+    school_id = 5000 + uuid.uuid4().int % 1000
+    parent = User(phone=f"+91999{uuid.uuid4().hex[:7]}", role=Role.PARENT, school_id=school_id)
+    principal = User(phone=f"+91999{uuid.uuid4().hex[:7]}", role=Role.PRINCIPAL, school_id=school_id)
+    db_session.add_all([parent, principal])
+    await db_session.flush()
+    announcement = Announcement(school_id=school_id, author_id=principal.id, title="Trip", content="Friday", target_audience="both")
+    db_session.add(announcement)
+    await db_session.commit()
+    headers = {"Authorization": f"Bearer {_make_token(Role.PARENT, parent.id, school_id)}"}
+
+    first = (await client.get("/sync", headers=headers)).json()
+    assert [a["id"] for a in first["announcements"]] == [announcement.id]
+    assert first["archived_announcement_ids"] == []
+
+    staff = {"Authorization": f"Bearer {_make_token(Role.PRINCIPAL, principal.id, school_id)}"}
+    assert (await client.post(f"/announcements/{announcement.id}/archive", headers=staff)).status_code == 200
+    second = (await client.get("/sync", params={"since": first["token"]}, headers=headers)).json()
+    assert second["archived_announcement_ids"] == [announcement.id]
+    assert announcement.id not in [a["id"] for a in second["announcements"]]
+
+
+@pytest.mark.asyncio
+async def test_sync_pages_tombstones(client, db_session):
+    school_id = 5000 + uuid.uuid4().int % 1000
+    parent = User(phone=f"+91999{uuid.uuid4().hex[:7]}", role=Role.PARENT, school_id=school_id)
+    db_session.add(parent)
+    await db_session.flush()
+    tickets = [
+        Ticket(school_id=school_id, created_by_id=parent.id, category=TicketCategory.TRANSPORT, status=TicketStatus.PENDING)
+        for _ in range(3)
+    ]
+    db_session.add_all(tickets)
+    await db_session.commit()
+    headers = {"Authorization": f"Bearer {_make_token(Role.PARENT, parent.id, school_id)}"}
+    token = (await client.get("/sync", headers=headers)).json()["token"]
+
+    deleted_at = datetime.now(timezone.utc)
+    for i, ticket in enumerate(tickets):
+        ticket.deleted_at = deleted_at + timedelta(milliseconds=i)
+    await db_session.commit()
+    first = (await client.get("/sync", params={"since": token, "limit": 2}, headers=headers)).json()
+    assert first["deleted_ticket_ids"] == [tickets[0].id, tickets[1].id]
+    assert first["has_more"] is True
+    second = (await client.get("/sync", params={"since": first["token"], "limit": 2}, headers=headers)).json()
+    assert tickets[2].id in second["deleted_ticket_ids"]
+    assert tickets[0].id not in second["deleted_ticket_ids"]
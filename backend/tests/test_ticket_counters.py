@@ -0,0 +1,36 @@
+# ABOUTME: Tests for denormalized ticket activity counters maintained on write.
+# ABOUTME: Reply, internal note and reopen keep counters in step; checker reports no drift.
+
+import uuid
+
+import pytest
+
+from app.check_counters import find_counter_drift
+from app.models.ticket import Ticket, TicketCategory, TicketStatus
+from app.models.user import Role, User
+from app.services.ticket_service import add_internal_note, add_reply, request_reopen, set_ticket_status
+
+
+@pytest.mark.asyncio
+async def test_counters_maintained_on_write(db_session):
+    parent = User(phone=f"+91999{uuid.uuid4().hex[:7]}", role=Role.PARENT, school_id=1)
+    teacher = User(phone=f"+91998{uuid.uuid4().hex[:7]}", role=Role.TEACHER, school_id=1)
+    db_session.add_all([parent, teacher])
+    await db_session.flush()
+    ticket = Ticket(school_id=1, created_by_id=parent.id, category=TicketCategory.ATTENDANCE_LEAVE, status=TicketStatus.PENDING)
+    db_session.add(ticket)
+    await db_session.flush()
+
+    await add_reply(db_session, ticket.id, parent, "Leave on Friday")
+    staff_msg = await add_reply(db_session, ticket.id, teacher, "Noted")
+    await add_internal_note(db_session, ticket.id, teacher, "Check register")
+    await set_ticket_status(db_session, ticket.id, teacher, TicketStatus.RESOLVED)
+    assert await request_reopen(db_session, ticket.id, parent, "Not recorded") is not None
+
+    assert ticket.message_count == 2
+    assert ticket.last_message_at == staff_msg.created_at
+    assert ticket.first_staff_response_at == staff_msg.created_at
+    assert ticket.internal_notes_count == 1
+    assert ticket.reopen_count == 1
+    assert ticket.status == TicketStatus.PENDING
+    assert await find_counter_drift(db_session, [ticket.id]) == []
@@ -0,0 +1,70 @@
+# ABOUTME: Tests for GET /me/ticket-creation-status and its cached per-parent quota state.
+# ABOUTME: Repeat views are served from cache; resolving a ticket invalidates the parent's entry.
+
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from jose import jwt
+from sqlalchemy import event
+
+from app.core.config import get_settings
+from app.main import app
+from app.models.ticket import Ticket, TicketCategory, TicketStatus
+from app.models.user import Role, User
+
+
+def _make_token(role: Role, user_id: int, school_id: int = 1) -> str:
+    settings = get_settings()
+    exp = datetime.now(timezone.utc) + timedelta(minutes=15)
+    return jwt.encode(
+        {"sub": str(user_id), "role": role.value, "school_id": school_id, "exp": exp},
+        settings.jwt_access_secret,
+        algorithm="HS256",
+    )
+
+
+@pytest.mark.asyncio
+async def test_creation_status_cached_until_ticket_resolved(client, db_session):
+    parent = User(phone=f"+91999{uuid.uuid4().hex[:7]}", role=Role.PARENT, school_id=1)
+    teacher = User(phone=f"+91998{uuid.uuid4().hex[:7]}", role=Role.TEACHER, school_id=1)
+    db_session.add_all([parent, teacher])
+    await db_session.flush()
+    old = datetime.now(timezone.utc) - timedelta(days=10)
+    tickets = [
+        Ticket(school_id=1, created_by_id=parent.id, category=TicketCategory.TRANSPORT, status=TicketStatus.PENDING, created_at=old)
+        for _ in range(3)
+    ]
+    db_session.add_all(tickets)
+    await db_session.commit()
+    headers = {"Authorization": f"Bearer {_make_token(Role.PARENT, parent.id)}"}
+
+    r = await client.get("/me/ticket-creation-status", headers=headers)
+    body = r.json()
+    assert body["blocked"] is True
+    assert "maximum number of open tickets" in body["reason"]
+    assert body["remaining"]["open_tickets"] == 0
+
+    statements = []
+
+    def _count(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    sync_engine = app.state.engine.sync_engine
+    event.listen(sync_engine, "before_cursor_execute", _count)
+    try:
+        r = await client.get("/me/ticket-creation-status", headers=headers)
+    finally:
+        event.remove(sync_engine, "before_cursor_execute", _count)
+    assert r.json()["blocked"] is True
+    assert not any("count(" in s.lower() for s in statements)
+
+    staff_headers = {"Authorization": f"Bearer {_make_token(Role.TEACHER, teacher.id)}"}
+    await client.patch(f"/tickets/{tickets[0].id}/status", json={"status": "resolved"}, headers=staff_headers)
+    r = await client.get("/me/ticket-creation-status", headers=headers)
+    assert r.json() == {
+        "blocked": False,
+        "reason": None,
+        "block_until": None,
+        "remaining": {"open_tickets": 1, "weekly": 5, "open_other": 1, "urgent_weekly": 1},
+    }
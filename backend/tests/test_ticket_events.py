@@ -0,0 +1,94 @@
+# ABOUTME: Tests for live ticket events: post-commit publishing, visibility scoping, replay and heartbeats.
+# ABOUTME: Subscribes through the broker directly; the SSE endpoint is a thin wrapper around it.
+
+import uuid
+
+import pytest
+from jose import jwt
+
+from app.core.config import get_settings
+from app.models.ticket import Ticket, TicketCategory, TicketStatus
+from app.models.user import Role, User
+from app.services.events import EventBroker, broker
+
+
+def _make_token(role: Role, user_id: int, school_id: int = 1) -> str:
+    from datetime import datetime, timezone, timedelta
+    settings = get_settings()
+    exp = datetime.now(timezone.utc) + timedelta(minutes=15)
+    return jwt.encode(
+        {"sub": str(user_id), "role": role.value, "school_id": school_id, "exp": exp},
+        settings.jwt_access_secret,
+        algorithm="HS256",
+    )
+
+
+def _drain(sub) -> list:
+    events = []
+    while not sub.queue.empty():
+        events.append(sub.queue.get_nowait())
+    return events
+
+
+@pytest.mark.asyncio
+async def test_reply_and_note_events_follow_ticket_visibility(client, db_session):
+    parent = User(phone=f"+91999{uuid.uuid4().hex[:7]}", role=Role.PARENT, school_id=1)
+    other_parent = User(phone=f"+91999{uuid.uuid4().hex[:7]}", role=Role.PARENT, school_id=1)
+    teacher = User(phone=f"+91998{uuid.uuid4().hex[:7]}", role=Role.TEACHER, school_id=1)
+    db_session.add_all([parent, other_parent, teacher])
+    await db_session.flush()
+    ticket = Ticket(school_id=1, created_by_id=parent.id, category=TicketCategory.ACADEMIC_TEACHING, status=TicketStatus.PENDING)
+    db_session.add(ticket)
+    await db_session.commit()
+
+    parent_sub, _, _ = broker.subscribe(parent)
+    other_sub, _, _ = broker.subscribe(other_parent)
+    staff_sub, _, _ = broker.subscribe(teacher)
+    try:
+        headers = {"Authorization": f"Bearer {_make_token(Role.TEACHER, teacher.id)}"}
+        await client.post(f"/tickets/{ticket.id}/reply", headers=headers, json={"body": "Looking into it."})
+        await client.post(f"/tickets/{ticket.id}/internal-notes", headers=headers, json={"body": "Check with class teacher"})
+
+        parent_events = [e for e in _drain(parent_sub) if e.ticket_id == ticket.id]
+        assert [e.type for e in parent_events] == ["message.created"]
+        assert parent_events[0].data["status"] == "in_progress"
+        assert [e for e in _drain(other_sub) if e.ticket_id == ticket.id] == []
+        assert [e.type for e in _drain(staff_sub) if e.ticket_id == ticket.id] == ["message.created", "internal_note.created"]
+    finally:
+        for sub in (parent_sub, other_sub, staff_sub):
+            broker.unsubscribe(sub)
+
+
+@pytest.mark.asyncio
+async def test_last_event_id_replay_and_resync():
+    local = EventBroker(buffer_size=3)
+    staff = User(id=1, role=Role.TEACHER, school_id=1)
+    first = local.publish("ticket.status", 10, 1, 5, False, {"ticket_id": 10})
+    for _ in range(2):
+        local.publish("ticket.status", 10, 1, 5, False, {"ticket_id": 10})
+
+    _, replay, resync = local.subscribe(staff, first.id)
+    assert not resync
+    assert [e.seq for e in replay] == [first.seq + 1, first.seq + 2]
+
+    for _ in range(3):
+        local.publish("ticket.status", 10, 1, 5, False, {"ticket_id": 10})
+    _, replay, resync = local.subscribe(staff, first.id)
+    assert resync and replay == []
+
+    # Same sequence number from another instance's broker: resync rather than replaying the wrong events.
+    other = EventBroker()
+    _, replay, resync = local.subscribe(staff, f"{other.epoch}-{local._next_id - 1}")
+    assert resync and replay == []
+    _, _, resync = local.subscribe(staff, "12345")
+    assert resync
+
+
+@pytest.mark.asyncio
+async def test_stream_sends_heartbeat_when_idle():
+    local = EventBroker()
+    sub, replay, resync = local.subscribe(User(id=1, role=Role.TEACHER, school_id=1))
+    frames = local.stream(sub, replay, resync, heartbeat=0.01)
+    assert await anext(frames) == "retry: 3000\n\n"
+    assert await anext(frames) == ": heartbeat\n\n"
+    await frames.aclose()
@@ -0,0 +1,42 @@
+# ABOUTME: Plan-regression tests: inbox listing and search queries must use their intended indexes.
+# ABOUTME: Seq scans are disabled so the planner choice reflects index usability, not table size.
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.dialects import postgresql
+
+from app.models.user import Role, User
+from app.schemas.ticket import TicketFilters
+from app.services.ticket_service import ticket_list_query, ticket_search_query
+
+
+async def _explain(session, query) -> str:
+    compiled = query.compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True})
+    result = await session.execute(text(f"EXPLAIN {compiled}"))
+    return "\n".join(row[0] for row in result.all())
+
+
+@pytest.mark.asyncio
+async def test_open_queue_uses_partial_index(db_session):
+    await db_session.execute(text("SET LOCAL enable_seqscan = off"))
+    staff = User(id=1, role=Role.TEACHER, school_id=1)
+    plan = await _explain(db_session, ticket_list_query(staff, limit=50, filters=TicketFilters(status="open")))
+    assert "ix_tickets_open_queue" in plan
+
+
+@pytest.mark.asyncio
+async def test_assignee_open_queue_uses_partial_index(db_session):
+    await db_session.execute(text("SET LOCAL enable_seqscan = off"))
+    staff = User(id=1, role=Role.TEACHER, school_id=1)
+    filters = TicketFilters(status="in_progress", assigned_to=1)
+    plan = await _explain(db_session, ticket_list_query(staff, limit=50, filters=filters))
+    assert "ix_tickets_open_by_assignee" in plan or "ix_tickets_open_queue" in plan
+
+
+@pytest.mark.asyncio
+async def test_search_uses_gin_indexes(db_session):
+    await db_session.execute(text("SET LOCAL enable_seqscan = off"))
+    staff = User(id=1, role=Role.TEACHER, school_id=1)
+    plan = await _explain(db_session, ticket_search_query(staff, "bus late", limit=20))
+    assert "ix_tickets_search_vector" in plan
+    assert "ix_ticket_messages_search_vector" in plan
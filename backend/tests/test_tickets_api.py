@@ -1,16 +1,20 @@
 # ABOUTME: Tests for ticket APIs: create, list, get, reply, internal notes, visibility.
 # ABOUTME: Parent creates ticket; staff reply sets In Progress; internal notes staff-only.
 
+import asyncio
 import uuid
 
 import pytest
 from jose import jwt
 
 from app.core.config import get_settings
+from app.core.user_cache import user_cache
+from app.main import app
+from app.models.audit import AuditLog
 from app.models.student import Student, parent_students
-from app.models.ticket import TicketCategory
+from app.models.ticket import Ticket, TicketCategory, TicketMessage, TicketStatus
 from app.models.user import Role, User
-from sqlalchemy import insert
+from sqlalchemy import event, func, insert, select
 
 
 def _make_token(role: Role, user_id: int, school_id: int = 1) -> str:
@@ -24,6 +28,17 @@ def _make_token(role: Role, user_id: int, school_id: int = 1) -> str:
     )
 
 
+async def _parent_with_ticket(db_session, **fields) -> tuple[User, Ticket]:
+    """A committed parent in school 1 with one pending transport ticket."""
+    parent = User(phone=f"+91999{uuid.uuid4().hex[:7]}", role=Role.PARENT, school_id=1)
+    db_session.add(parent)
+    await db_session.flush()
+    ticket = Ticket(school_id=1, created_by_id=parent.id, category=TicketCategory.TRANSPORT, status=TicketStatus.PENDING, **fields)
+    db_session.add(ticket)
+    await db_session.commit()
+    return parent, ticket
+
+
 @pytest.mark.asyncio
 async def test_parent_creates_ticket(client, db_session):
     phone = f"+91999{uuid.uuid4().hex[:7]}"
@@ -54,6 +69,32 @@ async def test_parent_creates_ticket(client, db_session):
     assert data["title"] == "Bus delay"
 
 
+@pytest.mark.asyncio
+async def test_parallel_creates_respect_guardrails(client, db_session):
+    phone = f"+91999{uuid.uuid4().hex[:7]}"
+    parent = User(phone=phone, role=Role.PARENT, school_id=1)
+    db_session.add(parent)
+    await db_session.flush()
+    student = Student(school_id=1, class_name="5", section="A")
+    db_session.add(student)
+    await db_session.flush()
+    await db_session.execute(insert(parent_students).values(parent_id=parent.id, student_id=student.id))
+    await db_session.commit()
+    token = _make_token(Role.PARENT, parent.id)
+
+    async def create(i: int):
+        return await client.post(
+            "/tickets",
+            headers={"Authorization": f"Bearer {token}"},
+            json={"student_ids": [student.id], "category": "transport", "title": f"Bus delay {i}"},
+        )
+
+    responses = await asyncio.gather(*(create(i) for i in range(5)))
+    codes = sorted(r.status_code for r in responses)
+    # The cooldown allows one ticket; without per-parent serialization several could slip through.
+    assert codes == [200, 400, 400, 400, 400]
+
+
 @pytest.mark.asyncio
 async def test_parent_lists_own_tickets(client, db_session):
     phone = f"+91999{uuid.uuid4().hex[:7]}"
@@ -134,4 +175,276 @@ async def test_internal_notes_not_in_parent_response(client, db_session):
     assert "internal_notes_count" not in r_get.json() or r_get.json().get("internal_notes_count") is None
     r_staff = await client.get(f"/tickets/{ticket.id}", headers={"Authorization": f"Bearer {vp_token}"})
     assert r_staff.status_code == 200
-    assert r_staff.json().get("internal_notes_count") == 1
\ No newline at end of file
+    assert r_staff.json().get("internal_notes_count") == 1
+
+
+@pytest.mark.asyncio
+async def test_list_tickets_query_count_independent_of_page_size(client, db_session):
+    parent = User(phone=f"+91999{uuid.uuid4().hex[:7]}", role=Role.PARENT, school_id=1)
+    db_session.add(parent)
+    await db_session.flush()
+
+    async def add_tickets(n: int) -> None:
+        for _ in range(n):
+            t = Ticket(school_id=1, created_by_id=parent.id, category=TicketCategory.TRANSPORT, status=TicketStatus.PENDING)
+            db_session.add(t)
+            await db_session.flush()
+            db_session.add(TicketMessage(ticket_id=t.id, sender_id=parent.id, body="Hello"))
+        await db_session.commit()
+
+    statements: list[str] = []
+
+    def _count(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    token = _make_token(Role.PARENT, parent.id)
+    sync_engine = app.state.engine.sync_engine
+    event.listen(sync_engine, "before_cursor_execute", _count)
+    try:
+        await add_tickets(1)
+        # Compare both requests with a cold user cache.
+        user_cache.invalidate(parent.id)
+        statements.clear()
+        r = await client.get("/tickets", headers={"Authorization": f"Bearer {token}"})
+        assert r.status_code == 200
+        assert len(r.json()) == 1
+        small_page = len(statements)
+
+        await add_tickets(6)
+        user_cache.invalidate(parent.id)
+        statements.clear()
+        r = await client.get("/tickets", headers={"Authorization": f"Bearer {token}"})
+        assert r.status_code == 200
+        assert len(r.json()) == 7
+        assert len(statements) == small_page
+    finally:
+        event.remove(sync_engine, "before_cursor_execute", _count)
+
+
+@pytest.mark.asyncio
+async def test_list_tickets_keyset_pagination(client, db_session):
+    parent = User(phone=f"+91999{uuid.uuid4().hex[:7]}", role=Role.PARENT, school_id=1)
+    db_session.add(parent)
+    await db_session.flush()
+    for _ in range(3):
+        db_session.add(Ticket(school_id=1, created_by_id=parent.id, category=TicketCategory.TRANSPORT, status=TicketStatus.PENDING))
+        await db_session.flush()
+    await db_session.commit()
+    headers = {"Authorization": f"Bearer {_make_token(Role.PARENT, parent.id)}"}
+
+    r1 = await client.get("/tickets", params={"limit": 2}, headers=headers)
+    assert r1.status_code == 200
+    assert len(r1.json()) == 2
+    cursor = r1.headers.get("X-Next-Cursor")
+    assert cursor
+
+    r2 = await client.get("/tickets", params={"limit": 2, "cursor": cursor}, headers=headers)
+    assert r2.status_code == 200
+    assert len(r2.json()) == 1
+    assert "X-Next-Cursor" not in r2.headers
+    seen = [t["id"] for t in r1.json() + r2.json()]
+    assert len(set(seen)) == 3
+
+    r_bad = await client.get("/tickets", params={"cursor": "not-a-cursor"}, headers=headers)
+    assert r_bad.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_ticket_summary_view(client, db_session):
+    parent, ticket = await _parent_with_ticket(db_session, title="Bus late")
+    db_session.add(TicketMessage(ticket_id=ticket.id, sender_id=parent.id, body="First"))
+    await db_session.flush()
+    db_session.add(TicketMessage(ticket_id=ticket.id, sender_id=parent.id, body="Second"))
+    await db_session.commit()
+    r = await client.get("/tickets/summary", headers={"Authorization": f"Bearer {_make_token(Role.PARENT, parent.id)}"})
+    assert r.status_code == 200
+    row = next(t for t in r.json() if t["id"] == ticket.id)
+    assert "messages" not in row
+    assert row["message_count"] == 2
+    assert row["last_message_preview"] == "Second"
+    assert row["title"] == "Bus late"
+
+
+@pytest.mark.asyncio
+async def test_ticket_messages_incremental_fetch(client, db_session):
+    parent, ticket = await _parent_with_ticket(db_session)
+    ids = []
+    for body in ("one", "two", "three", "four"):
+        msg = TicketMessage(ticket_id=ticket.id, sender_id=parent.id, body=body)
+        db_session.add(msg)
+        await db_session.flush()
+        ids.append(msg.id)
+    await db_session.commit()
+    headers = {"Authorization": f"Bearer {_make_token(Role.PARENT, parent.id)}"}
+
+    r_latest = await client.get(f"/tickets/{ticket.id}/messages", params={"limit": 2}, headers=headers)
+    assert r_latest.status_code == 200
+    assert [m["body"] for m in r_latest.json()] == ["three", "four"]
+
+    r_older = await client.get(f"/tickets/{ticket.id}/messages", params={"before_id": ids[2]}, headers=headers)
+    assert [m["body"] for m in r_older.json()] == ["one", "two"]
+
+    r_new = await client.get(f"/tickets/{ticket.id}/messages", params={"after_id": ids[-1]}, headers=headers)
+    assert r_new.status_code == 200
+    assert r_new.json() == []
+
+
+@pytest.mark.asyncio
+async def test_ticket_conditional_get(client, db_session):
+    parent, ticket = await _parent_with_ticket(db_session)
+    headers = {"Authorization": f"Bearer {_make_token(Role.PARENT, parent.id)}"}
+
+    r1 = await client.get(f"/tickets/{ticket.id}", headers=headers)
+    assert r1.status_code == 200
+    etag = r1.headers["ETag"]
+    r2 = await client.get(f"/tickets/{ticket.id}", headers={**headers, "If-None-Match": etag})
+    assert r2.status_code == 304
+    assert r2.headers["ETag"] == etag
+
+    await client.post(f"/tickets/{ticket.id}/reply", headers=headers, json={"body": "Any update?"})
+    r3 = await client.get(f"/tickets/{ticket.id}", headers={**headers, "If-None-Match": etag})
+    assert r3.status_code == 200
+    assert r3.headers["ETag"] != etag
+
+    r_list = await client.get("/tickets", headers=headers)
+    r_list_again = await client.get("/tickets", headers={**headers, "If-None-Match": r_list.headers["ETag"]})
+    assert r_list_again.status_code == 304
+
+
+@pytest.mark.asyncio
+async def test_staff_reply_prefer_minimal_returns_delta(client, db_session):
+    parent = User(phone=f"+91999{uuid.uuid4().hex[:7]}", role=Role.PARENT, school_id=1)
+    teacher = User(phone=f"+91998{uuid.uuid4().hex[:7]}", role=Role.TEACHER, school_id=1)
+    db_session.add_all([parent, teacher])
+    await db_session.flush()
+    ticket = Ticket(school_id=1, created_by_id=parent.id, category=TicketCategory.ACADEMIC_TEACHING, status=TicketStatus.PENDING)
+    db_session.add(ticket)
+    await db_session.commit()
+    r = await client.post(
+        f"/tickets/{ticket.id}/reply",
+        headers={"Authorization": f"Bearer {_make_token(Role.TEACHER, teacher.id)}", "Prefer": "return=minimal"},
+        json={"body": "On it."},
+    )
+    assert r.status_code == 200
+    assert r.headers["Preference-Applied"] == "return=minimal"
+    data = r.json()
+    assert "messages" not in data
+    assert data["status"] == "in_progress"
+    assert data["message"]["body"] == "On it."
+    assert data["message"]["is_staff"] is True
+
+
+@pytest.mark.asyncio
+async def test_list_tickets_server_side_filters(client, db_session):
+    parent = User(phone=f"+91999{uuid.uuid4().hex[:7]}", role=Role.PARENT, school_id=1)
+    db_session.add(parent)
+    await db_session.flush()
+    open_ticket = Ticket(school_id=1, created_by_id=parent.id, category=TicketCategory.TRANSPORT, status=TicketStatus.PENDING, urgency=True)
+    resolved = Ticket(school_id=1, created_by_id=parent.id, category=TicketCategory.DOCUMENTS, status=TicketStatus.RESOLVED)
+    db_session.add_all([open_ticket, resolved])
+    await db_session.commit()
+    headers = {"Authorization": f"Bearer {_make_token(Role.PARENT, parent.id)}"}
+
+    r_open = await client.get("/tickets", params={"status": "open"}, headers=headers)
+    assert [t["id"] for t in r_open.json()] == [open_ticket.id]
+    r_cat = await client.get("/tickets/summary", params={"category": "documents"}, headers=headers)
+    assert [t["id"] for t in r_cat.json()] == [resolved.id]
+    r_sorted = await client.get("/tickets", params={"sort": "created_at"}, headers=headers)
+    assert [t["id"] for t in r_sorted.json()] == [open_ticket.id, resolved.id]
+    r_bad = await client.get("/tickets", params={"sort": "title"}, headers=headers)
+    assert r_bad.status_code == 422
+
+
+@pytest.mark.asyncio
+async def test_search_tickets_by_content(client, db_session):
+    parent = User(phone=f"+91999{uuid.uuid4().hex[:7]}", role=Role.PARENT, school_id=1)
+    other = User(phone=f"+91999{uuid.uuid4().hex[:7]}", role=Role.PARENT, school_id=1)
+    teacher = User(phone=f"+91999{uuid.uuid4().hex[:7]}", role=Role.TEACHER, school_id=1)
+    db_session.add_all([parent, other, teacher])
+    await db_session.flush()
+    tag = uuid.uuid4().hex[:10]
+    by_title = Ticket(
+        school_id=1, created_by_id=parent.id, category=TicketCategory.TRANSPORT, status=TicketStatus.PENDING,
+        title=f"Bus {tag} late", description="<script>alert(1)</script>",
+    )
+    by_message = Ticket(school_id=1, created_by_id=parent.id, category=TicketCategory.DOCUMENTS, status=TicketStatus.PENDING, title="Certificate")
+    hidden = Ticket(school_id=1, created_by_id=other.id, category=TicketCategory.TRANSPORT, status=TicketStatus.PENDING, title=f"Route {tag}")
+    db_session.add_all([by_title, by_message, hidden])
+    await db_session.flush()
+    db_session.add(TicketMessage(ticket_id=by_message.id, sender_id=parent.id, body=f"Reference number {tag} attached"))
+    await db_session.commit()
+
+    r = await client.get("/tickets/search", params={"q": tag}, headers={"Authorization": f"Bearer {_make_token(Role.PARENT, parent.id)}"})
+    assert r.status_code == 200
+    hits = {h["id"]: h for h in r.json()}
+    assert set(hits) == {by_title.id, by_message.id}
+    assert f"<mark>{tag}</mark>" in hits[by_title.id]["snippet"]
+    assert f"<mark>{tag}</mark>" in hits[by_message.id]["message_snippet"]
+    assert "<script>" not in hits[by_title.id]["snippet"]
+    assert "&lt;script&gt;" in hits[by_title.id]["snippet"]
+
+    r_staff = await client.get("/tickets/search", params={"q": tag}, headers={"Authorization": f"Bearer {_make_token(Role.TEACHER, teacher.id)}"})
+    assert hidden.id in {h["id"] for h in r_staff.json()}
+
+
+@pytest.mark.asyncio
+async def test_role_queue_and_reroute(client, db_session):
+    school_id = 700 + int(uuid.uuid4().int % 100)
+    parent = User(phone=f"+91999{uuid.uuid4().hex[:7]}", role=Role.PARENT, school_id=school_id)
+    teacher = User(phone=f"+91999{uuid.uuid4().hex[:7]}", role=Role.TEACHER, school_id=school_id)
+    principal = User(phone=f"+91999{uuid.uuid4().hex[:7]}", role=Role.PRINCIPAL, school_id=school_id)
+    db_session.add_all([parent, teacher, principal])
+    await db_session.flush()
+    academic = Ticket(school_id=school_id, created_by_id=parent.id, category=TicketCategory.ACADEMIC_TEACHING, status=TicketStatus.PENDING)
+    transport = Ticket(school_id=school_id, created_by_id=parent.id, category=TicketCategory.TRANSPORT, status=TicketStatus.PENDING)
+    db_session.add_all([academic, transport])
+    await db_session.commit()
+    assert academic.routed_role == Role.TEACHER
+    teacher_headers = {"Authorization": f"Bearer {_make_token(Role.TEACHER, teacher.id, school_id)}"}
+    principal_headers = {"Authorization": f"Bearer {_make_token(Role.PRINCIPAL, principal.id, school_id)}"}
+
+    r = await client.get("/tickets/queue", headers=teacher_headers)
+    assert [t["id"] for t in r.json()] == [academic.id]
+    r_all = await client.get("/tickets/queue", headers=principal_headers)
+    assert {t["id"] for t in r_all.json()} == {academic.id, transport.id}
+
+    r_denied = await client.patch(f"/tickets/{transport.id}/route", json={"role": "teacher"}, headers=teacher_headers)
+    assert r_denied.status_code == 403
+    r_route = await client.patch(f"/tickets/{transport.id}/route", json={"role": "teacher"}, headers=principal_headers)
+    assert r_route.status_code == 200
+    assert r_route.json()["routed_role"] == "teacher"
+    r = await client.get("/tickets/queue", headers=teacher_headers)
+    assert {t["id"] for t in r.json()} == {academic.id, transport.id}
+
+
+@pytest.mark.asyncio
+async def test_bulk_resolve_reports_per_id_results(client, db_session):
+    parent = User(phone=f"+91999{uuid.uuid4().hex[:7]}", role=Role.PARENT, school_id=1)
+    staff = User(phone=f"+91999{uuid.uuid4().hex[:7]}", role=Role.TRANSPORT, school_id=1)
+    db_session.add_all([parent, staff])
+    await db_session.flush()
+    tickets = [
+        Ticket(school_id=1, created_by_id=parent.id, category=TicketCategory.TRANSPORT, status=TicketStatus.PENDING)
+        for _ in range(3)
+    ]
+    other_school = Ticket(school_id=2, created_by_id=parent.id, category=TicketCategory.TRANSPORT, status=TicketStatus.PENDING)
+    db_session.add_all([*tickets, other_school])
+    await db_session.commit()
+    ids = [t.id for t in tickets]
+    headers = {"Authorization": f"Bearer {_make_token(Role.TRANSPORT, staff.id)}"}
+
+    r = await client.post(
+        "/tickets/bulk",
+        json={"ticket_ids": ids + [other_school.id], "operation": "status", "status": "resolved"},
+        headers=headers,
+    )
+    assert r.status_code == 200
+    data = r.json()
+    assert data["updated"] == 3
+    assert {x["id"]: x["error"] for x in data["results"]} == {**{i: None for i in ids}, other_school.id: "not_found"}
+    statuses = (await db_session.execute(select(Ticket.status).where(Ticket.id.in_(ids)).execution_options(populate_existing=True))).scalars().all()
+    assert set(statuses) == {TicketStatus.RESOLVED}
+    audit_rows = await db_session.scalar(
+        select(func.count()).select_from(AuditLog).where(AuditLog.user_id == staff.id, AuditLog.action == "ticket_status_changed")
+    )
+    assert audit_rows == 3